@@ -0,0 +1,240 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import Signal
+
+from .models import ActionLog
+from .transaction import defer_until_commit
+
+logger = logging.getLogger(__name__)
+
+# Enviado após cada gravação de registros, com ``entries`` (lista de
+# ActionLog já gravados)
+entries_written = Signal()
+
+_local = threading.local()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+class ActionLogWriter:
+    """
+    Thread de gravação em segundo plano para registros de ActionLog.
+
+    Os registros entram em uma fila limitada e são gravados com
+    ``bulk_create`` quando o lote atinge ``batch_size`` ou quando
+    ``flush_interval`` segundos se passam desde o primeiro item pendente.
+    Cada registro vai para o banco em que a ação foi confirmada.
+    """
+
+    _STOP = object()
+
+    def __init__(self, batch_size=500, flush_interval=2.0, max_queue_size=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="action-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, entries, using=DEFAULT_DB_ALIAS):
+        """
+        Enfileira os registros e devolve os que não couberam na fila,
+        para que o chamador os grave de forma síncrona.
+        """
+        for index, entry in enumerate(entries):
+            try:
+                self._queue.put_nowait((using, entry))
+            except queue.Full:
+                return entries[index:]
+        return []
+
+    def stop(self, drain=True, timeout=10.0):
+        """
+        Encerra a thread. Com ``drain`` os registros pendentes são gravados
+        antes da saída; caso contrário, são descartados.
+        """
+        if self._thread is None:
+            return
+        if not drain:
+            self._discard_pending()
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _discard_pending(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _run(self):
+        batch = []
+        deadline = None
+        try:
+            while True:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    entry = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    entry = None
+                if entry is self._STOP:
+                    break
+                if entry is not None:
+                    batch.append(entry)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                if batch and (
+                    len(batch) >= self.batch_size or time.monotonic() >= deadline
+                ):
+                    self._flush(batch)
+                    batch, deadline = [], None
+            # Grava o que restou na fila antes de encerrar
+            while True:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is not self._STOP:
+                    batch.append(entry)
+            if batch:
+                self._flush(batch)
+        finally:
+            connections.close_all()
+
+    def _flush(self, batch):
+        by_alias = defaultdict(list)
+        for using, entry in batch:
+            by_alias[using].append(entry)
+        for using, entries in by_alias.items():
+            try:
+                ActionLog.objects.using(using).bulk_create(
+                    entries, batch_size=self.batch_size
+                )
+            except Exception:
+                logger.exception(
+                    "Falha ao gravar %d registros de ActionLog", len(entries)
+                )
+                continue
+            _notify(entries)
+
+
+def _notify(entries):
+    # Receptores com erro não podem interromper a gravação dos registros
+    for receiver, response in entries_written.send_robust(
+        sender=ActionLog, entries=entries
+    ):
+        if isinstance(response, Exception):
+            logger.error(
+                "Erro em %r ao processar registros gravados", receiver, exc_info=response
+            )
+
+
+def get_writer():
+    """
+    Retorna o gravador em segundo plano, iniciando-o na primeira chamada,
+    ou ``None`` se ``ACTION_LOG_BACKGROUND_WRITER`` estiver desativado.
+    """
+    global _writer
+    if not getattr(settings, "ACTION_LOG_BACKGROUND_WRITER", False):
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = ActionLogWriter(
+                batch_size=getattr(settings, "ACTION_LOG_BATCH_SIZE", 500),
+                flush_interval=getattr(settings, "ACTION_LOG_FLUSH_INTERVAL", 2.0),
+                max_queue_size=getattr(settings, "ACTION_LOG_QUEUE_SIZE", 10000),
+            )
+            atexit.register(shutdown)
+        _writer.start()
+        return _writer
+
+
+def shutdown(drain=True):
+    """
+    Para o gravador em segundo plano, gravando os registros pendentes.
+    """
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop(drain=drain)
+
+
+def write(entries, using=None):
+    """
+    Grava os registros imediatamente no banco ``using``, ou os entrega ao
+    gravador em segundo plano quando ele estiver ativo.
+    """
+    if not entries:
+        return
+    using = using or DEFAULT_DB_ALIAS
+    writer = get_writer()
+    if writer is not None:
+        entries = writer.submit(entries, using)
+        if not entries:
+            return
+    ActionLog.objects.using(using).bulk_create(
+        entries, batch_size=getattr(settings, "ACTION_LOG_BATCH_SIZE", 500)
+    )
+    _notify(entries)
+
+
+def _accept(items):
+    # Chamado após o commit com pares (banco, registro): acumula no escopo
+    # aberto ou grava direto
+    buffer = getattr(_local, "buffer", None)
+    by_alias = defaultdict(list)
+    for using, entry in items:
+        by_alias[using].append(entry)
+    for using, entries in by_alias.items():
+        if buffer is not None:
+            buffer[using].extend(entries)
+        else:
+            write(entries, using)
+
+
+def record(user, action_text, using=None, employee_id=None):
+    """
+    Registra uma ação. O registro só é aceito quando a transação corrente
+    é confirmada e é gravado em lote no fim do escopo ``buffered()`` aberto.
+    :param user: Instância do usuário que realizou a ação.
+    :param action_text: Descrição da ação realizada.
+    :param using: Alias do banco em que a ação foi feita (e o registro gravado).
+    :param employee_id: Id do funcionário afetado, se houver.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    entry = ActionLog(user=user, employee_id=employee_id, action_text=action_text)
+    defer_until_commit(_accept, (using, entry), using=using)
+    return entry
+
+
+@contextmanager
+def buffered():
+    """
+    Agrupa os registros feitos dentro do bloco e os grava com um único
+    ``bulk_create`` por banco na saída do escopo mais externo.
+    """
+    outermost = getattr(_local, "buffer", None) is None
+    if outermost:
+        _local.buffer = defaultdict(list)
+    try:
+        yield
+    finally:
+        if outermost:
+            buffer, _local.buffer = _local.buffer, None
+            for using, entries in buffer.items():
+                write(entries, using)
@@ -0,0 +1,131 @@
+"""
+Retenção de ``ActionLog``: registros mais antigos que
+``ACTION_LOG_RETENTION_DAYS`` saem do banco para arquivos JSONL
+compactados, um por dia, em ``ACTION_LOG_ARCHIVE_DIR``::
+
+    <ACTION_LOG_ARCHIVE_DIR>/2024/05/2024-05-01.jsonl.gz
+
+Cada lote é acrescentado ao arquivo do dia (como um novo membro gzip) e só
+então apagado do banco. Se o processo cair entre as duas etapas o lote é
+arquivado de novo na próxima execução; ``read`` descarta as repetições.
+"""
+
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ActionLog
+
+# Colunas gravadas em cada linha do arquivo
+FIELDS = ("id", "user_id", "employee_id", "action_text", "action_date")
+SUFFIX = ".jsonl.gz"
+
+
+def archive_dir():
+    return Path(settings.ACTION_LOG_ARCHIVE_DIR)
+
+
+def partition_path(day):
+    return archive_dir() / f"{day:%Y}" / f"{day:%m}" / f"{day.isoformat()}{SUFFIX}"
+
+
+def _append(day, rows):
+    path = partition_path(day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as compressed:
+            for row in rows:
+                # isoformat mantém os microssegundos
+                row = {**row, "action_date": row["action_date"].isoformat()}
+                compressed.write(json.dumps(row, ensure_ascii=False).encode() + b"\n")
+        raw.flush()
+        # O lote só sai do banco depois de estar no disco
+        os.fsync(raw.fileno())
+
+
+def archive(days=None, batch_size=None, using=DEFAULT_DB_ALIAS):
+    """
+    Move para os arquivos os registros mais antigos que ``days`` dias, em
+    lotes de ``batch_size`` (cada lote apagado na sua própria transação).
+    Retorna a quantidade arquivada.
+    """
+    if days is None:
+        days = settings.ACTION_LOG_RETENTION_DAYS
+    batch_size = batch_size or settings.ACTION_LOG_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+    pending = (
+        ActionLog.objects.using(using)
+        .filter(action_date__lt=cutoff)
+        .order_by("action_date", "id")
+        .values(*FIELDS)
+    )
+    archived = 0
+    while True:
+        rows = list(pending[:batch_size])
+        if not rows:
+            return archived
+        partitions = defaultdict(list)
+        for row in rows:
+            partitions[timezone.localdate(row["action_date"])].append(row)
+        for day, day_rows in partitions.items():
+            _append(day, day_rows)
+        with transaction.atomic(using=using):
+            ActionLog.objects.using(using).filter(
+                pk__in=[row["id"] for row in rows]
+            ).delete()
+        archived += len(rows)
+
+
+def partitions(since=None, until=None):
+    """
+    Dias arquivados entre ``since`` e ``until`` (datas, inclusive), em
+    ordem, com o caminho de cada arquivo.
+    """
+    for path in sorted(archive_dir().glob(f"*/*/*{SUFFIX}")):
+        try:
+            day = date.fromisoformat(path.name[: -len(SUFFIX)])
+        except ValueError:
+            continue
+        if (since is None or day >= since) and (until is None or day <= until):
+            yield day, path
+
+
+def read(since=None, until=None, user_id=None, employee_id=None, text=None):
+    """
+    Percorre os registros arquivados sem carregá-los em memória, do mais
+    antigo ao mais recente. ``since`` e ``until`` aceitam data ou data e
+    hora; ``text`` procura no texto da ação sem diferenciar maiúsculas.
+    """
+    start = since.date() if isinstance(since, datetime) else since
+    end = until.date() if isinstance(until, datetime) else until
+    if text is not None:
+        text = text.lower()
+    for _, path in partitions(start, end):
+        # Lotes arquivados duas vezes (queda antes de apagar do banco)
+        seen = set()
+        with gzip.open(path, "rt", encoding="utf-8") as lines:
+            for line in lines:
+                row = json.loads(line)
+                if row["id"] in seen:
+                    continue
+                seen.add(row["id"])
+                if user_id is not None and row["user_id"] != user_id:
+                    continue
+                if employee_id is not None and row["employee_id"] != employee_id:
+                    continue
+                if text is not None and text not in row["action_text"].lower():
+                    continue
+                row["action_date"] = parse_datetime(row["action_date"])
+                if isinstance(since, datetime) and row["action_date"] < since:
+                    continue
+                if isinstance(until, datetime) and row["action_date"] > until:
+                    continue
+                yield row
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.functions import Lower
+
+from . import throttle, user_cache
+
+UserModel = get_user_model()
+
+
+def get_by_email(email):
+    """
+    Busca o usuário pelo e-mail sem diferenciar maiúsculas, usando o
+    índice único de ``Lower("email")`` (a condição ``email <> ''`` é
+    repetida para o banco poder usar o índice parcial).
+    """
+    try:
+        return (
+            UserModel._default_manager.alias(email_lower=Lower("email"))
+            .exclude(email="")
+            .get(email_lower=email.strip().lower())
+        )
+    except UserModel.DoesNotExist:
+        return None
+
+
+class CachedUserBackend(ModelBackend):
+    """
+    ``ModelBackend`` que carrega o usuário de cada requisição do cache
+    (``accounts.user_cache``), já com funcionário e cargo.
+
+    O login por nome de usuário (admin, ``BasicAuthentication`` da API)
+    passa pelo mesmo limite de tentativas do login por e-mail.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        # Levanta PermissionDenied antes do hash da senha
+        throttle.check(request, username)
+        user = super().authenticate(request, username=username, password=password)
+        if user is None:
+            throttle.failure(request, username)
+        else:
+            throttle.success(request, username)
+        return user
+
+    def get_user(self, user_id):
+        user = user_cache.get_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+class EmailBackend(CachedUserBackend):
+    """
+    Autenticação por e-mail e senha, com limite de tentativas por IP e por
+    conta (``accounts.throttle``) verificado antes do hash da senha.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if not email or password is None:
+            return None
+        # Levanta PermissionDenied: o authenticate() do Django para aqui
+        throttle.check(request, email)
+        user = get_by_email(email)
+        if user is None:
+            # Mesmo custo de um e-mail existente, para não revelar quais são
+            UserModel().set_password(password)
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            throttle.success(request, email)
+            return user
+        throttle.failure(request, email)
+        return None
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move os registros de ActionLog mais antigos que a retenção para "
+        "arquivos JSONL compactados, um por dia. Agende periodicamente (cron) "
+        "ou enfileire a tarefa accounts.archive_action_logs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Dias mantidos no banco (padrão: ACTION_LOG_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Registros por lote (padrão: ACTION_LOG_ARCHIVE_BATCH_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        archived = archive.archive(days=options["days"], batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{archived} registros arquivados em {settings.ACTION_LOG_ARCHIVE_DIR}"
+            )
+        )
@@ -0,0 +1,39 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga as sessões vencidas em lotes pequenos, cada um na sua própria "
+        "transação, sem travar a tabela de sessões. Agende periodicamente "
+        "(cron) no lugar do manage.py clearsessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Sessões apagadas por lote"
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Segundos de espera entre lotes, para não disputar o banco",
+        )
+
+    def handle(self, *args, **options):
+        # Sessões que vencerem durante a limpeza ficam para a próxima
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        deleted = 0
+        while True:
+            keys = list(
+                expired.values_list("session_key", flat=True)[: options["batch_size"]]
+            )
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            time.sleep(options["pause"])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} sessões vencidas apagadas"))
@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from accounts import archive
+
+
+def date_argument(value):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+
+class Command(BaseCommand):
+    help = (
+        "Procura nos registros de ActionLog arquivados e imprime os "
+        "encontrados em JSONL, lendo os arquivos em streaming."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=date_argument, help="Data inicial (AAAA-MM-DD)")
+        parser.add_argument("--until", type=date_argument, help="Data final (AAAA-MM-DD)")
+        parser.add_argument("--user", type=int, help="Id do usuário")
+        parser.add_argument("--employee", type=int, help="Id do funcionário")
+        parser.add_argument("--text", help="Trecho do texto da ação")
+        parser.add_argument("--limit", type=int, help="Máximo de registros")
+
+    def handle(self, *args, **options):
+        if options["since"] and options["until"] and options["since"] > options["until"]:
+            raise CommandError("--since deve ser anterior a --until.")
+        rows = archive.read(
+            since=options["since"],
+            until=options["until"],
+            user_id=options["user"],
+            employee_id=options["employee"],
+            text=options["text"],
+        )
+        for count, row in enumerate(rows, 1):
+            row["action_date"] = row["action_date"].isoformat()
+            self.stdout.write(json.dumps(row, ensure_ascii=False))
+            if count == options["limit"]:
+                break
@@ -0,0 +1,15 @@
+from . import action_log
+
+
+class ActionLogBufferMiddleware:
+    """
+    Agrupa os registros de ActionLog de cada requisição em um único
+    ``bulk_create`` gravado ao fim da resposta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with action_log.buffered():
+            return self.get_response(request)
@@ -1,4 +1,4 @@
-from .models import ActionLog
+from . import action_log
 
 
 class LoggableMixin:
@@ -9,6 +9,8 @@ class LoggableMixin:
     def save(self, *args, user=None, action_text=None, **kwargs):
         """
         Sobrescreve o método save para registrar logs de alterações.
+        Os logs são enfileirados e gravados em lote após o commit
+        (ver ``accounts.action_log``).
         :param user: Instância do usuário que realizou a ação.
         :param action_text: Descrição da ação realizada.
         """
@@ -17,8 +19,18 @@ class LoggableMixin:
 
         # Registrar o log
         if user and action_text:
-            ActionLog.objects.create(
+            action_log.record(
                 user=user,
-                employee=getattr(self, "employee", None),
                 action_text=f"{action_text} - [{self.__class__.__name__}]",
+                using=kwargs.get("using") or self._state.db,
+                employee_id=self.get_log_employee_id(),
             )
+
+    def get_log_employee_id(self):
+        """
+        Funcionário afetado pela ação: o próprio objeto ou o funcionário
+        ao qual ele pertence (sem consultar o banco).
+        """
+        if self._meta.label == "employee.Employee":
+            return self.pk
+        return getattr(self, "employee_id", None)
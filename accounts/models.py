@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
 
@@ -9,24 +10,60 @@ class User(AbstractUser):
         max_length=255, verbose_name=_("Full Name"), blank=True, null=True
     )
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # E-mail único sem diferenciar maiúsculas; o índice atende o
+            # login por e-mail (accounts.backends.EmailBackend)
+            models.UniqueConstraint(
+                Lower("email"),
+                condition=~models.Q(email=""),
+                name="accounts_user_email_ci_unique",
+            ),
+        ]
+
     def __str__(self):
         return self.full_name or self.username
 
 
 class ActionLog(models.Model):
-    # Usuário que realizou a ação
+    # Usuário que realizou a ação (coberto pelo índice composto do Meta)
     user = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
         null=True,
         related_name="action_logs",
         verbose_name=_("User"),
+        db_index=False,
+    )
+    # Funcionário afetado pela ação (coberto pelo índice composto do Meta)
+    employee = models.ForeignKey(
+        "employee.Employee",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="action_logs",
+        verbose_name=_("Employee"),
+        db_index=False,
     )
     # Texto descrevendo a ação
     action_text = models.TextField(verbose_name=_("Action Text"))
     # Data e hora da ação
     action_date = models.DateTimeField(auto_now_add=True, verbose_name=_("Action Date"))
 
+    class Meta:
+        # Mesma ordem do feed paginado (api/views/action_logs.py) e da
+        # retenção, que lê os mais antigos por data
+        indexes = [
+            models.Index(fields=["action_date", "id"], name="actionlog_date_idx"),
+            models.Index(
+                fields=["user", "action_date", "id"], name="actionlog_user_date_idx"
+            ),
+            models.Index(
+                fields=["employee", "action_date", "id"],
+                name="actionlog_employee_date_idx",
+            ),
+        ]
+
     def __str__(self):
         user_info = self.user.username if self.user else "Usuário Desconhecido"
         return f"Ação por {user_info}: {self.action_text}"
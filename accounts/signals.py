@@ -1,6 +1,7 @@
 # signals.py
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_migrate, post_save
 from .models import User
+from . import user_cache
 from django.dispatch import receiver
 from decouple import config
 
@@ -20,4 +21,16 @@ def create_default_user(sender, **kwargs):
     print(f"Superuser '{username}' created successfully.")
 
 post_migrate.connect(create_default_user)
-    
\ No newline at end of file
+    
+
+def invalidate_cached_user(sender, instance, update_fields=None, **kwargs):
+    """
+    Descarta o usuário em cache (``accounts.user_cache``). O login só
+    atualiza ``last_login``, que não precisa invalidar.
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    user_cache.invalidate_user(instance.pk)
+
+post_save.connect(invalidate_cached_user, sender=User)
+post_delete.connect(invalidate_cached_user, sender=User)
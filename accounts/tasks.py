@@ -0,0 +1,12 @@
+"""
+Tarefas em segundo plano do app (executadas por ``manage.py runworker``).
+"""
+
+from jobs.queue import task
+
+from . import archive
+
+
+@task("accounts.archive_action_logs")
+def archive_action_logs(days=None, batch_size=None):
+    return {"archived": archive.archive(days=days, batch_size=batch_size)}
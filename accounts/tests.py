@@ -1,3 +1,68 @@
-from django.test import TestCase
+import base64
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from . import throttle
+from .models import User
+
+
+@override_settings(LOGIN_THROTTLE_ACCOUNT_LIMIT=2, LOGIN_THROTTLE_IP_LIMIT=100)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        throttle._local.clear()
+        throttle._blocked.clear()
+        self.user = User.objects.create(
+            username="maria", email="maria@example.com", full_name="Maria"
+        )
+        self.user.set_password("segredo")
+        self.user.save()
+
+    def request(self):
+        return RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+
+    def test_email_path_blocks_after_limit(self):
+        for _ in range(2):
+            self.assertIsNone(
+                authenticate(self.request(), email="maria@example.com", password="x")
+            )
+        # Bloqueada: nem a senha certa passa
+        self.assertIsNone(
+            authenticate(self.request(), email="maria@example.com", password="segredo")
+        )
+
+    def test_unknown_email_is_throttled_too(self):
+        for _ in range(2):
+            self.assertIsNone(
+                authenticate(self.request(), email="ninguem@example.com", password="x")
+            )
+        with self.assertRaises(throttle.Throttled):
+            throttle.check(self.request(), "ninguem@example.com")
+
+    def test_username_path_blocks_after_limit(self):
+        self.assertEqual(
+            authenticate(self.request(), username="maria", password="segredo"), self.user
+        )
+        for _ in range(2):
+            self.assertIsNone(authenticate(self.request(), username="maria", password="x"))
+        self.assertIsNone(
+            authenticate(self.request(), username="maria", password="segredo")
+        )
+
+    def test_basic_authentication_is_throttled(self):
+        def get(password):
+            credentials = base64.b64encode(f"maria:{password}".encode()).decode()
+            return self.client.get(
+                "/api/achievements/", HTTP_AUTHORIZATION=f"Basic {credentials}"
+            )
+
+        for _ in range(2):
+            self.assertIn(get("x").status_code, (401, 403))
+        self.assertIn(get("segredo").status_code, (401, 403))
+
+        cache.clear()
+        throttle._local.clear()
+        throttle._blocked.clear()
+        self.assertEqual(get("segredo").status_code, 200)
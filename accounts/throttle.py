@@ -0,0 +1,126 @@
+"""
+Limite de tentativas de login com falha, por IP e por conta (e-mail).
+
+As falhas são contadas numa janela deslizante de
+``LOGIN_THROTTLE_WINDOW`` segundos em duas camadas:
+
+- em memória no processo, que rejeita rajadas sem consultar o cache;
+- no cache do Django (dois baldes consecutivos ponderados pelo tempo
+  decorrido), compartilhado entre processos.
+
+``check`` é chamado antes de verificar a senha: um atacante bloqueado não
+custa o hash PBKDF2.
+"""
+
+import hashlib
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+# Quantidade máxima de chaves mantidas em memória
+LOCAL_MAX_ENTRIES = 10000
+
+_local = {}
+_blocked = {}
+_lock = threading.Lock()
+
+
+class Throttled(PermissionDenied):
+    def __init__(self, retry_after):
+        super().__init__("Muitas tentativas de login. Tente novamente mais tarde.")
+        self.retry_after = retry_after
+
+
+def client_ip(request):
+    return request.META.get("REMOTE_ADDR") or "desconhecido"
+
+
+def _keys(request, email):
+    keys = []
+    if request is not None:
+        keys.append((f"ip:{client_ip(request)}", settings.LOGIN_THROTTLE_IP_LIMIT))
+    if email:
+        # Hash para a chave ter tamanho fixo e não expor o e-mail no cache
+        digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        keys.append((f"account:{digest}", settings.LOGIN_THROTTLE_ACCOUNT_LIMIT))
+    return keys
+
+
+def _bucket_key(key, bucket):
+    return f"login-throttle:{key}:{bucket}"
+
+
+def _shared_count(key, now, window):
+    bucket, elapsed = divmod(now, window)
+    bucket = int(bucket)
+    counts = cache.get_many([_bucket_key(key, bucket - 1), _bucket_key(key, bucket)])
+    previous = counts.get(_bucket_key(key, bucket - 1), 0)
+    current = counts.get(_bucket_key(key, bucket), 0)
+    # Aproximação da janela deslizante: o balde anterior pesa pela fração
+    # da janela que ainda não passou
+    return previous * (1 - elapsed / window) + current
+
+
+def _local_failures(key, now, window):
+    failures = _local.get(key)
+    if failures is None:
+        return 0
+    while failures and failures[0] <= now - window:
+        failures.popleft()
+    return len(failures)
+
+
+def check(request, email):
+    """
+    Levanta ``Throttled`` se o IP ou a conta passaram do limite de falhas.
+    """
+    window = settings.LOGIN_THROTTLE_WINDOW
+    now = time.time()
+    for key, limit in _keys(request, email):
+        with _lock:
+            until = _blocked.get(key, 0)
+            if until > now:
+                raise Throttled(int(until - now) + 1)
+            local = _local_failures(key, now, window)
+        if local >= limit or _shared_count(key, now, window) >= limit:
+            with _lock:
+                _blocked[key] = now + window
+            raise Throttled(window)
+
+
+def failure(request, email):
+    """
+    Conta uma tentativa com falha para o IP e para a conta.
+    """
+    window = settings.LOGIN_THROTTLE_WINDOW
+    now = time.time()
+    bucket = int(now // window)
+    for key, limit in _keys(request, email):
+        with _lock:
+            if len(_local) >= LOCAL_MAX_ENTRIES:
+                _local.clear()
+                _blocked.clear()
+            _local.setdefault(key, deque(maxlen=limit)).append(now)
+        shared = _bucket_key(key, bucket)
+        # Dois baldes cobrem a janela inteira
+        if not cache.add(shared, 1, window * 2):
+            try:
+                cache.incr(shared)
+            except ValueError:
+                cache.set(shared, 1, window * 2)
+
+
+def success(request, email):
+    """
+    Zera as falhas da conta depois de um login válido (as do IP ficam).
+    """
+    bucket = int(time.time() // settings.LOGIN_THROTTLE_WINDOW)
+    for key, _ in _keys(None, email):
+        with _lock:
+            _local.pop(key, None)
+            _blocked.pop(key, None)
+        cache.delete_many([_bucket_key(key, bucket - 1), _bucket_key(key, bucket)])
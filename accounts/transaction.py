@@ -0,0 +1,56 @@
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_local = threading.local()
+
+
+def _pending_batches():
+    batches = getattr(_local, "batches", None)
+    if batches is None:
+        batches = _local.batches = {}
+    return batches
+
+
+def _is_scheduled(connection, flusher):
+    return any(entry[1] is flusher for entry in connection.run_on_commit)
+
+
+def defer_until_commit(callback, item, using=None):
+    """
+    Acumula ``item`` e chama ``callback(items)`` uma única vez quando a
+    transação corrente for confirmada.
+
+    Fora de um bloco atômico o callback é chamado imediatamente com
+    ``[item]``. Itens registrados dentro de um savepoint desfeito são
+    descartados junto com o callback agendado para aquele savepoint.
+    :param callback: Função que recebe a lista de itens acumulados.
+    :param item: Item a ser entregue ao callback.
+    :param using: Alias do banco de dados da transação.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        callback([item])
+        return
+
+    batches = _pending_batches()
+    key = (using, callback, tuple(connection.savepoint_ids))
+    batch = batches.get(key)
+    if batch is not None and _is_scheduled(connection, batch[1]):
+        batch[0].append(item)
+        return
+
+    # Descarta lotes cujo callback foi perdido em um rollback
+    for stale_key, (_, stale_flusher) in list(batches.items()):
+        if stale_key[0] == using and not _is_scheduled(connection, stale_flusher):
+            del batches[stale_key]
+
+    items = [item]
+
+    def flusher():
+        batches.pop(key, None)
+        callback(items)
+
+    batches[key] = (items, flusher)
+    connection.on_commit(flusher)
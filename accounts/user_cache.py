@@ -0,0 +1,77 @@
+"""
+Cache do usuário logado (com funcionário e cargo) carregado a cada
+requisição pelo ``AuthenticationMiddleware``.
+
+A entrada fica sob chave versionada: salvar o usuário ou o funcionário
+troca a versão do usuário; salvar ou excluir qualquer cargo troca a
+versão compartilhada dos cargos.
+
+Só vale com cache compartilhado entre processos (veja ``CACHES`` em
+control/settings.py): com o cache em memória
+de cada processo, uma invalidação feita em um worker não chegaria aos
+outros, que continuariam usando o usuário antigo (senha, ``is_active``)
+por até ``CACHE_TIMEOUT``. Nesse caso o usuário é lido do banco.
+"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Tempo de vida das entradas (segundos)
+CACHE_TIMEOUT = 60 * 60
+
+ROLES_VERSION_KEY = "auth:user:roles:version"
+
+
+def _version_key(user_id):
+    return f"auth:user:{user_id}:version"
+
+
+def invalidate_user(user_id):
+    if user_id is not None:
+        cache.set(_version_key(user_id), time.time_ns(), None)
+
+
+def invalidate_roles():
+    cache.set(ROLES_VERSION_KEY, time.time_ns(), None)
+
+
+def shared():
+    """
+    Indica se o cache é visto por todos os processos.
+    """
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def get_user(user_id):
+    """
+    Retorna o usuário com ``employee`` e ``employee.role`` já carregados,
+    ou ``None`` se ele não existir. Com o cache aquecido não há consultas.
+    """
+    if not shared():
+        return _load(user_id)
+    versions = cache.get_many([_version_key(user_id), ROLES_VERSION_KEY])
+    key = "auth:user:{}:{}:{}".format(
+        user_id,
+        versions.get(_version_key(user_id), 0),
+        versions.get(ROLES_VERSION_KEY, 0),
+    )
+    user = cache.get(key)
+    if user is None:
+        user = _load(user_id)
+        if user is not None:
+            cache.set(key, user, CACHE_TIMEOUT)
+    return user
+
+
+def _load(user_id):
+    UserModel = get_user_model()
+    try:
+        return UserModel._default_manager.select_related("employee__role").get(
+            pk=user_id
+        )
+    except UserModel.DoesNotExist:
+        return None
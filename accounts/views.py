@@ -3,6 +3,8 @@ from django.contrib.auth import login, authenticate
 from django.views import View
 from django.http import JsonResponse
 
+from . import throttle
+
 
 # Login Page View
 class LoginPageView(View):
@@ -14,6 +16,12 @@ class LoginPageView(View):
     def post(self, request, *args, **kwargs):
         email = request.POST.get("email")
         password = request.POST.get("password")
+        try:
+            throttle.check(request, email)
+        except throttle.Throttled as exc:
+            response = render(request, self.template_name, status=429)
+            response["Retry-After"] = str(exc.retry_after)
+            return response
         user = authenticate(request, email=email, password=password)
         if user:
             login(request, user)
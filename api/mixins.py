@@ -0,0 +1,89 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .serializers import requested_fields
+
+
+class SparseQuerysetMixin:
+    """
+    Restringe as colunas do SELECT (``only()``) aos campos pedidos em
+    ``?fields=``, mantendo a chave primária e as colunas da paginação.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = requested_fields(self.request)
+        if fields is None or self.action not in ("list", "retrieve"):
+            return queryset
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        ordering = {name.lstrip("-") for name in getattr(self, "keyset_ordering", ())}
+        columns = (fields & concrete) | ordering | {queryset.model._meta.pk.name}
+        if getattr(self, "last_modified_field", None):
+            columns.add(self.last_modified_field)
+        return queryset.only(*columns)
+
+
+class ConditionalGetMixin:
+    """
+    Responde 304 a GETs condicionais (``If-None-Match``/``If-Modified-Since``)
+    antes de serializar qualquer linha.
+
+    Na listagem, o ETag e o Last-Modified vêm de um único agregado
+    (quantidade e maior ``last_modified_field``) sobre o queryset filtrado.
+    """
+
+    last_modified_field = "updated_at"
+
+    def _conditional_response(self, request, etag, last_modified):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        return response, timestamp
+
+    def _set_validators(self, response, etag, timestamp):
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if not self.last_modified_field:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        stats = queryset.order_by().aggregate(
+            total=Count("pk"), last_modified=Max(self.last_modified_field)
+        )
+        digest = hashlib.md5(
+            f"{stats['total']}:{stats['last_modified']}:"
+            f"{request.get_full_path()}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        etag = quote_etag(digest)
+        response, timestamp = self._conditional_response(
+            request, etag, stats["last_modified"]
+        )
+        if response is not None:
+            return response
+        response = super().list(request, *args, **kwargs)
+        return self._set_validators(response, etag, timestamp)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.last_modified_field:
+            return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        last_modified = getattr(instance, self.last_modified_field)
+        digest = hashlib.md5(
+            f"{instance.pk}:{last_modified}:{request.get_full_path()}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        etag = quote_etag(digest)
+        response, timestamp = self._conditional_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(instance)
+        return self._set_validators(Response(serializer.data), etag, timestamp)
@@ -0,0 +1,111 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por chave (keyset) em vez de OFFSET.
+
+    A view define a ordenação em ``keyset_ordering`` (padrão ``("id",)``),
+    que deve terminar em uma coluna única. O cursor guarda os valores da
+    última linha da página, então cada página custa o mesmo para o banco,
+    independentemente da posição.
+    """
+
+    page_size = api_settings.PAGE_SIZE or 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Cursor inválido."
+
+    def get_ordering(self, view):
+        return tuple(getattr(view, "keyset_ordering", ("id",)))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = [
+                queryset.model._meta.get_field(name.lstrip("-")).to_python(value)
+                for name, value in zip(self.ordering, raw)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, row):
+        values = []
+        for name in self.ordering:
+            field = row._meta.get_field(name.lstrip("-"))
+            values.append(field.value_to_string(row))
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def keyset_filter(self, values):
+        """
+        Monta ``(a > x) OR (a = x AND b > y) ...`` para as colunas da ordenação.
+        """
+        clauses = []
+        for index, name in enumerate(self.ordering):
+            column = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            equal = {
+                prior.lstrip("-"): values[position]
+                for position, prior in enumerate(self.ordering[:index])
+            }
+            clauses.append(Q(**equal, **{f"{column}__{lookup}": values[index]}))
+        return reduce(or_, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        values = self.decode_cursor(request, queryset)
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values))
+
+        rows = list(queryset[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,27 @@
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+from employee.access import has_permissions
+
+
+class HasRolePermissions(BasePermission):
+    """
+    Exige as permissões de cargo declaradas na view (nomes de
+    ``employee.Permission``): ``required_permissions`` para qualquer método
+    e ``required_write_permissions`` adicionalmente para escrita.
+
+    A equipe (``is_staff``) passa sempre, como nas exportações. Views sem
+    ``required_permissions`` declarado são negadas; para liberar a qualquer
+    usuário logado declare uma tupla vazia.
+    """
+
+    def has_permission(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return False
+        if request.user.is_staff:
+            return True
+        if not hasattr(view, "required_permissions"):
+            return False
+        names = list(view.required_permissions)
+        if request.method not in SAFE_METHODS:
+            names += getattr(view, "required_write_permissions", ())
+        return has_permissions(request.user, names)
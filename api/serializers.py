@@ -0,0 +1,192 @@
+from rest_framework import serializers
+
+from accounts.models import ActionLog
+from employee import derivatives
+from employee.documents import document_key
+from jobs.models import Job
+from employee.models import (
+    Absence,
+    Achievement,
+    Advance,
+    Employee,
+    Leave,
+    PaymentDetails,
+    PerformanceReview,
+    Salary,
+    SalaryDiscount,
+    Vacation,
+)
+
+
+def requested_fields(request):
+    """
+    Lê o parâmetro ``?fields=a,b,c`` da requisição. Retorna ``None`` quando
+    nenhum campo foi pedido.
+    """
+    if request is None:
+        return None
+    raw = request.query_params.get("fields", "")
+    fields = {name.strip() for name in raw.split(",") if name.strip()}
+    return fields or None
+
+
+class SparseFieldsetMixin:
+    """
+    Remove do serializer os campos que não foram pedidos em ``?fields=``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get("request"))
+        if fields is None:
+            return
+        for name in set(self.fields) - fields:
+            self.fields.pop(name)
+
+
+class EmployeeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Employee
+        fields = [
+            "id",
+            "user",
+            "display_name",
+            "birth_date",
+            "cpf",
+            "rg",
+            "ctps",
+            "pis_pasep",
+            "cnh",
+            "phone",
+            "hire_date",
+            "termination_date",
+            "start_time",
+            "end_time",
+            "gender",
+            "employment_status",
+            "contract_type",
+            "payment_method",
+            "role",
+            "updated_at",
+        ]
+        read_only_fields = ["display_name", "hire_date", "updated_at"]
+
+    def validate_cpf(self, value):
+        # Mesma verificação de Employee.clean: o CPF é único pelos dígitos,
+        # em qualquer formatação
+        key = document_key(value)
+        others = Employee.objects.filter(cpf_digits=key)
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if key and others.exists():
+            raise serializers.ValidationError("Já existe um funcionário com este CPF.")
+        return value
+
+
+class SalarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Salary
+        fields = "__all__"
+
+
+class SalaryDiscountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = SalaryDiscount
+        fields = "__all__"
+
+
+class AdvanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Advance
+        fields = "__all__"
+
+
+class VacationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Vacation
+        fields = "__all__"
+
+
+class LeaveSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Leave
+        fields = "__all__"
+
+
+class AbsenceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Absence
+        fields = "__all__"
+
+
+class PerformanceReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = PerformanceReview
+        fields = "__all__"
+
+
+class PaymentDetailsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = PaymentDetails
+        fields = "__all__"
+
+
+class UnavailabilitySerializer(serializers.Serializer):
+    """
+    Serializa ``employee.availability.Unavailability``; o nome do
+    funcionário vem do mapa ``employee_names`` do contexto.
+    """
+
+    kind = serializers.CharField()
+    record_id = serializers.IntegerField()
+    employee_id = serializers.IntegerField()
+    employee_name = serializers.SerializerMethodField()
+    role_id = serializers.IntegerField(allow_null=True)
+    start = serializers.DateField()
+    end = serializers.DateField()
+    status = serializers.CharField()
+
+    def get_employee_name(self, item):
+        return self.context.get("employee_names", {}).get(item.employee_id)
+
+
+class AchievementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Conquista com as URLs das miniaturas em ``images`` (``{tamanho: url}``),
+    para que as telas não baixem a imagem original.
+    """
+
+    images = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Achievement
+        fields = ["id", "name", "image", "images"]
+
+    def get_images(self, achievement):
+        return derivatives.urls_for(achievement)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "task",
+            "queue",
+            "state",
+            "priority",
+            "attempts",
+            "max_attempts",
+            "run_at",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "result",
+            "error",
+        ]
+
+
+class ActionLogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ActionLog
+        fields = ["id", "user", "employee", "action_text", "action_date"]
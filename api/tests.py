@@ -1,3 +1,42 @@
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from employee.models import Permission, Role
+from employee.tests import create_employee
+
+BACKEND = "accounts.backends.EmailBackend"
+
+
+class RolePermissionTests(TestCase):
+    urls = ("/api/employees/", "/api/salaries/", "/api/payment-details/")
+
+    def setUp(self):
+        cache.clear()
+        self.employee = create_employee(1)
+
+    def test_user_without_role_is_denied(self):
+        self.client.force_login(self.employee.user, backend=BACKEND)
+        for url in self.urls + ("/api/availability/", "/api/search/employees/?q=fu"):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_role_with_reports_permission_reads_but_does_not_write(self):
+        permission, _ = Permission.objects.get_or_create(name="Visualizar Relatórios")
+        role = Role.objects.create(name="Analista", abbreviation="AN")
+        role.permissions.add(permission)
+        self.employee.role = role
+        self.employee.save()
+        self.client.force_login(self.employee.user, backend=BACKEND)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.delete(f"/api/employees/{self.employee.pk}/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff_is_allowed(self):
+        staff = User.objects.create(username="staff", is_staff=True)
+        self.client.force_login(staff, backend=BACKEND)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
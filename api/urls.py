@@ -0,0 +1,29 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import *
+
+router = DefaultRouter()
+router.register("employees", EmployeeViewSet)
+router.register("salaries", SalaryViewSet)
+router.register("salary-discounts", SalaryDiscountViewSet)
+router.register("advances", AdvanceViewSet)
+router.register("vacations", VacationViewSet)
+router.register("leaves", LeaveViewSet)
+router.register("absences", AbsenceViewSet)
+router.register("performance-reviews", PerformanceReviewViewSet)
+router.register("payment-details", PaymentDetailsViewSet)
+router.register("achievements", AchievementViewSet)
+router.register("jobs", JobViewSet)
+router.register("action-logs", ActionLogViewSet)
+
+urlpatterns = [
+    path("availability/", AvailabilityView.as_view(), name="availability"),
+    path(
+        "availability/calendar/",
+        TeamCalendarView.as_view(),
+        name="availability-calendar",
+    ),
+    path("search/employees/", EmployeeSearchView.as_view(), name="employee-search"),
+    path("", include(router.urls)),
+]
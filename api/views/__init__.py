@@ -0,0 +1,16 @@
+from .achievements import AchievementViewSet
+from .action_logs import ActionLogViewSet
+from .availability import AvailabilityView, TeamCalendarView
+from .employees import (
+    AbsenceViewSet,
+    AdvanceViewSet,
+    EmployeeViewSet,
+    LeaveViewSet,
+    PaymentDetailsViewSet,
+    PerformanceReviewViewSet,
+    SalaryDiscountViewSet,
+    SalaryViewSet,
+    VacationViewSet,
+)
+from .jobs import JobViewSet
+from .search import EmployeeSearchView
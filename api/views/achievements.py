@@ -0,0 +1,29 @@
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+
+from employee.models import Achievement
+from ..permissions import HasRolePermissions
+from ..serializers import AchievementSerializer
+
+
+class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Conquistas com as URLs das miniaturas; ``?employee=`` filtra as de um
+    funcionário.
+    """
+
+    queryset = Achievement.objects.all()
+    serializer_class = AchievementSerializer
+    permission_classes = (IsAuthenticated, HasRolePermissions)
+    # Sem dados pessoais: qualquer usuário logado
+    required_permissions = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        employee = self.request.query_params.get("employee")
+        if employee:
+            if not employee.isdigit():
+                raise ValidationError({"employee": "Informe um id numérico."})
+            queryset = queryset.filter(employees=employee)
+        return queryset
@@ -0,0 +1,59 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+
+from accounts.models import ActionLog
+from ..serializers import ActionLogSerializer
+
+
+def parse_moment(name, value, end=False):
+    """
+    Aceita data (``2024-05-01``) ou data e hora ISO. Uma data sozinha vale
+    pelo dia inteiro: início do dia em ``since`` e fim em ``until``.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError
+            moment = datetime.combine(day, time.max if end else time.min)
+    except ValueError:
+        raise ValidationError({name: "Informe uma data ou data e hora ISO."})
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class ActionLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Feed de auditoria, do mais recente ao mais antigo, paginado por
+    (action_date, id). Filtros: ``?user=``, ``?employee=``, ``?since=`` e
+    ``?until=``; cada combinação usa um dos índices de ``ActionLog``.
+
+    Registros mais antigos que a retenção ficam nos arquivos lidos por
+    ``accounts.archive.read``.
+    """
+
+    queryset = ActionLog.objects.all()
+    serializer_class = ActionLogSerializer
+    permission_classes = (IsAdminUser,)
+    keyset_ordering = ("-action_date", "-id")
+    filter_params = ("user", "employee")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+        filters = {name: params[name] for name in self.filter_params if params.get(name)}
+        for name, value in filters.items():
+            if not value.isdigit():
+                raise ValidationError({name: "Informe um id numérico."})
+        if params.get("since"):
+            filters["action_date__gte"] = parse_moment("since", params["since"])
+        if params.get("until"):
+            filters["action_date__lte"] = parse_moment("until", params["until"], end=True)
+        return queryset.filter(**filters)
@@ -0,0 +1,107 @@
+from datetime import date
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from employee import availability
+from employee.models import Employee
+from ..permissions import HasRolePermissions
+from ..serializers import UnavailabilitySerializer
+
+# Maior período aceito em uma consulta (dias)
+MAX_RANGE_DAYS = 366
+
+
+def _parse_date(params, name, required=True):
+    value = params.get(name)
+    if not value:
+        if required:
+            raise ValidationError({name: "Obrigatório (AAAA-MM-DD)."})
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: "Data inválida (AAAA-MM-DD)."})
+
+
+class AvailabilityMixin:
+    # Férias e licenças (inclusive médicas) de toda a equipe
+    permission_classes = (IsAuthenticated, HasRolePermissions)
+    required_permissions = ("Visualizar Relatórios",)
+
+    def get_filters(self):
+        params = self.request.query_params
+        role = params.get("role")
+        if role and not role.isdigit():
+            raise ValidationError({"role": "Informe o id do cargo."})
+        return {
+            "role": int(role) if role else None,
+            "include_pending": params.get("pending") in ("1", "true"),
+        }
+
+    def serializer_context(self, items):
+        ids = {item.employee_id for item in items}
+        names = dict(
+            Employee.objects.filter(id__in=ids).values_list("id", "display_name")
+        )
+        return {"employee_names": names}
+
+
+class AvailabilityView(AvailabilityMixin, APIView):
+    """
+    Quem está indisponível em ``?date=`` ou no período ``?start=&end=``.
+
+    Filtros: ``?role=`` (id do cargo) e ``?pending=1`` para incluir férias
+    e licenças ainda não aprovadas.
+    """
+
+    def get(self, request):
+        params = request.query_params
+        if params.get("date"):
+            start = end = _parse_date(params, "date")
+        else:
+            start = _parse_date(params, "start")
+            end = _parse_date(params, "end", required=False) or start
+        if end < start or (end - start).days > MAX_RANGE_DAYS:
+            raise ValidationError({"end": "Período inválido."})
+        items = availability.unavailable(start, end, **self.get_filters())
+        return Response(
+            {
+                "start": start,
+                "end": end,
+                "employees": sorted({item.employee_id for item in items}),
+                "results": UnavailabilitySerializer(
+                    items, many=True, context=self.serializer_context(items)
+                ).data,
+            }
+        )
+
+
+class TeamCalendarView(AvailabilityMixin, APIView):
+    """
+    Calendário do mês ``?month=AAAA-MM`` com as indisponibilidades por dia.
+    """
+
+    def get(self, request):
+        try:
+            year, month = map(int, request.query_params.get("month", "").split("-"))
+            date(year, month, 1)
+        except ValueError:
+            raise ValidationError({"month": "Informe o mês (AAAA-MM)."})
+        days = availability.team_calendar(year, month, **self.get_filters())
+        context = self.serializer_context(
+            {item for entries in days.values() for item in entries}
+        )
+        return Response(
+            {
+                "month": f"{year:04d}-{month:02d}",
+                "days": {
+                    day.isoformat(): UnavailabilitySerializer(
+                        entries, many=True, context=context
+                    ).data
+                    for day, entries in days.items()
+                },
+            }
+        )
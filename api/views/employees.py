@@ -0,0 +1,142 @@
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from employee.documents import VALIDATORS
+from employee.models import (
+    Absence,
+    Advance,
+    Employee,
+    Leave,
+    PaymentDetails,
+    PerformanceReview,
+    Salary,
+    SalaryDiscount,
+    Vacation,
+)
+from ..mixins import ConditionalGetMixin, SparseQuerysetMixin
+from ..permissions import HasRolePermissions
+from ..serializers import (
+    AbsenceSerializer,
+    AdvanceSerializer,
+    EmployeeSerializer,
+    LeaveSerializer,
+    PaymentDetailsSerializer,
+    PerformanceReviewSerializer,
+    SalaryDiscountSerializer,
+    SalarySerializer,
+    VacationSerializer,
+)
+
+
+class EmployeeViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
+    """
+    CRUD de funcionários, paginado por (hire_date, id).
+
+    Filtros: ``?employment_status=``, ``?contract_type=`` e ``?role=``.
+    """
+
+    queryset = Employee.objects.all()
+    serializer_class = EmployeeSerializer
+    permission_classes = (IsAuthenticated, HasRolePermissions)
+    # CPF, salários e dados bancários: mesma regra das exportações
+    required_permissions = ("Visualizar Relatórios",)
+    required_write_permissions = ("Gerenciar Usuários",)
+    keyset_ordering = ("hire_date", "id")
+    filter_params = ("employment_status", "contract_type", "role")
+    # Filtros que recebem ids
+    integer_params = ("role",)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        filters = {
+            name: self.request.query_params[name]
+            for name in self.filter_params
+            if self.request.query_params.get(name)
+        }
+        for name in self.integer_params:
+            if name in filters and not filters[name].isdigit():
+                raise ValidationError({name: "Informe um id numérico."})
+        return queryset.filter(**filters)
+
+    @action(detail=False, methods=["get"])
+    def lookup(self, request):
+        """
+        Busca um funcionário por documento em qualquer formato:
+        ``?document=123.456.789-09`` e, opcionalmente, ``?kind=cpf``
+        (``pis_pasep``, ``ctps`` ou ``cnh``).
+        """
+        document = request.query_params.get("document", "")
+        kind = request.query_params.get("kind") or None
+        if kind is not None and kind not in VALIDATORS:
+            raise ValidationError({"kind": f"Use um de: {', '.join(VALIDATORS)}."})
+        employees = list(self.get_queryset().by_document(document, kind=kind)[:2])
+        if not employees:
+            raise NotFound("Nenhum funcionário com este documento.")
+        if len(employees) > 1:
+            raise ValidationError({"document": "Documento ambíguo; informe o parâmetro kind."})
+        return Response(self.get_serializer(employees[0]).data)
+
+
+class EmployeeRecordViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
+    """
+    Base para os registros ligados a um funcionário, paginados por id e
+    filtráveis por ``?employee=``.
+    """
+
+    keyset_ordering = ("id",)
+    permission_classes = (IsAuthenticated, HasRolePermissions)
+    # CPF, salários e dados bancários: mesma regra das exportações
+    required_permissions = ("Visualizar Relatórios",)
+    required_write_permissions = ("Gerenciar Usuários",)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        employee = self.request.query_params.get("employee")
+        if employee:
+            if not employee.isdigit():
+                raise ValidationError({"employee": "Informe um id numérico."})
+            queryset = queryset.filter(employee_id=employee)
+        return queryset
+
+
+class SalaryViewSet(EmployeeRecordViewSet):
+    queryset = Salary.objects.all()
+    serializer_class = SalarySerializer
+
+
+class SalaryDiscountViewSet(EmployeeRecordViewSet):
+    queryset = SalaryDiscount.objects.all()
+    serializer_class = SalaryDiscountSerializer
+
+
+class AdvanceViewSet(EmployeeRecordViewSet):
+    queryset = Advance.objects.all()
+    serializer_class = AdvanceSerializer
+
+
+class VacationViewSet(EmployeeRecordViewSet):
+    queryset = Vacation.objects.all()
+    serializer_class = VacationSerializer
+
+
+class LeaveViewSet(EmployeeRecordViewSet):
+    queryset = Leave.objects.all()
+    serializer_class = LeaveSerializer
+
+
+class AbsenceViewSet(EmployeeRecordViewSet):
+    queryset = Absence.objects.all()
+    serializer_class = AbsenceSerializer
+
+
+class PerformanceReviewViewSet(EmployeeRecordViewSet):
+    queryset = PerformanceReview.objects.all()
+    serializer_class = PerformanceReviewSerializer
+
+
+class PaymentDetailsViewSet(EmployeeRecordViewSet):
+    queryset = PaymentDetails.objects.all()
+    serializer_class = PaymentDetailsSerializer
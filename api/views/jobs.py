@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.core.files.storage import storages
+from django.http import FileResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from jobs import queue
+from jobs.models import Job
+from ..serializers import JobSerializer
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Acompanhamento das tarefas em segundo plano. Cada usuário vê as que
+    pediu; a equipe vê todas e pode filtrar por ``?state=`` e ``?task=``.
+    """
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    keyset_ordering = ("-id",)
+    filter_params = ("state", "task")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        filters = {
+            name: self.request.query_params[name]
+            for name in self.filter_params
+            if self.request.query_params.get(name)
+        }
+        return queryset.filter(**filters)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        """
+        Cancela a tarefa se ela ainda não começou.
+        """
+        job = self.get_object()
+        if not queue.cancel(job):
+            raise ValidationError({"state": "Somente tarefas na fila podem ser canceladas."})
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """
+        Baixa o arquivo gerado por uma exportação concluída.
+        """
+        job = self.get_object()
+        name = (job.result or {}).get("file") if job.state == Job.SUCCEEDED else None
+        # Storage privado (fora de MEDIA_ROOT): este é o único acesso ao arquivo
+        if not name or not storages["jobs"].exists(name):
+            raise NotFound("Esta tarefa não gerou arquivo.")
+        return FileResponse(
+            storages["jobs"].open(name, "rb"),
+            as_attachment=True,
+            filename=job.result.get("filename"),
+            content_type=job.result.get("content_type"),
+        )
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser])
+    def metrics(self, request):
+        """
+        Profundidade da fila e latências; ``?minutes=`` define a janela.
+        """
+        try:
+            minutes = int(request.query_params.get("minutes", 60))
+        except ValueError:
+            raise ValidationError({"minutes": "Informe um número inteiro."})
+        return Response(
+            queue.metrics(window=timedelta(minutes=max(minutes, 1))),
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,42 @@
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from employee import search
+from ..permissions import HasRolePermissions
+
+# Tamanho mínimo da consulta para o autocompletar
+MIN_QUERY_LENGTH = 2
+
+
+class EmployeeSearchView(APIView):
+    """
+    Autocompletar de funcionários: ``?q=`` (nome, CPF, telefone ou cargo) e
+    ``?limit=`` (padrão 10, máximo ``search.MAX_LIMIT``).
+    """
+
+    # Devolve o CPF: mesma regra da API de funcionários
+    permission_classes = (IsAuthenticated, HasRolePermissions)
+    required_permissions = ("Visualizar Relatórios",)
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+        if len(query) < MIN_QUERY_LENGTH:
+            return Response({"results": []})
+        return Response(
+            {
+                "results": [
+                    {
+                        "id": document.employee_id,
+                        "name": document.name,
+                        "cpf": document.cpf,
+                        "role": document.role_name,
+                    }
+                    for document in search.search(query, limit=limit)
+                ]
+            }
+        )
@@ -13,4 +13,32 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'control.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importado após o setup do Django (usa settings e modelos)
+from notifications import asgi as notifications  # noqa: E402
+from notifications.hub import get_backend  # noqa: E402
+
+from . import staticfiles  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Arquivos estáticos e feed em tempo real (SSE e WebSocket); o resto
+    # segue para o Django
+    handler = staticfiles.route(scope) or notifications.route(scope)
+    if handler is not None:
+        return await handler(scope, receive, send)
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    return await django_application(scope, receive, send)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            get_backend().stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
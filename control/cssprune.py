@@ -0,0 +1,205 @@
+"""
+Remoção de regras CSS não usadas.
+
+Um seletor é removido quando referencia alguma classe que não aparece nos
+templates nem nos scripts do projeto. Regras com pelo menos um seletor
+usado são mantidas (só com os seletores usados); blocos ``@media``,
+``@supports`` e ``@layer`` são processados por dentro; ``@keyframes``,
+``@font-face`` e demais at-rules são mantidos como estão.
+
+A análise é propositalmente conservadora: classes dentro de parênteses
+(``:not(.x)``, ``:is(.x, .y)``) ou de seletores de atributo não contam,
+e os nomes em ``safelist`` (expressões regulares) são sempre mantidos,
+para classes montadas em tempo de execução pelo JavaScript.
+"""
+
+import re
+from pathlib import Path
+
+# At-rules cujo conteúdo são regras comuns, processadas recursivamente
+NESTED_AT_RULES = {"media", "supports", "layer", "container", "document"}
+
+_CLASS = re.compile(r"\.((?:-?[_a-zA-Z]|\\.)(?:[\w-]|\\.)*)")
+_ESCAPE = re.compile(r"\\(.)")
+_WORD = re.compile(r"[\w/:@%-]+")
+_NAME = re.compile(r"[\w-]+")
+_STRING = re.compile(r"\"(?:[^\"\\\n]|\\.)*\"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`")
+
+
+def _skip_string(css, index):
+    quote = css[index]
+    index += 1
+    while index < len(css) and css[index] != quote:
+        index += 2 if css[index] == "\\" else 1
+    return index + 1
+
+
+def _skip_comment(css, index):
+    end = css.find("*/", index + 2)
+    return len(css) if end == -1 else end + 2
+
+
+def _find(css, index, stops):
+    """
+    Posição do próximo caractere de ``stops`` fora de strings e comentários.
+    """
+    while index < len(css):
+        char = css[index]
+        if char in "\"'":
+            index = _skip_string(css, index)
+        elif css.startswith("/*", index):
+            index = _skip_comment(css, index)
+        elif char in stops:
+            return index
+        else:
+            index += 1
+    return len(css)
+
+
+def _block_end(css, index):
+    """
+    Posição logo após a ``}`` que fecha o bloco aberto em ``index``.
+    """
+    depth = 0
+    while index < len(css):
+        index = _find(css, index, "{}")
+        if index >= len(css):
+            break
+        depth += 1 if css[index] == "{" else -1
+        index += 1
+        if depth == 0:
+            return index
+    return len(css)
+
+
+def _split_selectors(prelude):
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(prelude):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(prelude[start:index])
+            start = index + 1
+    parts.append(prelude[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _strip_nested(selector):
+    # Remove o conteúdo de parênteses e colchetes
+    result, depth = [], 0
+    for char in selector:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif depth == 0:
+            result.append(char)
+    return "".join(result)
+
+
+def selector_classes(selector):
+    """
+    Classes que o seletor exige do elemento (fora de parênteses).
+    """
+    return {
+        _ESCAPE.sub(r"\1", name)
+        for name in _CLASS.findall(_strip_nested(selector))
+    }
+
+
+class Pruner:
+    def __init__(self, used, safelist=()):
+        self.used = set(used)
+        self.safelist = [re.compile(pattern) for pattern in safelist]
+        self._cache = {}
+
+    def is_used(self, name):
+        known = self._cache.get(name)
+        if known is None:
+            known = name in self.used or any(
+                pattern.search(name) for pattern in self.safelist
+            )
+            self._cache[name] = known
+        return known
+
+    def keep_selector(self, selector):
+        return all(self.is_used(name) for name in selector_classes(selector))
+
+    def prune(self, css):
+        out = []
+        index = 0
+        while index < len(css):
+            start = index
+            while index < len(css) and css[index].isspace():
+                index += 1
+            if css.startswith("/*", index):
+                end = _skip_comment(css, index)
+                # Comentários de licença (/*! ... */) são preservados
+                if css.startswith("/*!", index):
+                    out.append(css[index:end])
+                index = end
+                continue
+            if index >= len(css):
+                break
+            brace = _find(css, index, "{;}")
+            if brace >= len(css) or css[brace] == "}":
+                # Texto solto ou chave sobrando: mantido como está
+                out.append(css[start:brace + 1])
+                index = brace + 1
+                continue
+            prelude = css[index:brace].strip()
+            if css[brace] == ";":
+                # At-rule sem bloco (@charset, @import, @namespace)
+                out.append(css[index:brace + 1])
+                index = brace + 1
+                continue
+            end = _block_end(css, brace)
+            body = css[brace + 1:end - 1]
+            index = end
+            if prelude.startswith("@"):
+                name = re.match(r"@([\w-]+)", prelude)
+                if name and name.group(1).lower() in NESTED_AT_RULES:
+                    inner = self.prune(body)
+                    if inner.strip():
+                        out.append(f"{prelude}{{{inner}}}")
+                else:
+                    out.append(f"{prelude}{{{body}}}")
+                continue
+            selectors = [s for s in _split_selectors(prelude) if self.keep_selector(s)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{body.strip()}}}")
+        return "\n".join(out)
+
+
+def used_classes(paths):
+    """
+    Nomes candidatos a classe encontrados nos arquivos: nos templates
+    qualquer palavra conta; nos scripts, só as palavras dentro de strings
+    (``classList.add("show")``, ``querySelector(".menu-item")``).
+    """
+    names = set()
+    for path in paths:
+        text = Path(path).read_text(encoding="utf-8", errors="ignore")
+        if Path(path).suffix == ".js":
+            for literal in _STRING.findall(text):
+                names.update(_WORD.findall(literal))
+                names.update(_NAME.findall(literal))
+                names.update(part.strip(".") for part in literal[1:-1].split())
+        else:
+            names.update(_WORD.findall(text))
+            names.update(_NAME.findall(text))
+    return names
+
+
+def source_paths(base_dir, patterns):
+    base_dir = Path(base_dir)
+    paths = set()
+    for pattern in patterns:
+        paths.update(path for path in base_dir.glob(pattern) if path.is_file())
+    return sorted(paths)
+
+
+def prune_css(css, used, safelist=()):
+    return Pruner(used, safelist).prune(css)
@@ -0,0 +1,113 @@
+"""
+Leituras nas réplicas do banco (``DATABASE_REPLICAS``).
+
+As réplicas só são usadas dentro de ``replicas()``: o
+``ReplicaRoutingMiddleware`` liga o roteamento nas requisições GET/HEAD
+e relatórios em segundo plano podem usá-lo explicitamente. Fora disso
+(workers, comandos, requisições que alteram dados) tudo vai ao primário.
+
+Para o usuário ler o que acabou de gravar (read-your-writes), qualquer
+escrita na requisição fixa as leituras seguintes no primário e grava um
+cookie que mantém o usuário no primário por
+``DATABASE_STICKY_SECONDS``, tempo maior que o atraso de replicação.
+"""
+
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Apps sempre lidas do primário (a sessão recém-criada no login precisa
+# ser encontrada na requisição seguinte)
+PRIMARY_APPS = {"sessions"}
+
+_routing = contextvars.ContextVar("db_routing", default=None)
+
+
+class _Routing:
+    def __init__(self, allowed):
+        # Leituras podem ir às réplicas
+        self.allowed = allowed
+        # Houve escrita no primário durante o bloco
+        self.wrote = False
+
+
+@contextmanager
+def replicas(allowed=True):
+    """
+    Envia as leituras do bloco às réplicas (até a primeira escrita).
+    Retorna o estado, com ``wrote`` indicando se houve escrita.
+    """
+    state = _Routing(allowed)
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        aliases = replica_aliases()
+        if state is None or not state.allowed or state.wrote or not aliases:
+            return None
+        if model._meta.app_label in PRIMARY_APPS:
+            return None
+        # Dentro de uma transação a leitura precisa ver as escritas dela
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Leituras de requisições GET/HEAD nas réplicas, exceto para usuários que
+    gravaram algo há menos de ``DATABASE_STICKY_SECONDS``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        cookie = settings.DATABASE_STICKY_COOKIE
+        allowed = request.method in SAFE_METHODS and cookie not in request.COOKIES
+        with replicas(allowed) as state:
+            response = self.get_response(request)
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                cookie,
+                "1",
+                max_age=settings.DATABASE_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
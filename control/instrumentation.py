@@ -0,0 +1,235 @@
+"""
+Instrumentação por requisição, sempre ligada em produção:
+
+- tempo total, tempo e quantidade de consultas ao banco e tempo de
+  renderização de templates, enviados no cabeçalho ``Server-Timing``
+  (visível na aba de rede do navegador);
+- consultas repetidas com a mesma forma (impressão digital do SQL), sinal
+  típico de N+1;
+- log estruturado (JSON) das requisições acima de
+  ``INSTRUMENTATION_SLOW_MS``;
+- agregados por nome de URL numa janela móvel em memória, consultáveis
+  pela equipe em ``/instrumentation/``. Cada processo tem a sua janela.
+"""
+
+import contextvars
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+logger = logging.getLogger(__name__)
+
+# Consultas repetidas exibidas no log de requisições lentas
+MAX_DUPLICATES_LOGGED = 5
+
+_current = contextvars.ContextVar("request_stats", default=None)
+_IN_LIST = re.compile(r"\bIN \((?:%s,\s*)*%s\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Forma da consulta: os parâmetros já vêm separados (``%s``); listas de
+    ``IN`` de qualquer tamanho contam como a mesma consulta.
+    """
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", sql)).strip()
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.fingerprints = Counter()
+        self.template_time = 0.0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: cronometra cada consulta de todas as conexões
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold):
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+class InstrumentedTemplate(django_backend.Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        # Só o template de fora conta; includes e extends já estão dentro
+        if stats is None or stats.rendering:
+            return super().render(context, request)
+        stats.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - started
+            stats.rendering = False
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """
+    Backend de templates do Django que mede o tempo de renderização das
+    requisições instrumentadas.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Window:
+    """
+    Amostras recentes por nome de URL: no máximo ``size`` por URL e nenhuma
+    mais velha que ``seconds``.
+    """
+
+    def __init__(self, seconds, size):
+        self.seconds = seconds
+        self.size = size
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, sample):
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.size)
+            samples.append(sample)
+
+    def summary(self):
+        cutoff = time.time() - self.seconds
+        with self.lock:
+            for name in list(self.samples):
+                samples = self.samples[name]
+                while samples and samples[0][0] < cutoff:
+                    samples.popleft()
+                if not samples:
+                    del self.samples[name]
+            snapshot = {name: list(samples) for name, samples in self.samples.items()}
+        summary = {}
+        for name, samples in snapshot.items():
+            totals = [sample[1] for sample in samples]
+            queries = [sample[3] for sample in samples]
+            summary[name] = {
+                "samples": len(samples),
+                "total_p50_ms": round(_percentile(totals, 0.5), 2),
+                "total_p95_ms": round(_percentile(totals, 0.95), 2),
+                "total_max_ms": round(max(totals), 2),
+                "db_avg_ms": round(sum(s[2] for s in samples) / len(samples), 2),
+                "queries_avg": round(sum(queries) / len(queries), 1),
+                "queries_max": max(queries),
+                "template_avg_ms": round(sum(s[4] for s in samples) / len(samples), 2),
+                "errors": sum(1 for sample in samples if sample[5] >= 500),
+                "duplicated_queries": sum(1 for sample in samples if sample[6]),
+            }
+        # As URLs mais lentas primeiro
+        ranked = sorted(
+            summary.items(), key=lambda item: item[1]["total_p95_ms"], reverse=True
+        )
+        return dict(ranked)
+
+
+window = Window(
+    settings.INSTRUMENTATION_WINDOW_SECONDS, settings.INSTRUMENTATION_WINDOW_SIZE
+)
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats)
+        return response
+
+    def record(self, request, response, stats):
+        total = (time.perf_counter() - stats.started) * 1000
+        db = stats.db_time * 1000
+        template = stats.template_time * 1000
+        duplicates = stats.duplicates(settings.INSTRUMENTATION_DUPLICATE_THRESHOLD)
+
+        if settings.INSTRUMENTATION_SERVER_TIMING:
+            response["Server-Timing"] = ", ".join(
+                (
+                    f"total;dur={total:.1f}",
+                    f'db;dur={db:.1f};desc="{stats.queries} consultas"',
+                    f"tpl;dur={template:.1f}",
+                    f"app;dur={max(total - db - template, 0):.1f}",
+                )
+            )
+
+        match = getattr(request, "resolver_match", None)
+        name = (match.view_name if match else None) or "<sem rota>"
+        if random.random() < settings.INSTRUMENTATION_SAMPLE_RATE:
+            window.add(
+                name,
+                (
+                    time.time(),
+                    total,
+                    db,
+                    stats.queries,
+                    template,
+                    response.status_code,
+                    bool(duplicates),
+                ),
+            )
+
+        if total >= settings.INSTRUMENTATION_SLOW_MS:
+            entry = {
+                "event": "slow_request",
+                "method": request.method,
+                "path": request.path,
+                "view": name,
+                "status": response.status_code,
+                "total_ms": round(total, 1),
+                "db_ms": round(db, 1),
+                "queries": stats.queries,
+                "template_ms": round(template, 1),
+                "duplicated_queries": [
+                    {"sql": sql, "count": count}
+                    for sql, count in duplicates[:MAX_DUPLICATES_LOGGED]
+                ],
+            }
+            logger.warning(
+                json.dumps(entry, ensure_ascii=False), extra={"request_stats": entry}
+            )
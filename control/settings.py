@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os 
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,51 +47,90 @@ DJANGO_APPS = [
 ]
 
 
-THIRD_PARTY_APPS = []
+THIRD_PARTY_APPS = [
+    "rest_framework",
+]
 
 LOCAL_APPS = [
     "accounts",
     "api",
     "employee",
+    "jobs",
+    "notifications",
 ]
 
 AUTHENTICATION_BACKENDS = [
-    'account.backends.EmailBackend',  # Backend personalizado
-    'django.contrib.auth.backends.ModelBackend',  # Backend padrão
+    'accounts.backends.EmailBackend',  # Backend personalizado
+    'accounts.backends.CachedUserBackend',  # Backend padrão com cache do usuário
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
+# Limite de tentativas de login com falha (accounts/throttle.py)
+# Janela deslizante em segundos
+LOGIN_THROTTLE_WINDOW = config("LOGIN_THROTTLE_WINDOW", default=300, cast=int)
+# Falhas permitidas por IP na janela
+LOGIN_THROTTLE_IP_LIMIT = config("LOGIN_THROTTLE_IP_LIMIT", default=20, cast=int)
+# Falhas permitidas por conta (e-mail) na janela
+LOGIN_THROTTLE_ACCOUNT_LIMIT = config("LOGIN_THROTTLE_ACCOUNT_LIMIT", default=5, cast=int)
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
-    ]
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+    # Paginação por chave (keyset); veja api/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
 }
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'control.staticfiles.StaticFilesMiddleware',
+    'control.instrumentation.InstrumentationMiddleware',
+    'control.db.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'accounts.middleware.ActionLogBufferMiddleware',
 ]
 
 ROOT_URLCONF = 'control.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que mede o tempo de renderização por requisição
+        'BACKEND': 'control.instrumentation.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                # Chaves dos fragmentos em cache do layout (menu e cabeçalho)
+                'employee.context_processors.fragment_cache',
+            ],
+            # Templates compilados uma vez por processo e mantidos em memória;
+            # com DEBUG o autoreload do runserver limpa o cache ao editar
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
             ],
         },
     },
@@ -102,13 +142,81 @@ WSGI_APPLICATION = 'control.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# Backend do banco: SQLite por padrão (control.sqlite3 = backend do Django
+# com PRAGMAs por conexão e BEGIN IMMEDIATE) ou um servidor
+# (django.db.backends.postgresql, django.db.backends.mysql)
+DB_ENGINE = config("DB_ENGINE", default="control.sqlite3")
+
+# PRAGMAs executados em cada conexão SQLite. WAL: leitores não bloqueiam o
+# escritor (nem o contrário); synchronous=NORMAL é seguro com WAL e evita um
+# fsync por commit; mmap_size em bytes; cache_size negativo é em KiB;
+# busy_timeout (ms) espera a trava em vez de falhar com "database is locked"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": config("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024, cast=int),
+    "cache_size": config("SQLITE_CACHE_SIZE", default=-64000, cast=int),
+    "busy_timeout": config("SQLITE_BUSY_TIMEOUT", default=20000, cast=int),
+    "temp_store": "MEMORY",
 }
 
+if DB_ENGINE in ("control.sqlite3", "django.db.backends.sqlite3"):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'control.sqlite3',
+            'NAME': config("DB_NAME", default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                'init_command': ";".join(
+                    f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+                ),
+                # Transações reservam a escrita já no BEGIN
+                'transaction_mode': config(
+                    "SQLITE_TRANSACTION_MODE", default="IMMEDIATE"
+                ),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config("DB_NAME"),
+            'USER': config("DB_USER", default=""),
+            'PASSWORD': config("DB_PASSWORD", default=""),
+            'HOST': config("DB_HOST", default=""),
+            'PORT': config("DB_PORT", default=""),
+            'OPTIONS': {},
+        }
+    }
+    # Atrás de um pool externo em modo transação (PgBouncer), cursores no
+    # servidor não sobrevivem entre transações
+    if DB_ENGINE.endswith("postgresql") and config("DB_POOLER", default=False, cast=bool):
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Conexões persistentes: reaproveitadas por até CONN_MAX_AGE segundos em
+# cada thread (None = sem limite) e testadas antes do reuso
+DATABASES['default']['CONN_MAX_AGE'] = config("DB_CONN_MAX_AGE", default=60, cast=int)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = config(
+    "DB_CONN_HEALTH_CHECKS", default=True, cast=bool
+)
+
+# Réplicas somente leitura (hosts separados por vírgula) com as mesmas
+# credenciais do primário; veja control/db.py
+DATABASE_REPLICAS = []
+for index, host in enumerate(config("DB_REPLICA_HOSTS", default="", cast=Csv())):
+    alias = f"replica{index + 1}"
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['control.db.ReplicaRouter']
+# Cookie que mantém no primário quem gravou algo, e por quantos segundos
+DATABASE_STICKY_COOKIE = "db_primary"
+DATABASE_STICKY_SECONDS = config("DATABASE_STICKY_SECONDS", default=10, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -154,6 +262,41 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = 'login'
 AUTH_USER_MODEL = 'accounts.User'
 
+# Cache do Django. Com mais de um processo (gunicorn com vários workers,
+# runworker, ASGI) use um backend compartilhado: Redis
+# (django.core.cache.backends.redis.RedisCache, LOCATION redis://host:6379/0)
+# ou banco (django.core.cache.backends.db.DatabaseCache, LOCATION = nome da
+# tabela criada com manage.py createcachetable). O padrão em memória serve
+# só para um processo: cada worker teria o seu cache e as invalidações
+# feitas em um não chegariam aos outros
+CACHE_BACKEND = config(
+    "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+)
+CACHE_LOCATION = config("CACHE_LOCATION", default="")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": CACHE_LOCATION,
+    },
+}
+# O cache é visto por todos os processos (não é em memória nem dummy)
+SHARED_CACHE = CACHE_BACKEND not in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# Sessões: com cache compartilhado, lidas do cache com cópia no banco
+# (cached_db), sem consultar a tabela de sessões com o cache aquecido;
+# com cache local, só no banco, para o logout valer em todos os processos
+SESSION_ENGINE = config(
+    "SESSION_ENGINE",
+    default=(
+        "django.contrib.sessions.backends.cached_db"
+        if SHARED_CACHE
+        else "django.contrib.sessions.backends.db"
+    ),
+)
+
 # URL para acessar arquivos estáticos
 STATIC_URL = '/static/'
 
@@ -163,5 +306,162 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 # Diretório onde os arquivos estáticos serão coletados no ambiente de produção
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Storage do collectstatic: em produção, nomes com hash do conteúdo, CSS
+# sem regras não usadas e variantes .gz/.br (control/storage.py)
+STATICFILES_STORAGE_BACKEND = config(
+    "STATICFILES_STORAGE_BACKEND",
+    default=(
+        "django.contrib.staticfiles.storage.StaticFilesStorage"
+        if DEBUG
+        else "control.storage.CompressedManifestStaticFilesStorage"
+    ),
+)
+# Arquivos das tarefas em segundo plano (exportações geradas e planilhas
+# enviadas para importação), fora de MEDIA_ROOT: não têm URL pública e só
+# são baixados pela ação autenticada JobViewSet.download
+JOBS_FILES_ROOT = config("JOBS_FILES_ROOT", default=str(BASE_DIR / "private" / "jobs"))
+# Arquivos enviados (``uploads/...``) e envios em andamento, também fora de
+# MEDIA_ROOT: só são baixados pelas views autenticadas (employee.uploads.serve)
+UPLOADS_FILES_ROOT = config("UPLOADS_FILES_ROOT", default=str(BASE_DIR / "private"))
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": STATICFILES_STORAGE_BACKEND},
+    "jobs": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": JOBS_FILES_ROOT},
+    },
+    "uploads": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": UPLOADS_FILES_ROOT},
+    },
+}
+# Serve STATIC_ROOT pela própria aplicação, sem nginx (control/staticfiles.py)
+STATIC_SERVE = config("STATIC_SERVE", default=False, cast=bool)
+# Cache (segundos) dos arquivos estáticos sem hash no nome
+STATIC_MAX_AGE = config("STATIC_MAX_AGE", default=60, cast=int)
+# CSS cujas regras não usadas são removidas no collectstatic
+STATICFILES_PRUNE_CSS = ["assets/css/style.bundle.css"]
+# Arquivos (relativos a BASE_DIR) onde as classes usadas são procuradas
+STATICFILES_PRUNE_SOURCES = [
+    "templates/**/*.html",
+    "*/templates/**/*.html",
+    "static/assets/js/**/*.js",
+    "static/assets/plugins/**/*.js",
+]
+# Classes sempre mantidas (regex), aplicadas pelo JavaScript em tempo de execução
+STATICFILES_PRUNE_SAFELIST = [
+    r"^(show|showing|hide|hiding|active|disabled|fade|collapsing|collapsed)$",
+    r"^(modal|tooltip|popover|toast|offcanvas|dropdown|drawer|menu|swal2)-",
+    r"^(is|was|has)-",
+    r"^bs-",
+]
+
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Registro de ações (ActionLog)
+# Tamanho máximo de cada bulk_create de registros
+ACTION_LOG_BATCH_SIZE = config("ACTION_LOG_BATCH_SIZE", default=500, cast=int)
+# Grava os registros em uma thread em segundo plano em vez de no fim da requisição
+ACTION_LOG_BACKGROUND_WRITER = config(
+    "ACTION_LOG_BACKGROUND_WRITER", default=False, cast=bool
+)
+# Intervalo máximo (segundos) entre gravações da thread em segundo plano
+ACTION_LOG_FLUSH_INTERVAL = config("ACTION_LOG_FLUSH_INTERVAL", default=2.0, cast=float)
+# Capacidade da fila da thread; acima disso a gravação volta a ser síncrona
+ACTION_LOG_QUEUE_SIZE = config("ACTION_LOG_QUEUE_SIZE", default=10000, cast=int)
+# Dias de ActionLog mantidos no banco; os mais antigos vão para os arquivos
+ACTION_LOG_RETENTION_DAYS = config("ACTION_LOG_RETENTION_DAYS", default=180, cast=int)
+# Pasta dos arquivos JSONL compactados (fora de MEDIA_ROOT: não é pública)
+ACTION_LOG_ARCHIVE_DIR = config(
+    "ACTION_LOG_ARCHIVE_DIR", default=str(BASE_DIR / "archive" / "action_logs")
+)
+# Registros arquivados e apagados por transação
+ACTION_LOG_ARCHIVE_BATCH_SIZE = config(
+    "ACTION_LOG_ARCHIVE_BATCH_SIZE", default=5000, cast=int
+)
+
+# Envio e download de arquivos (employee.uploads)
+# Tamanho dos blocos lidos e gravados em disco
+UPLOADS_CHUNK_SIZE = config("UPLOADS_CHUNK_SIZE", default=1024 * 1024, cast=int)
+# Tamanho máximo de um arquivo (bytes)
+UPLOADS_MAX_SIZE = config("UPLOADS_MAX_SIZE", default=200 * 1024 * 1024, cast=int)
+# Cabeçalho para delegar downloads ao servidor web (ex.: X-Accel-Redirect,
+# X-Sendfile); vazio serve o arquivo pelo Django
+UPLOADS_SENDFILE_HEADER = config("UPLOADS_SENDFILE_HEADER", default="")
+# Prefixo interno concatenado ao caminho do arquivo nesse cabeçalho (o
+# servidor web deve mapeá-lo para UPLOADS_FILES_ROOT)
+UPLOADS_SENDFILE_PREFIX = config("UPLOADS_SENDFILE_PREFIX", default="/protected/")
+
+# Miniaturas e pré-visualizações (employee.derivatives)
+# Larguras máximas (px) de cada tamanho disponível
+DERIVATIVE_SIZES = {"thumb": 128, "small": 320, "medium": 800}
+# Formato e qualidade dos arquivos gerados
+DERIVATIVES_FORMAT = config("DERIVATIVES_FORMAT", default="webp")
+DERIVATIVES_QUALITY = config("DERIVATIVES_QUALITY", default=80, cast=int)
+# Processos do pool de geração (0 gera na própria requisição)
+DERIVATIVES_WORKERS = config("DERIVATIVES_WORKERS", default=2, cast=int)
+# Espaço máximo em disco; os menos usados recentemente são apagados
+DERIVATIVES_MAX_BYTES = config(
+    "DERIVATIVES_MAX_BYTES", default=512 * 1024 * 1024, cast=int
+)
+
+# Fila de tarefas em segundo plano (jobs)
+# Threads ou processos por worker (manage.py runworker)
+JOBS_WORKERS = config("JOBS_WORKERS", default=4, cast=int)
+# Tipo de pool do worker: "thread" ou "process"
+JOBS_WORKER_MODE = config("JOBS_WORKER_MODE", default="thread")
+# Segundos entre consultas quando a fila está vazia
+JOBS_POLL_INTERVAL = config("JOBS_POLL_INTERVAL", default=1.0, cast=float)
+# Validade da reserva de uma tarefa; renovada enquanto ela executa
+JOBS_LEASE_SECONDS = config("JOBS_LEASE_SECONDS", default=300, cast=int)
+# Tentativas por tarefa e espera base (segundos) entre elas
+JOBS_MAX_ATTEMPTS = config("JOBS_MAX_ATTEMPTS", default=3, cast=int)
+JOBS_RETRY_DELAY = config("JOBS_RETRY_DELAY", default=30, cast=int)
+
+# Feed em tempo real por SSE/WebSocket (notifications, somente via ASGI)
+# Canal entre processos: LocalBackend (um único processo ASGI) ou
+# DatabaseBackend (vários processos, sem broker)
+NOTIFICATIONS_BACKEND = config(
+    "NOTIFICATIONS_BACKEND", default="notifications.backends.LocalBackend"
+)
+# Eventos pendentes por conexão antes de descartar os mais antigos
+NOTIFICATIONS_QUEUE_SIZE = config("NOTIFICATIONS_QUEUE_SIZE", default=100, cast=int)
+# Segundos entre pings em conexões ociosas
+NOTIFICATIONS_HEARTBEAT = config("NOTIFICATIONS_HEARTBEAT", default=25.0, cast=float)
+# Espera sugerida ao navegador antes de reconectar o EventSource (ms)
+NOTIFICATIONS_RETRY_MS = config("NOTIFICATIONS_RETRY_MS", default=3000, cast=int)
+# Lotes de ActionLog maiores que isto viram um único evento
+NOTIFICATIONS_MAX_BATCH_EVENTS = config(
+    "NOTIFICATIONS_MAX_BATCH_EVENTS", default=20, cast=int
+)
+# DatabaseBackend: intervalo de leitura e tempo de guarda dos eventos (s)
+NOTIFICATIONS_POLL_INTERVAL = config(
+    "NOTIFICATIONS_POLL_INTERVAL", default=1.0, cast=float
+)
+NOTIFICATIONS_RETENTION = config("NOTIFICATIONS_RETENTION", default=3600, cast=int)
+
+# Cache de fragmentos de template (employee.fragments)
+# Tempo de vida (segundos) do menu lateral e do cabeçalho do usuário em cache
+TEMPLATE_FRAGMENT_TIMEOUT = config("TEMPLATE_FRAGMENT_TIMEOUT", default=600, cast=int)
+
+# Instrumentação por requisição (control/instrumentation.py)
+# Requisições mais lentas que isto (ms) vão para o log estruturado
+INSTRUMENTATION_SLOW_MS = config("INSTRUMENTATION_SLOW_MS", default=500, cast=float)
+# Repetições da mesma consulta numa requisição para indicar N+1
+INSTRUMENTATION_DUPLICATE_THRESHOLD = config(
+    "INSTRUMENTATION_DUPLICATE_THRESHOLD", default=3, cast=int
+)
+# Envia o cabeçalho Server-Timing nas respostas
+INSTRUMENTATION_SERVER_TIMING = config(
+    "INSTRUMENTATION_SERVER_TIMING", default=True, cast=bool
+)
+# Fração das requisições guardadas nos agregados por URL
+INSTRUMENTATION_SAMPLE_RATE = config(
+    "INSTRUMENTATION_SAMPLE_RATE", default=1.0, cast=float
+)
+# Janela dos agregados: segundos e amostras máximas por URL
+INSTRUMENTATION_WINDOW_SECONDS = config(
+    "INSTRUMENTATION_WINDOW_SECONDS", default=300, cast=int
+)
+INSTRUMENTATION_WINDOW_SIZE = config("INSTRUMENTATION_WINDOW_SIZE", default=1000, cast=int)
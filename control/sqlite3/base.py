@@ -0,0 +1,46 @@
+"""
+Backend SQLite do Django com as opções ``init_command`` e
+``transaction_mode`` (as mesmas do Django 5.1):
+
+- ``init_command``: comandos separados por ``;`` executados em cada nova
+  conexão (``PRAGMA journal_mode=WAL``, ``synchronous``, ``mmap_size``...);
+- ``transaction_mode``: ``IMMEDIATE`` reserva a escrita já no ``BEGIN``.
+  Com o padrão (``DEFERRED``), duas transações que leem e depois escrevem
+  disputam a promoção da trava e uma delas falha na hora com "database is
+  locked", sem respeitar o ``busy_timeout``.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = {"DEFERRED", "IMMEDIATE", "EXCLUSIVE"}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.init_commands = [
+            command.strip()
+            for command in params.pop("init_command", "").split(";")
+            if command.strip()
+        ]
+        mode = params.pop("transaction_mode", None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode inválido: {mode!r} "
+                f"(use {', '.join(sorted(TRANSACTION_MODES))})."
+            )
+        self.transaction_mode = mode.upper() if mode else None
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for command in self.init_commands:
+            conn.execute(command)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
+        else:
+            super()._start_transaction_under_autocommit()
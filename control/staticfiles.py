@@ -0,0 +1,276 @@
+"""
+Servidor dos arquivos de ``STATIC_ROOT`` para quando não há nginx na
+frente da aplicação (``STATIC_SERVE``).
+
+- Escolhe a variante ``.br`` ou ``.gz`` gerada pelo ``collectstatic``
+  (``control.storage``) conforme o ``Accept-Encoding``, sem comprimir nada
+  durante a requisição.
+- Nomes com hash do conteúdo recebem ``Cache-Control: immutable`` de um
+  ano; os demais, ``STATIC_MAX_AGE`` segundos.
+- Envio sem cópia: no WSGI o ``FileResponse`` usa o ``wsgi.file_wrapper``
+  do servidor (``sendfile`` no gunicorn); no ASGI usa a extensão
+  ``http.response.zerocopy`` quando o servidor a oferece.
+"""
+
+import asyncio
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+from dataclasses import dataclass
+from email.utils import formatdate
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+
+# Nome gerado pelo ManifestStaticFilesStorage (hash de 12 caracteres)
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[^/]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Preferência entre as variantes comprimidas
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# Blocos lidos quando o servidor ASGI não oferece envio sem cópia
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    path: str
+    size: int
+    content_type: str
+    cache_control: str
+    last_modified: str
+    etag: str
+    # {"br": (caminho, tamanho), "gzip": (...)}
+    variants: dict
+
+
+def _accepted(header):
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFiles:
+    """
+    Índice em memória dos arquivos de ``root``. Cada arquivo é consultado
+    no disco (``stat``) uma única vez por processo: depois do deploy o
+    conteúdo de ``STATIC_ROOT`` não muda.
+    """
+
+    def __init__(self, root, prefix, max_age):
+        self.root = os.path.realpath(root)
+        self.prefix = prefix
+        self.max_age = max_age
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def matches(self, path):
+        return path.startswith(self.prefix)
+
+    def find(self, path):
+        """
+        Arquivo correspondente ao caminho da URL, ou ``None``.
+        """
+        name = posixpath.normpath(path[len(self.prefix):]).lstrip("/")
+        if name.startswith("..") or not name or name == ".":
+            return None
+        found = self._files.get(name)
+        if found is None:
+            found = self._load(name)
+            if found is not None:
+                with self._lock:
+                    self._files[name] = found
+        return found
+
+    def _load(self, name):
+        path = os.path.join(self.root, *name.split("/"))
+        if not os.path.realpath(path).startswith(self.root + os.sep):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            try:
+                variants[encoding] = (path + suffix, os.stat(path + suffix).st_size)
+            except OSError:
+                pass
+        content_type, _ = mimetypes.guess_type(name)
+        if content_type is None:
+            content_type = "application/octet-stream"
+        elif content_type.startswith("text/") or content_type.endswith("javascript"):
+            content_type += "; charset=utf-8"
+        if HASHED_NAME.search(name):
+            cache_control = IMMUTABLE
+        else:
+            cache_control = f"public, max-age={self.max_age}"
+        return StaticFile(
+            path=path,
+            size=stat.st_size,
+            content_type=content_type,
+            cache_control=cache_control,
+            last_modified=formatdate(stat.st_mtime, usegmt=True),
+            etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            variants=variants,
+        )
+
+    def select(self, found, accept_encoding):
+        """
+        ``(caminho, tamanho, encoding, etag)`` da melhor variante aceita.
+        """
+        if found.variants and accept_encoding:
+            accepted = _accepted(accept_encoding)
+            for encoding, _ in ENCODINGS:
+                if encoding in found.variants and (
+                    encoding in accepted or "*" in accepted
+                ):
+                    path, size = found.variants[encoding]
+                    return path, size, encoding, f'{found.etag[:-1]}-{encoding}"'
+        return found.path, found.size, None, found.etag
+
+    def headers(self, found, size, encoding, etag):
+        headers = {
+            "Content-Type": found.content_type,
+            "Content-Length": str(size),
+            "Cache-Control": found.cache_control,
+            "Last-Modified": found.last_modified,
+            "ETag": etag,
+        }
+        if found.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def _from_settings():
+    if not settings.STATIC_SERVE or not settings.STATIC_ROOT:
+        return None
+    return StaticFiles(settings.STATIC_ROOT, settings.STATIC_URL, settings.STATIC_MAX_AGE)
+
+
+class StaticFilesMiddleware:
+    """
+    Serve ``STATIC_ROOT`` antes do restante da pilha (WSGI). Fica no
+    início de ``MIDDLEWARE``, logo após o ``SecurityMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.files = _from_settings()
+        if self.files is None:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        if request.method not in ("GET", "HEAD") or not self.files.matches(request.path):
+            return self.get_response(request)
+        found = self.files.find(request.path)
+        if found is None:
+            return self.get_response(request)
+        path, size, encoding, etag = self.files.select(
+            found, request.headers.get("Accept-Encoding", "")
+        )
+        headers = self.files.headers(found, size, encoding, etag)
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            response = HttpResponseNotModified()
+            for name in ("Cache-Control", "ETag", "Vary"):
+                if name in headers:
+                    response[name] = headers[name]
+            return response
+        if request.method == "HEAD":
+            response = HttpResponse()
+        else:
+            response = FileResponse(open(path, "rb"))
+        for name, value in headers.items():
+            response[name] = value
+        # FileResponse adiciona o nome do arquivo (.gz/.br); aqui não se aplica
+        response.headers.pop("Content-Disposition", None)
+        return response
+
+
+_asgi_files = None
+_asgi_lock = threading.Lock()
+
+
+def route(scope):
+    """
+    Handler ASGI para o escopo, ou ``None`` para seguir ao Django.
+    """
+    global _asgi_files
+    if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+        return None
+    if _asgi_files is None:
+        with _asgi_lock:
+            if _asgi_files is None:
+                _asgi_files = _from_settings() or False
+    if not _asgi_files or not _asgi_files.matches(scope["path"]):
+        return None
+    if _asgi_files.find(scope["path"]) is None:
+        return None
+    return serve
+
+
+async def serve(scope, receive, send):
+    files = _asgi_files
+    request_headers = {
+        name.decode("latin-1").lower(): value.decode("latin-1")
+        for name, value in scope.get("headers", ())
+    }
+    found = files.find(scope["path"])
+    path, size, encoding, etag = files.select(
+        found, request_headers.get("accept-encoding", "")
+    )
+    headers = files.headers(found, size, encoding, etag)
+    if _etag_matches(request_headers.get("if-none-match"), etag):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [
+                    (name.lower().encode(), headers[name].encode())
+                    for name in ("Cache-Control", "ETag", "Vary")
+                    if name in headers
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
+        return
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (name.lower().encode(), value.encode()) for name, value in headers.items()
+            ],
+        }
+    )
+    if scope["method"] == "HEAD":
+        await send({"type": "http.response.body", "body": b""})
+        return
+    with open(path, "rb") as file:
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            await send({"type": "http.response.zerocopy", "file": file, "count": size})
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, file.read, CHUNK_SIZE)
+            more = len(chunk) == CHUNK_SIZE
+            await send({"type": "http.response.body", "body": chunk, "more_body": more})
+            if not more:
+                return
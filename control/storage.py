@@ -0,0 +1,138 @@
+import gzip
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from . import cssprune
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Extensões de arquivos de texto que valem a pena comprimir
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".html", ".xml",
+    ".ico", ".ttf", ".otf", ".eot",
+}
+# Arquivos menores que isto não são comprimidos
+MIN_COMPRESS_SIZE = 256
+# Uma variante só é gravada se ficar abaixo desta fração do original
+MAX_COMPRESS_RATIO = 0.95
+
+
+def _gzip(data):
+    # mtime fixo: o mesmo arquivo gera sempre os mesmos bytes
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Storage do ``collectstatic`` em produção:
+
+    1. remove as regras CSS não usadas dos arquivos em
+       ``STATICFILES_PRUNE_CSS`` (veja ``control/cssprune.py``);
+    2. grava os arquivos com o hash do conteúdo no nome
+       (``style.bundle.3f2a9c1b7e44.css``), que podem ser cacheados para
+       sempre pelo navegador;
+    3. grava as variantes ``.gz`` e, se o pacote ``brotli`` estiver
+       instalado, ``.br`` de cada arquivo de texto, servidas prontas por
+       ``control.staticfiles``.
+    """
+
+    # Referências quebradas nos templates não derrubam a página; usa o nome
+    # original
+    manifest_strict = False
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+            # url() de um CSS de terceiros apontando para arquivo inexistente
+            logger.warning("Arquivo estático referenciado não existe: %s", name)
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = self.prune_css(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            self.compress(set(self.hashed_files) | set(self.hashed_files.values()))
+
+    def prune_css(self, paths):
+        """
+        Grava em ``STATIC_ROOT`` os CSS configurados sem as regras não usadas.
+        Retorna ``paths`` apontando esses arquivos para a cópia reduzida.
+        """
+        names = [name for name in settings.STATICFILES_PRUNE_CSS if name in paths]
+        if not names:
+            return paths
+        used = cssprune.used_classes(
+            cssprune.source_paths(settings.BASE_DIR, settings.STATICFILES_PRUNE_SOURCES)
+        )
+        pruner = cssprune.Pruner(used, settings.STATICFILES_PRUNE_SAFELIST)
+        for name in names:
+            # Lido sempre do original: a cópia em STATIC_ROOT pode ser de um
+            # collectstatic anterior, já reduzida com outros templates
+            storage, source_path = paths[name]
+            with storage.open(source_path) as source:
+                original = source.read().decode("utf-8")
+            pruned = pruner.prune(original)
+            with open(self.path(name), "w", encoding="utf-8") as target:
+                target.write(pruned)
+            logger.info(
+                "CSS %s reduzido de %d para %d bytes", name, len(original), len(pruned)
+            )
+        # O hash e os nomes reescritos passam a ser calculados a partir da
+        # cópia reduzida em STATIC_ROOT, não do arquivo original
+        return {**paths, **{name: (self, name) for name in names}}
+
+    def compress(self, names):
+        encoders = [(".gz", _gzip)]
+        if brotli is not None:
+            encoders.append((".br", _brotli))
+        names = [
+            name
+            for name in names
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+            and self.exists(name)
+        ]
+        # zlib e brotli liberam o GIL durante a compressão
+        with ThreadPoolExecutor() as pool:
+            for name in names:
+                for suffix, encoder in encoders:
+                    pool.submit(self._compress_file, name, suffix, encoder)
+
+    def _compress_file(self, name, suffix, encoder):
+        path = self.path(name)
+        target = path + suffix
+        try:
+            stat = os.stat(path)
+            if os.path.exists(target) and os.path.getmtime(target) >= stat.st_mtime:
+                return
+            if stat.st_size < MIN_COMPRESS_SIZE:
+                return
+            with open(path, "rb") as source:
+                data = source.read()
+            compressed = encoder(data)
+            if len(compressed) >= len(data) * MAX_COMPRESS_RATIO:
+                if os.path.exists(target):
+                    os.remove(target)
+                return
+            temporary = f"{target}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as output:
+                output.write(compressed)
+            os.replace(temporary, target)
+        except Exception:
+            logger.exception("Falha ao comprimir %s", name)
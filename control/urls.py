@@ -24,6 +24,14 @@ from .views import *
 urlpatterns = [
     path("", IndexView.as_view(), name="index"),
     path("accounts/", include("accounts.urls")),
+    path("api/", include("api.urls")),
+    path("employee/", include("employee.urls")),
+    # métricas de latência e consultas por URL (somente equipe)
+    path(
+        "instrumentation/",
+        InstrumentationView.as_view(),
+        name="instrumentation",
+    ),
 ]
 
 if settings.DEBUG:
@@ -1,6 +1,13 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import JsonResponse
+from django.views import View
 from django.views.generic import TemplateView
 
+from employee import dashboard
+
+from . import instrumentation
+
 
 class IndexView(LoginRequiredMixin, TemplateView):
     template_name = "index.html"
@@ -8,3 +15,24 @@ class IndexView(LoginRequiredMixin, TemplateView):
         "accounts/login/"  # URL para redirecionar caso o usuário não esteja logado
     )
     redirect_field_name = "next"  # Campo para armazenar a URL original
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Lido do cache; nunca espera pelas agregações (veja employee.dashboard)
+        context["metrics"] = dashboard.get_metrics()
+        return context
+
+
+# Agregados recentes por URL deste processo (somente equipe)
+class InstrumentationView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(
+            {
+                "window_seconds": settings.INSTRUMENTATION_WINDOW_SECONDS,
+                "sample_rate": settings.INSTRUMENTATION_SAMPLE_RATE,
+                "views": instrumentation.window.summary(),
+            }
+        )
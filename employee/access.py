@@ -0,0 +1,196 @@
+"""
+Permissões efetivas dos usuários (as do cargo do funcionário vinculado).
+
+O cache só é usado quando compartilhado (``accounts.user_cache.shared``);
+caso contrário as permissões são lidas do banco a cada requisição.
+"""
+
+import threading
+import time
+
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.core.cache import cache
+
+from accounts import user_cache
+
+from .models import Employee, Permission, Role
+
+# Tempo de vida das entradas no cache do Django (segundos)
+CACHE_TIMEOUT = 60 * 60
+# Tempo de vida do cache em memória do processo (segundos); outros
+# processos enxergam invalidações em no máximo esse intervalo
+LOCAL_TTL = 5.0
+# Quantidade máxima de usuários mantidos no cache em memória
+LOCAL_MAX_ENTRIES = 10000
+
+_local = {}
+_local_lock = threading.Lock()
+
+
+def _version_key(scope, identifier):
+    return f"access:{scope}:{identifier}:version"
+
+
+def _get_version(scope, identifier):
+    return cache.get(_version_key(scope, identifier), 0)
+
+
+def _bump(scope, identifier):
+    # Versões pelo relógio: não se repetem mesmo se a chave for descartada
+    cache.set(_version_key(scope, identifier), time.time_ns(), None)
+    with _local_lock:
+        _local.clear()
+
+
+def _cached(key, load):
+    if not user_cache.shared():
+        return load()
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        cache.set(key, value, CACHE_TIMEOUT)
+    return value
+
+
+def invalidate_user(user_id):
+    """
+    Descarta as permissões calculadas para um usuário.
+    """
+    if user_id is not None:
+        _bump("user", user_id)
+
+
+def invalidate_role(role_id):
+    """
+    Descarta as permissões de todos os usuários do cargo.
+    """
+    if role_id is not None:
+        _bump("role", role_id)
+
+
+def invalidate_all():
+    """
+    Descarta a lista completa de permissões (usada por superusuários) e o
+    mapa de nomes.
+    """
+    _bump("all", "permissions")
+
+
+def _all_permission_ids():
+    version = _get_version("all", "permissions")
+    return _cached(
+        f"access:all:{version}",
+        lambda: frozenset(Permission.objects.values_list("id", flat=True)),
+    )
+
+
+def _role_permission_ids(role_id):
+    version = _get_version("role", role_id)
+    ids = _cached(
+        f"access:role:{role_id}:{version}",
+        lambda: frozenset(
+            Role.permissions.through.objects.filter(role_id=role_id).values_list(
+                "permission_id", flat=True
+            )
+        ),
+    )
+    return ids, version
+
+
+def _compute(user):
+    if user.is_superuser:
+        return {"superuser": True, "perms": _all_permission_ids()}
+    role_id = (
+        Employee.objects.filter(user_id=user.pk).values_list("role_id", flat=True).first()
+    )
+    if role_id is None:
+        return {"role_id": None, "perms": frozenset()}
+    perms, role_version = _role_permission_ids(role_id)
+    return {"role_id": role_id, "role_version": role_version, "perms": perms}
+
+
+def _is_current(entry):
+    if entry.get("superuser"):
+        return entry["all_version"] == _get_version("all", "permissions")
+    if entry.get("role_id") is None:
+        return True
+    return entry["role_version"] == _get_version("role", entry["role_id"])
+
+
+def get_effective_permissions(user):
+    """
+    Retorna o ``frozenset`` de ids de ``Permission`` efetivos do usuário
+    (as permissões do cargo do funcionário vinculado).
+
+    O resultado fica em memória por ``LOCAL_TTL`` segundos e no cache do
+    Django sob chaves versionadas; depois de aquecido, nenhuma consulta ao
+    banco é feita. Sem cache compartilhado, é calculado a cada requisição.
+    """
+    if user is None or not user.is_authenticated or not user.is_active:
+        return frozenset()
+    cached = getattr(user, "_effective_permissions", None)
+    if cached is not None:
+        return cached
+    if not user_cache.shared():
+        user._effective_permissions = _compute(user)["perms"]
+        return user._effective_permissions
+
+    now = time.monotonic()
+    local = _local.get(user.pk)
+    if local is not None and local[0] > now:
+        user._effective_permissions = local[1]
+        return local[1]
+
+    user_version = _get_version("user", user.pk)
+    key = f"access:user:{user.pk}:{user_version}"
+    entry = cache.get(key)
+    if entry is None or not _is_current(entry):
+        entry = _compute(user)
+        if entry.get("superuser"):
+            entry["all_version"] = _get_version("all", "permissions")
+        cache.set(key, entry, CACHE_TIMEOUT)
+
+    perms = entry["perms"]
+    with _local_lock:
+        if len(_local) >= LOCAL_MAX_ENTRIES:
+            _local.clear()
+        _local[user.pk] = (now + LOCAL_TTL, perms)
+    user._effective_permissions = perms
+    return perms
+
+
+def permission_ids(names):
+    """
+    Converte nomes de ``Permission`` em ids usando um mapa em cache.
+    Nomes desconhecidos são mapeados para ``None``.
+    """
+    version = _get_version("all", "permissions")
+    mapping = _cached(
+        f"access:names:{version}",
+        lambda: dict(Permission.objects.values_list("name", "id")),
+    )
+    return [mapping.get(name) for name in names]
+
+
+def has_permissions(user, names):
+    """
+    Indica se o usuário possui todas as permissões informadas (por nome).
+    """
+    if not names:
+        return bool(user and user.is_authenticated)
+    perms = get_effective_permissions(user)
+    return all(
+        permission_id is not None and permission_id in perms
+        for permission_id in permission_ids(names)
+    )
+
+
+class RolePermissionRequiredMixin(PermissionRequiredMixin):
+    """
+    Equivalente ao ``PermissionRequiredMixin`` do Django, mas verificando
+    ``permission_required`` (nomes de ``employee.Permission``) contra as
+    permissões do cargo do usuário.
+    """
+
+    def has_permission(self):
+        return has_permissions(self.request.user, self.get_permission_required())
@@ -0,0 +1,218 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+from . import payroll, payroll_summary
+from .models import Absence, Leave, Vacation
+
+# Quantidade máxima de meses com árvore montada em memória
+MAX_PERIODS = 36
+
+# Status que confirmam a indisponibilidade (ausências sempre contam)
+CONFIRMED_STATUSES = {"vacation": ("approved",), "leave": ("approved",)}
+
+_trees = OrderedDict()
+_trees_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Unavailability:
+    # Origem do registro: "vacation", "leave" ou "absence"
+    kind: str
+    # Id do registro de origem
+    record_id: int
+    employee_id: int
+    role_id: int
+    start: date
+    end: date
+    status: str
+
+    @property
+    def confirmed(self):
+        statuses = CONFIRMED_STATUSES.get(self.kind)
+        return statuses is None or self.status in statuses
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, items, left, right):
+        self.center = center
+        self.by_start = sorted(items, key=lambda item: item.start)
+        self.by_end = sorted(items, key=lambda item: item.end, reverse=True)
+        self.left = left
+        self.right = right
+
+
+def _build(items):
+    if not items:
+        return None
+    points = sorted(point for item in items for point in (item.start, item.end))
+    center = points[len(points) // 2]
+    left, right, here = [], [], []
+    for item in items:
+        if item.end < center:
+            left.append(item)
+        elif item.start > center:
+            right.append(item)
+        else:
+            here.append(item)
+    return _Node(center, here, _build(left), _build(right))
+
+
+class IntervalTree:
+    """
+    Árvore de intervalos centrada e imutável. Cada nó guarda os intervalos
+    que contêm o seu centro, ordenados pelo início e pelo fim, de modo que
+    uma consulta visita apenas os intervalos que se sobrepõem a ela.
+    """
+
+    def __init__(self, items):
+        self.size = len(items)
+        self._root = _build(list(items))
+
+    def overlapping(self, start, end):
+        """
+        Intervalos (fechados) que se sobrepõem a ``[start, end]``.
+        """
+        result = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if end < node.center:
+                for item in node.by_start:
+                    if item.start > end:
+                        break
+                    result.append(item)
+                stack.append(node.left)
+            elif start > node.center:
+                for item in node.by_end:
+                    if item.end < start:
+                        break
+                    result.append(item)
+                stack.append(node.right)
+            else:
+                result.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return result
+
+
+def _version_keys(period):
+    return f"availability:period:{period:%Y-%m}:version", "availability:all:version"
+
+
+def _versions(period):
+    keys = _version_keys(period)
+    values = cache.get_many(keys)
+    return tuple(values.get(key, 1) for key in keys)
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def invalidate_dates(start, end=None):
+    """
+    Descarta as árvores dos meses entre ``start`` e ``end``.
+    """
+    for period in payroll_summary.iter_months(start, end or start):
+        _bump(_version_keys(period)[0])
+
+
+def invalidate_all():
+    """
+    Descarta todas as árvores (ex.: mudança de cargo de um funcionário).
+    """
+    _bump(_version_keys(date.today())[1])
+
+
+def load_period(period):
+    """
+    Lê do banco todas as férias, licenças e ausências que tocam o mês.
+    """
+    first, last = payroll.month_bounds(period.year, period.month)
+    items = []
+    fields = ("id", "employee_id", "employee__role_id", "start_date", "end_date", "status")
+    for kind, model in (("vacation", Vacation), ("leave", Leave)):
+        rows = model.objects.filter(start_date__lte=last, end_date__gte=first)
+        for row in rows.values_list(*fields):
+            items.append(Unavailability(kind, *row))
+    rows = Absence.objects.filter(absence_date__range=(first, last)).values_list(
+        "id", "employee_id", "employee__role_id", "absence_date", "status"
+    )
+    for record_id, employee_id, role_id, day, status in rows:
+        items.append(
+            Unavailability("absence", record_id, employee_id, role_id, day, day, status)
+        )
+    return IntervalTree(items)
+
+
+def get_tree(period):
+    """
+    Retorna a árvore do mês, montando-a somente quando não existe em
+    memória ou quando foi invalidada (versão no cache do Django).
+    """
+    period = payroll_summary.month_start(period)
+    versions = _versions(period)
+    with _trees_lock:
+        entry = _trees.get(period)
+        if entry is not None and entry[0] == versions:
+            _trees.move_to_end(period)
+            return entry[1]
+    tree = load_period(period)
+    with _trees_lock:
+        _trees[period] = (versions, tree)
+        _trees.move_to_end(period)
+        while len(_trees) > MAX_PERIODS:
+            _trees.popitem(last=False)
+    return tree
+
+
+def unavailable(start, end=None, role=None, include_pending=False):
+    """
+    Indisponibilidades que se sobrepõem ao dia ``start`` ou ao período
+    ``[start, end]``, opcionalmente restritas a um cargo (id).
+    """
+    end = end or start
+    found = {}
+    for period in payroll_summary.iter_months(start, end):
+        for item in get_tree(period).overlapping(start, end):
+            if role is not None and item.role_id != int(role):
+                continue
+            if not include_pending and not item.confirmed:
+                continue
+            found[(item.kind, item.record_id)] = item
+    return sorted(found.values(), key=lambda item: (item.start, item.employee_id))
+
+
+def unavailable_employee_ids(start, end=None, role=None, include_pending=False):
+    """
+    Ids dos funcionários indisponíveis no dia ou período.
+    """
+    return {
+        item.employee_id
+        for item in unavailable(start, end, role=role, include_pending=include_pending)
+    }
+
+
+def team_calendar(year, month, role=None, include_pending=False):
+    """
+    Calendário do mês: ``{dia: [indisponibilidades]}`` para todos os dias.
+    """
+    first, last = payroll.month_bounds(year, month)
+    days = {first + timedelta(days=offset): [] for offset in range(last.day)}
+    for item in unavailable(first, last, role=role, include_pending=include_pending):
+        day = max(item.start, first)
+        while day <= min(item.end, last):
+            days[day].append(item)
+            day += timedelta(days=1)
+    return days
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from . import fragments
+
+
+def fragment_cache(request):
+    """
+    Chaves de variação dos fragmentos em cache do layout. Calculadas só se
+    algum template as usar.
+
+    Uso: ``{% cache fragment_timeout sidebar fragment_keys.role %}``
+    """
+    user = getattr(request, "user", None)
+    return {
+        "fragment_keys": SimpleLazyObject(lambda: fragments.keys(user)),
+        "fragment_timeout": settings.TEMPLATE_FRAGMENT_TIMEOUT,
+    }
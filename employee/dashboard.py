@@ -0,0 +1,241 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Avg, Count, Exists, OuterRef, Sum
+
+from control.db import replicas
+
+from . import payroll_summary
+from .models import Employee, Leave, PayrollPeriodSummary, PerformanceReview, Vacation
+
+logger = logging.getLogger(__name__)
+
+# Por quanto tempo (segundos) um valor vencido ainda é exibido enquanto o
+# novo é calculado em segundo plano
+STALE_TTL = 24 * 60 * 60
+# Validade da trava que impede dois cálculos simultâneos da mesma métrica
+LOCK_TIMEOUT = 60
+# Meses exibidos no custo da folha
+PAYROLL_MONTHS = 12
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    compute: object
+    # Segundos em que o valor é considerado atual
+    ttl: int
+    # O valor muda com a data (ex.: "hoje"), recalculado na virada do dia
+    daily: bool = False
+
+
+def headcount():
+    """
+    Funcionários por situação, contrato e cargo (uma única consulta
+    agrupada pelas três colunas).
+    """
+    rows = (
+        Employee.objects.values(
+            "employment_status", "contract_type", "role_id", "role__name"
+        )
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    data = {"total": 0, "by_status": {}, "by_contract": {}, "by_role": {}}
+    for row in rows:
+        data["total"] += row["total"]
+        for group, key in (
+            ("by_status", row["employment_status"]),
+            ("by_contract", row["contract_type"]),
+            ("by_role", row["role__name"] or "Sem cargo"),
+        ):
+            data[group][key] = data[group].get(key, 0) + row["total"]
+    return data
+
+
+def payroll_cost():
+    """
+    Bruto e líquido da folha dos últimos meses, a partir do resumo mensal.
+    """
+    first = payroll_summary.month_start(date.today())
+    for _ in range(PAYROLL_MONTHS - 1):
+        first = payroll_summary.month_start(first.replace(day=1) - date.resolution)
+    rows = (
+        PayrollPeriodSummary.objects.filter(period__gte=first)
+        .values("period")
+        .annotate(gross=Sum("gross"), net=Sum("net"), employees=Count("employee_id"))
+        .order_by("period")
+    )
+    return [
+        {
+            "period": row["period"].strftime("%Y-%m"),
+            "gross": str(row["gross"]),
+            "net": str(row["net"]),
+            "employees": row["employees"],
+        }
+        for row in rows
+    ]
+
+
+def on_leave_today():
+    """
+    Pessoas em licença ou férias aprovadas hoje.
+    """
+    today = date.today()
+    current = {
+        "status": "approved",
+        "employee": OuterRef("pk"),
+        "start_date__lte": today,
+        "end_date__gte": today,
+    }
+    return Employee.objects.aggregate(
+        on_leave=Count("pk", filter=Exists(Leave.objects.filter(**current))),
+        on_vacation=Count("pk", filter=Exists(Vacation.objects.filter(**current))),
+    )
+
+
+def performance_by_role():
+    """
+    Média das avaliações por cargo.
+    """
+    rows = (
+        PerformanceReview.objects.values("employee__role__name")
+        .annotate(average=Avg("score"), reviews=Count("pk"))
+        .order_by("employee__role__name")
+    )
+    return [
+        {
+            "role": row["employee__role__name"] or "Sem cargo",
+            "average": round(row["average"], 2),
+            "reviews": row["reviews"],
+        }
+        for row in rows
+    ]
+
+
+METRICS = {
+    metric.name: metric
+    for metric in (
+        Metric("headcount", headcount, ttl=600),
+        Metric("payroll_cost", payroll_cost, ttl=900),
+        Metric("on_leave_today", on_leave_today, ttl=300, daily=True),
+        Metric("performance_by_role", performance_by_role, ttl=1800),
+    )
+}
+
+
+def _ttl(metric):
+    return getattr(settings, "DASHBOARD_TTLS", {}).get(metric.name, metric.ttl)
+
+
+def _value_key(name):
+    return f"dashboard:{name}"
+
+
+def _dirty_key(name):
+    return f"dashboard:{name}:dirty"
+
+
+def _lock_key(name):
+    return f"dashboard:{name}:lock"
+
+
+def refresh(name):
+    """
+    Calcula a métrica agora e grava no cache. Retorna o valor.
+    """
+    metric = METRICS[name]
+    started = time.time()
+    with replicas():
+        value = metric.compute()
+    cache.set(
+        _value_key(name),
+        {
+            "value": value,
+            "started": started,
+            "fresh_until": started + _ttl(metric),
+            "day": date.today().isoformat(),
+        },
+        STALE_TTL,
+    )
+    return value
+
+
+def _refresh_in_background(name):
+    with _refreshing_lock:
+        if name in _refreshing:
+            return
+        _refreshing.add(name)
+    # A trava no cache evita o mesmo cálculo em vários processos
+    if not cache.add(_lock_key(name), 1, LOCK_TIMEOUT):
+        with _refreshing_lock:
+            _refreshing.discard(name)
+        return
+
+    def run():
+        try:
+            refresh(name)
+        except Exception:
+            logger.exception("Falha ao calcular a métrica %s do painel", name)
+        finally:
+            cache.delete(_lock_key(name))
+            with _refreshing_lock:
+                _refreshing.discard(name)
+            connections.close_all()
+
+    threading.Thread(target=run, name=f"dashboard-{name}", daemon=True).start()
+
+
+def _is_fresh(metric, entry, dirty):
+    if time.time() >= entry["fresh_until"]:
+        return False
+    if dirty is not None and dirty >= entry["started"]:
+        return False
+    return not metric.daily or entry["day"] == date.today().isoformat()
+
+
+def get_metrics(names=None):
+    """
+    Valores das métricas lidos do cache em uma única ida ao cache, sem
+    nunca esperar por agregações: valores vencidos ou invalidados são
+    devolvidos como estão e recalculados em segundo plano
+    (stale-while-revalidate). Métricas nunca calculadas vêm como ``None``.
+    """
+    names = list(names or METRICS)
+    keys = [key for name in names for key in (_value_key(name), _dirty_key(name))]
+    cached = cache.get_many(keys)
+    values = {}
+    for name in names:
+        entry = cached.get(_value_key(name))
+        if entry is None or not _is_fresh(
+            METRICS[name], entry, cached.get(_dirty_key(name))
+        ):
+            _refresh_in_background(name)
+        values[name] = entry["value"] if entry is not None else None
+    return values
+
+
+def invalidate(*names):
+    """
+    Marca as métricas como desatualizadas; o próximo acesso exibe o valor
+    atual e dispara o recálculo.
+    """
+    now = time.time()
+    cache.set_many({_dirty_key(name): now for name in names}, STALE_TTL)
+
+
+def warm():
+    """
+    Calcula todas as métricas de forma síncrona (ex.: após o deploy).
+    """
+    for name in METRICS:
+        refresh(name)
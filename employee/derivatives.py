@@ -0,0 +1,274 @@
+import mimetypes
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+
+from . import imaging
+from .models import Achievement, UploadedFile, uploads_storage
+
+# Pasta (no armazenamento privado dos envios) com as miniaturas, organizadas
+# pelo hash; são servidas só pela view ``employee-derivative``
+DERIVATIVES_DIR = "derivatives"
+# Intervalo mínimo (segundos) entre duas marcações de uso do mesmo arquivo
+TOUCH_INTERVAL = 3600.0
+# Marcações de uso lembradas neste processo
+MAX_TOUCHED = 10000
+# Intervalo mínimo (segundos) entre verificações da cota de disco
+QUOTA_INTERVAL = 60.0
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+_pending_lock = threading.Lock()
+_touched = OrderedDict()
+_touched_lock = threading.Lock()
+_quota_checked = 0.0
+
+
+def sizes():
+    return settings.DERIVATIVE_SIZES
+
+
+def derivative_name(sha256, size):
+    """
+    Caminho (no armazenamento) da miniatura: ``derivatives/ab/<sha>/<tamanho>``.
+    Conteúdos idênticos compartilham as mesmas miniaturas.
+    """
+    return (
+        f"{DERIVATIVES_DIR}/{sha256[:2]}/{sha256}/"
+        f"{size}.{settings.DERIVATIVES_FORMAT.lower()}"
+    )
+
+
+def _path(name):
+    try:
+        return uploads_storage().path(name)
+    except NotImplementedError:
+        # Armazenamento remoto: sem miniaturas (o pool grava em disco local)
+        return None
+
+
+def source_for(obj):
+    """
+    ``(arquivo, sha256, content_type)`` de uma conquista ou arquivo enviado;
+    ``None`` quando não há imagem. O hash de conquistas antigas é calculado
+    e gravado aqui na primeira vez.
+    """
+    if isinstance(obj, Achievement):
+        if not obj.image:
+            return None
+        if not obj.image_sha256:
+            if not obj.image.storage.exists(obj.image.name):
+                return None
+            obj.compute_image_digest()
+            obj.image.close()
+            Achievement.objects.filter(pk=obj.pk).update(image_sha256=obj.image_sha256)
+        content_type = mimetypes.guess_type(obj.image.name)[0] or "image/*"
+        return obj.image, obj.image_sha256, content_type
+    if isinstance(obj, UploadedFile):
+        if not obj.file or not obj.sha256:
+            return None
+        content_type = obj.content_type or mimetypes.guess_type(obj.name or "")[0]
+        return obj.file, obj.sha256, content_type or ""
+    raise TypeError(f"Sem miniaturas para {type(obj).__name__}")
+
+
+def find_source(sha256):
+    """
+    Objeto de origem de um hash (conquistas primeiro, depois arquivos).
+    """
+    achievement = Achievement.objects.filter(image_sha256=sha256).first()
+    if achievement is not None:
+        return achievement
+    return UploadedFile.objects.filter(sha256=sha256).first()
+
+
+def _touch(path):
+    # Marca o uso (mtime) para a remoção LRU, no máximo uma vez por hora
+    now = time.monotonic()
+    with _touched_lock:
+        last = _touched.get(path)
+        if last is not None and now - last < TOUCH_INTERVAL:
+            return
+        _touched[path] = now
+        _touched.move_to_end(path)
+        while len(_touched) > MAX_TOUCHED:
+            _touched.popitem(last=False)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _render_args(fieldfile, sha256, content_type, size):
+    target = _path(derivative_name(sha256, size))
+    if target is None or not imaging.can_render(content_type):
+        return None
+    return (
+        fieldfile.path,
+        target,
+        sizes()[size],
+        content_type,
+        settings.DERIVATIVES_FORMAT,
+        settings.DERIVATIVES_QUALITY,
+    )
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # "spawn": o processo filho não herda conexões nem threads
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.DERIVATIVES_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _finished(key, future):
+    with _pending_lock:
+        _pending.discard(key)
+    if future.exception() is None:
+        enforce_quota(throttle=True)
+
+
+def generate(obj, names=None, wait=False):
+    """
+    Gera as miniaturas pedidas (todas por padrão) que ainda não existem.
+    Com ``DERIVATIVES_WORKERS = 0`` ou ``wait=True`` a geração é feita no
+    próprio processo; caso contrário vai para o pool.
+    """
+    source = source_for(obj)
+    if source is None:
+        return
+    fieldfile, sha256, content_type = source
+    for size in names or sizes():
+        args = _render_args(fieldfile, sha256, content_type, size)
+        if args is None or os.path.exists(args[1]):
+            continue
+        if wait or settings.DERIVATIVES_WORKERS == 0:
+            imaging.render(*args)
+            continue
+        key = (sha256, size)
+        with _pending_lock:
+            if key in _pending:
+                continue
+            _pending.add(key)
+        future = _get_executor().submit(imaging.render, *args)
+        future.add_done_callback(lambda future, key=key: _finished(key, future))
+    if wait or settings.DERIVATIVES_WORKERS == 0:
+        enforce_quota(throttle=True)
+
+
+def schedule(obj):
+    """
+    Agenda a geração para depois do commit (fora do caminho da requisição).
+    """
+    transaction.on_commit(lambda: generate(obj))
+
+
+def url_for(obj, size):
+    """
+    URL (da view ``employee-derivative``, que confere o acesso) da miniatura
+    no tamanho pedido. Se ela ainda não existe, a geração é agendada.
+    Retorna ``None`` quando o arquivo não tem pré-visualização.
+    """
+    if size not in sizes():
+        raise ValueError(f"Tamanho de miniatura desconhecido: {size}")
+    source = source_for(obj)
+    if source is None:
+        return None
+    fieldfile, sha256, content_type = source
+    name = derivative_name(sha256, size)
+    path = _path(name)
+    if path is None or not imaging.can_render(content_type):
+        return None
+    if not os.path.exists(path):
+        generate(obj, [size])
+    return reverse("employee-derivative", args=[sha256, size])
+
+
+def urls_for(obj):
+    """
+    ``{tamanho: url}`` com todos os tamanhos (vazio sem pré-visualização).
+    """
+    urls = {size: url_for(obj, size) for size in sizes()}
+    return {size: url for size, url in urls.items() if url}
+
+
+def render_now(obj, size):
+    """
+    Garante a miniatura (gerando de forma síncrona) e retorna o caminho.
+    """
+    source = source_for(obj)
+    if source is None:
+        return None
+    path = _path(derivative_name(source[1], size))
+    if path is not None and not os.path.exists(path):
+        generate(obj, [size], wait=True)
+    if path is None or not os.path.exists(path):
+        return None
+    _touch(path)
+    return path
+
+
+def enforce_quota(max_bytes=None, throttle=False):
+    """
+    Apaga as miniaturas usadas há mais tempo (mtime) até o total ficar em
+    90% de ``DERIVATIVES_MAX_BYTES``. Retorna ``(apagados, bytes_liberados)``.
+    """
+    global _quota_checked
+    now = time.monotonic()
+    if throttle and now - _quota_checked < QUOTA_INTERVAL:
+        return 0, 0
+    _quota_checked = now
+    root = _path(DERIVATIVES_DIR)
+    if root is None or not os.path.isdir(root):
+        return 0, 0
+    max_bytes = settings.DERIVATIVES_MAX_BYTES if max_bytes is None else max_bytes
+
+    files, total = [], 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return 0, 0
+
+    removed, freed = 0, 0
+    target = max_bytes * 0.9
+    for _, size, path in sorted(files):
+        if total - freed <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        with _touched_lock:
+            _touched.pop(path, None)
+        removed += 1
+        freed += size
+    return removed, freed
+
+
+def delete(sha256):
+    """
+    Remove todas as miniaturas de um conteúdo.
+    """
+    for size in sizes():
+        path = _path(derivative_name(sha256, size))
+        if path is not None and os.path.exists(path):
+            os.remove(path)
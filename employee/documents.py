@@ -0,0 +1,116 @@
+import re
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def only_digits(value):
+    """
+    Remove tudo que não for dígito (pontos, traços, espaços).
+    """
+    return _NON_DIGITS.sub("", value or "")
+
+
+def _cpf_check_digit(digits):
+    weight = len(digits) + 1
+    total = sum(int(digit) * (weight - index) for index, digit in enumerate(digits))
+    remainder = total * 10 % 11
+    return "0" if remainder == 10 else str(remainder)
+
+
+def is_valid_cpf(value):
+    """
+    Valida os dígitos verificadores de um CPF, com ou sem máscara.
+    """
+    digits = only_digits(value)
+    if len(digits) != 11 or digits == digits[0] * 11:
+        return False
+    return (
+        _cpf_check_digit(digits[:9]) == digits[9]
+        and _cpf_check_digit(digits[:10]) == digits[10]
+    )
+
+
+def format_cpf(value):
+    """
+    Formata um CPF como ``000.000.000-00``.
+    """
+    digits = only_digits(value)
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def _values(digits):
+    return [ord(digit) - 48 for digit in digits]
+
+
+_PIS_WEIGHTS = (3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+
+def is_valid_pis(value):
+    """
+    Valida o dígito verificador de um PIS/PASEP/NIS, com ou sem máscara.
+    """
+    digits = only_digits(value)
+    if len(digits) != 11 or digits == digits[0] * 11:
+        return False
+    values = _values(digits)
+    total = sum(value * weight for value, weight in zip(values, _PIS_WEIGHTS))
+    check = 11 - total % 11
+    return (0 if check >= 10 else check) == values[10]
+
+
+def is_valid_cnh(value):
+    """
+    Valida os dígitos verificadores do número de registro da CNH.
+    """
+    digits = only_digits(value)
+    if len(digits) != 11 or digits == digits[0] * 11:
+        return False
+    values = _values(digits)
+    first = sum(value * (9 - index) for index, value in enumerate(values[:9])) % 11
+    adjustment = 0
+    if first >= 10:
+        first, adjustment = 0, 2
+    second = sum(value * (index + 1) for index, value in enumerate(values[:9])) % 11
+    second -= adjustment
+    if second < 0:
+        second += 11
+    if second >= 10:
+        second = 0
+    return values[9] == first and values[10] == second
+
+
+def is_valid_ctps(value):
+    """
+    A CTPS não tem dígito verificador público: valida apenas o tamanho
+    (número e série, de 7 a 11 dígitos).
+    """
+    return 7 <= len(only_digits(value)) <= 11
+
+
+# Documentos com chave canônica (somente dígitos) no funcionário
+VALIDATORS = {
+    "cpf": is_valid_cpf,
+    "pis_pasep": is_valid_pis,
+    "ctps": is_valid_ctps,
+    "cnh": is_valid_cnh,
+}
+
+
+def document_key(value):
+    """
+    Chave canônica de um documento: somente dígitos, ou ``None`` se vazio.
+    """
+    return only_digits(value) or None
+
+
+def validate_documents(kind, values):
+    """
+    Valida uma lista de documentos do mesmo tipo de uma só vez.
+
+    Retorna, na mesma ordem, a chave canônica de cada valor válido ou
+    ``None`` para os inválidos. Valores repetidos são validados uma vez.
+    """
+    validator = VALIDATORS[kind]
+    keys = [only_digits(value) for value in values]
+    valid = {key: validator(key) for key in set(keys)}
+    return [key if valid[key] else None for key in keys]
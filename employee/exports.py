@@ -0,0 +1,271 @@
+import csv
+import io
+import re
+import zipfile
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.db.models import Q
+
+from .models import Absence, Employee, Salary
+
+# Quantidade de linhas lidas do banco por vez
+CHUNK_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    # Modelo de origem dos dados
+    model: type
+    # Pares (cabeçalho, caminho do campo para values_list)
+    columns: tuple
+    # Campo de data usado pelos filtros de período
+    date_field: str
+    # Campo de término (nulo = em aberto); com ele, o período seleciona os
+    # registros que se sobrepõem a ele
+    end_date_field: str = ""
+    # Prefixo até o funcionário (vazio quando o modelo é o próprio Employee)
+    employee_prefix: str = "employee__"
+
+    @property
+    def header(self):
+        return [label for label, _ in self.columns]
+
+    @property
+    def fields(self):
+        return [path for _, path in self.columns]
+
+
+EXPORTS = {
+    "employees": ExportSpec(
+        model=Employee,
+        columns=(
+            ("ID", "id"),
+            ("Nome", "display_name"),
+            ("CPF", "cpf"),
+            ("Telefone", "phone"),
+            ("Admissão", "hire_date"),
+            ("Desligamento", "termination_date"),
+            ("Status", "employment_status"),
+            ("Contrato", "contract_type"),
+            ("Pagamento", "payment_method"),
+            ("Cargo", "role__name"),
+        ),
+        date_field="hire_date",
+        employee_prefix="",
+    ),
+    "salaries": ExportSpec(
+        model=Salary,
+        columns=(
+            ("ID", "id"),
+            ("Funcionário ID", "employee_id"),
+            ("Funcionário", "employee__display_name"),
+            ("Início", "start_date"),
+            ("Término", "end_date"),
+            ("Bruto", "gross_salary"),
+            ("Bônus", "bonus"),
+            ("Benefícios", "benefits"),
+            ("INSS", "inss_discount"),
+            ("IRRF", "irrf_discount"),
+            ("Vale-Transporte", "transport_voucher"),
+            ("Líquido", "net_salary"),
+        ),
+        date_field="start_date",
+        end_date_field="end_date",
+    ),
+    "absences": ExportSpec(
+        model=Absence,
+        columns=(
+            ("ID", "id"),
+            ("Funcionário ID", "employee_id"),
+            ("Funcionário", "employee__display_name"),
+            ("Data", "absence_date"),
+            ("Status", "status"),
+            ("Motivo", "reason"),
+        ),
+        date_field="absence_date",
+    ),
+}
+
+
+def export_queryset(name, start=None, end=None, employment_status=None, role=None):
+    """
+    Monta o queryset de uma exportação aplicando os filtros de período,
+    situação de emprego e cargo (id).
+    """
+    spec = EXPORTS[name]
+    queryset = spec.model.objects.all()
+    if start and spec.end_date_field:
+        queryset = queryset.filter(
+            Q(**{f"{spec.end_date_field}__isnull": True})
+            | Q(**{f"{spec.end_date_field}__gte": start})
+        )
+    elif start:
+        queryset = queryset.filter(**{f"{spec.date_field}__gte": start})
+    if end:
+        queryset = queryset.filter(**{f"{spec.date_field}__lte": end})
+    if employment_status:
+        queryset = queryset.filter(
+            **{f"{spec.employee_prefix}employment_status": employment_status}
+        )
+    if role:
+        queryset = queryset.filter(**{f"{spec.employee_prefix}role_id": role})
+    return queryset.order_by("pk").values_list(*spec.fields)
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    # Buffer falso: devolve o que foi escrito em vez de guardar
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    """
+    Gera o CSV linha a linha, começando pelo cabeçalho antes de qualquer
+    consulta ao banco.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header).encode()
+    for row in rows:
+        yield writer.writerow(row).encode()
+
+
+class _StreamSink(io.RawIOBase):
+    # Destino sem seek para o zipfile; os bytes são recolhidos com take()
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'relationships"><Relationship Id="rId1" Type="http://schemas.'
+        "openxmlformats.org/officeDocument/2006/relationships/officeDocument\" "
+        'Target="xl/workbook.xml"/></Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships"><sheets><sheet name="Dados" sheetId="1" r:id="rId1"/>'
+        "</sheets></workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'relationships"><Relationship Id="rId1" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/></Relationships>'
+    ),
+}
+
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f"<c><v>{value}</v></c>"
+    if isinstance(value, (date, datetime, time)):
+        value = value.isoformat()
+    text = escape(_ILLEGAL_XML.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def iter_xlsx(header, rows, flush_rows=500):
+    """
+    Gera uma planilha XLSX em streaming: o zip é escrito em um destino sem
+    seek e os bytes são entregues a cada ``flush_rows`` linhas.
+    """
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/'
+                b'spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header).encode())
+            yield sink.take()
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row).encode())
+                if count % flush_rows == 0:
+                    yield sink.take()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.take()
+
+
+def gzip_stream(chunks, level=6):
+    """
+    Comprime um iterável de bytes em formato gzip sem montá-lo em memória.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "xlsx": (
+        iter_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+}
+
+
+def stream_export(name, fmt="csv", compress=False, chunk_size=CHUNK_SIZE, **filters):
+    """
+    Retorna o gerador de bytes de uma exportação no formato pedido.
+    """
+    spec = EXPORTS[name]
+    writer, _ = FORMATS[fmt]
+    queryset = export_queryset(name, **filters)
+    # Fixa o banco agora: o gerador é consumido depois que a view retorna,
+    # fora do roteamento de réplicas da requisição (control.db)
+    rows = iter_rows(queryset.using(queryset.db), chunk_size=chunk_size)
+    chunks = writer(spec.header, rows)
+    return gzip_stream(chunks) if compress else chunks
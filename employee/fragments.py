@@ -0,0 +1,71 @@
+import time
+
+from django.core.cache import cache
+
+from .models import Employee
+
+# Tempo de vida da versão do usuário (guarda também o cargo dele)
+USER_VERSION_TIMEOUT = 60 * 60
+
+
+def _version_key(scope, identifier):
+    return f"fragments:{scope}:{identifier}:version"
+
+
+def invalidate_user(user_id):
+    """
+    Descarta os fragmentos em cache do usuário (cabeçalho com nome, foto
+    e cargo). O cargo do usuário é relido no próximo acesso.
+    """
+    if user_id is not None:
+        cache.delete(_version_key("user", user_id))
+
+
+def invalidate_role(role_id):
+    """
+    Descarta os fragmentos em cache de todos os usuários do cargo (menu
+    lateral e cabeçalhos).
+    """
+    if role_id is not None:
+        cache.set(_version_key("role", role_id), time.time_ns(), None)
+
+
+def _get_or_add(key, default, timeout):
+    value = cache.get(key)
+    if value is None:
+        value = default()
+        if not cache.add(key, value, timeout):
+            value = cache.get(key, value)
+    return value
+
+
+def keys(user):
+    """
+    Chaves de variação para ``{% cache %}``:
+
+    - ``user``: fragmentos do próprio usuário; muda quando o usuário, o
+      funcionário vinculado ou o cargo dele são alterados;
+    - ``role``: fragmentos compartilhados pelo cargo (e pelos flags de
+      equipe/superusuário); muda quando o cargo ou as permissões mudam.
+
+    Depois de aquecidas, custam duas leituras de cache e nenhuma consulta.
+    """
+    if user is None or not user.is_authenticated:
+        return {"user": "anonymous", "role": "anonymous"}
+    token, role_id = _get_or_add(
+        _version_key("user", user.pk),
+        lambda: (
+            time.time_ns(),
+            Employee.objects.filter(user_id=user.pk)
+            .values_list("role_id", flat=True)
+            .first(),
+        ),
+        USER_VERSION_TIMEOUT,
+    )
+    role_id = role_id or 0
+    role_token = _get_or_add(_version_key("role", role_id), time.time_ns, None)
+    flags = f"{int(user.is_staff)}{int(user.is_superuser)}"
+    return {
+        "user": f"{user.pk}.{token}.{role_token}",
+        "role": f"{role_id}.{role_token}.{flags}",
+    }
@@ -0,0 +1,74 @@
+"""
+Geração de miniaturas sem dependência do Django, para rodar nos processos
+do pool de ``employee.derivatives``.
+"""
+
+import os
+import uuid
+
+from PIL import Image, ImageOps
+
+try:
+    # Pré-visualização de PDF (opcional): pip install pymupdf
+    import fitz
+except ImportError:
+    fitz = None
+
+# Maior área aceita ao abrir imagens (proteção contra "decompression bombs")
+Image.MAX_IMAGE_PIXELS = 64_000_000
+
+
+def can_render(content_type):
+    if content_type.startswith("image/"):
+        return True
+    return content_type == "application/pdf" and fitz is not None
+
+
+def _open_pdf(source, width):
+    # Somente a primeira página, rasterizada perto da largura final
+    with fitz.open(source) as document:
+        page = document.load_page(0)
+        zoom = max(width / page.rect.width, 0.1) * 2
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def _open_image(source, width):
+    image = Image.open(source)
+    # JPEG decodifica direto em escala reduzida, bem mais rápido
+    image.draft("RGB", (width, width))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    return image
+
+
+def render(source, target, width, content_type, fmt="webp", quality=80):
+    """
+    Grava em ``target`` a miniatura de ``source`` com no máximo ``width``
+    pixels de largura (proporção mantida, sem ampliar). A escrita é atômica.
+
+    Retorna o tamanho do arquivo gerado ou ``None`` se o tipo não é
+    suportado.
+    """
+    if not can_render(content_type):
+        return None
+    if content_type == "application/pdf":
+        image = _open_pdf(source, width)
+    else:
+        image = _open_image(source, width)
+    if image.width > width:
+        height = max(round(image.height * width / image.width), 1)
+        image = image.resize((width, height), Image.LANCZOS)
+    if fmt.lower() in ("jpeg", "jpg") and image.mode != "RGB":
+        image = image.convert("RGB")
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    partial = f"{target}.{uuid.uuid4().hex}.tmp"
+    try:
+        image.save(partial, format=fmt.upper(), quality=quality, optimize=True)
+        os.replace(partial, target)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return os.path.getsize(target)
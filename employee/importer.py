@@ -0,0 +1,579 @@
+import csv
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import repeat
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connections, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from accounts import user_cache
+from accounts.models import User
+from . import access, availability, dashboard, fragments, search
+from .documents import VALIDATORS, format_cpf, only_digits, validate_documents
+from .models import Address, Employee, PaymentDetails, Role
+
+# Campos obrigatórios de cada linha
+REQUIRED_FIELDS = (
+    "full_name",
+    "cpf",
+    "rg",
+    "birth_date",
+    "phone",
+    "start_time",
+    "end_time",
+    "gender",
+    "contract_type",
+    "payment_method",
+)
+
+# Campos de choices validados contra o modelo
+CHOICE_FIELDS = {
+    "gender": Employee,
+    "employment_status": Employee,
+    "contract_type": Employee,
+    "payment_method": Employee,
+    "payment_type": PaymentDetails,
+}
+
+ADDRESS_FIELDS = (
+    "street",
+    "number",
+    "complement",
+    "neighborhood",
+    "city",
+    "state",
+    "country",
+    "postal_code",
+)
+ADDRESS_REQUIRED = ("street", "number", "neighborhood", "city", "state", "postal_code")
+
+PAYMENT_FIELDS = (
+    "payment_type",
+    "pix_key",
+    "bank_name",
+    "account_number",
+    "agency_number",
+)
+
+# O usuário (e o nome exibido, que vem dele) de um funcionário existente
+# não é alterado pela importação
+EMPLOYEE_UPDATE_FIELDS = [
+    "cpf",
+    "birth_date",
+    "rg",
+    "ctps",
+    "pis_pasep",
+    "cnh",
+    "phone",
+    "start_time",
+    "end_time",
+    "gender",
+    "employment_status",
+    "contract_type",
+    "payment_method",
+    "role",
+    "updated_at",
+    "pis_pasep_digits",
+    "ctps_digits",
+    "cnh_digits",
+]
+
+# Métricas do painel afetadas pelos funcionários importados
+DASHBOARD_METRICS = ("headcount", "performance_by_role", "on_leave_today")
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y")
+TIME_FORMATS = ("%H:%M", "%H:%M:%S")
+
+
+@dataclass
+class ImportContext:
+    """
+    Dados de referência enviados aos processos de validação, carregados
+    uma única vez (sem acesso ao banco dentro dos processos).
+    """
+
+    roles: dict
+    choices: dict
+
+    @classmethod
+    def load(cls):
+        roles = {}
+        for role_id, name, abbreviation in Role.objects.values_list(
+            "id", "name", "abbreviation"
+        ):
+            roles[name.strip().lower()] = role_id
+            roles[abbreviation.strip().lower()] = role_id
+        choices = {}
+        for name, model in CHOICE_FIELDS.items():
+            mapping = {}
+            for value, label in model._meta.get_field(name).choices:
+                mapping[str(value).lower()] = value
+                mapping[str(label).lower()] = value
+            choices[name] = mapping
+        return cls(roles=roles, choices=choices)
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+    dry_run: bool = False
+
+    @property
+    def valid(self):
+        return self.total - len(self.errors)
+
+    @property
+    def rows_per_second(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "total": self.total,
+            "valid": self.valid,
+            "created": self.created,
+            "updated": self.updated,
+            "errors": [
+                {"line": line, "messages": messages} for line, messages in self.errors
+            ],
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "dry_run": self.dry_run,
+        }
+
+    def write_errors_csv(self, output):
+        writer = csv.writer(output)
+        writer.writerow(["linha", "erros"])
+        for line, messages in self.errors:
+            writer.writerow([line, "; ".join(messages)])
+
+
+def _clean(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _parse(value, formats, parser):
+    for fmt in formats:
+        try:
+            return parser(datetime.strptime(value, fmt))
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+def _normalize_row(row):
+    return {key.strip(): _clean(value) for key, value in row.items() if key}
+
+
+def validate_row(line, row, context, document_keys=None):
+    """
+    Valida e normaliza uma linha de importação. Função pura, executada nos
+    processos de validação.
+
+    ``document_keys`` traz as chaves dos documentos já validadas em lote
+    (ver ``validate_chunk``); sem ela, os documentos são validados aqui.
+
+    Retorna ``(line, dados_limpos, erros)``.
+    """
+    if not isinstance(row, dict):
+        return line, None, ["linha inválida"]
+    row = _normalize_row(row)
+    errors = []
+    data = {}
+
+    for name in REQUIRED_FIELDS:
+        if not row.get(name):
+            errors.append(f"{name}: obrigatório")
+
+    if document_keys is None:
+        document_keys = {
+            kind: validate_documents(kind, [row.get(kind)])[0] for kind in VALIDATORS
+        }
+    for kind in VALIDATORS:
+        data[f"{kind}_digits"] = document_keys[kind]
+        if row.get(kind) and document_keys[kind] is None:
+            errors.append(f"{kind}: documento inválido")
+    if data["cpf_digits"]:
+        data["cpf"] = format_cpf(data["cpf_digits"])
+
+    if row.get("birth_date"):
+        try:
+            data["birth_date"] = _parse(row["birth_date"], DATE_FORMATS, datetime.date)
+        except ValueError:
+            errors.append("birth_date: data inválida")
+    for name in ("start_time", "end_time"):
+        if row.get(name):
+            try:
+                data[name] = _parse(row[name], TIME_FORMATS, datetime.time)
+            except ValueError:
+                errors.append(f"{name}: horário inválido")
+
+    row.setdefault("employment_status", "active")
+    row["employment_status"] = row["employment_status"] or "active"
+    for name, mapping in context.choices.items():
+        value = row.get(name)
+        if not value:
+            continue
+        if value.lower() in mapping:
+            data[name] = mapping[value.lower()]
+        else:
+            errors.append(f"{name}: opção inválida '{value}'")
+
+    data["role_id"] = None
+    if row.get("role"):
+        data["role_id"] = context.roles.get(row["role"].lower())
+        if data["role_id"] is None:
+            errors.append(f"role: cargo desconhecido '{row['role']}'")
+
+    if row.get("email"):
+        try:
+            validate_email(row["email"])
+        except ValidationError:
+            errors.append("email: endereço inválido")
+
+    data["full_name"] = row.get("full_name", "")
+    data["email"] = row.get("email", "")
+    data["username"] = (
+        row.get("username") or row.get("email") or only_digits(row.get("cpf"))
+    )
+    for name in ("rg", "phone", "ctps", "pis_pasep", "cnh"):
+        data[name] = row.get(name) or None
+
+    address = {name: row.get(name) or None for name in ADDRESS_FIELDS}
+    if any(address.values()):
+        missing = [name for name in ADDRESS_REQUIRED if not address[name]]
+        if missing:
+            errors.append(f"endereço incompleto: {', '.join(missing)}")
+        address["country"] = address["country"] or "Brasil"
+        data["address"] = address
+
+    if data.get("payment_type"):
+        data["payment"] = {name: row.get(name) or None for name in PAYMENT_FIELDS}
+        data["payment"]["payment_type"] = data.pop("payment_type")
+
+    return line, (None if errors else data), errors
+
+
+def validate_chunk(chunk, context):
+    """
+    Valida um bloco de linhas; os documentos de cada tipo são validados em
+    uma única chamada para o bloco todo.
+    """
+    rows = [_normalize_row(row) if isinstance(row, dict) else None for _, row in chunk]
+    keys = {
+        kind: validate_documents(kind, [row.get(kind) if row else "" for row in rows])
+        for kind in VALIDATORS
+    }
+    return [
+        validate_row(
+            line,
+            row,
+            context,
+            document_keys={kind: keys[kind][index] for kind in VALIDATORS},
+        )
+        for index, (line, row) in enumerate(chunk)
+    ]
+
+
+def read_rows(stream, fmt="csv"):
+    """
+    Lê linhas de um arquivo texto CSV ou JSONL, devolvendo ``(linha, dict)``.
+    """
+    if fmt == "jsonl":
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError:
+                yield line, None
+        return
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _invalidate_caches(user_ids, role_ids, moved):
+    # bulk_create não dispara os sinais que descartam esses caches
+    for user_id in user_ids:
+        access.invalidate_user(user_id)
+        fragments.invalidate_user(user_id)
+        user_cache.invalidate_user(user_id)
+    for role_id in role_ids:
+        access.invalidate_role(role_id)
+        fragments.invalidate_role(role_id)
+    # O cargo também é guardado nas árvores de disponibilidade
+    if moved:
+        availability.invalidate_all()
+    dashboard.invalidate(*DASHBOARD_METRICS)
+
+
+class EmployeeImporter:
+    """
+    Importa funcionários em massa: valida as linhas em um pool de
+    processos e grava cada bloco com ``bulk_create`` em uma transação,
+    fazendo upsert pela chave canônica do CPF.
+
+    Usuários só são criados, nunca alterados: uma linha nova cujo usuário
+    ou e-mail já existe é recusada.
+    """
+
+    def __init__(self, chunk_size=500, workers=None, dry_run=False):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.dry_run = dry_run
+        self.report = ImportReport(dry_run=dry_run)
+
+    def validated_chunks(self, rows):
+        context = ImportContext.load()
+        chunks = _chunks(rows, self.chunk_size)
+        if self.workers == 0:
+            for chunk in chunks:
+                yield validate_chunk(chunk, context)
+            return
+        # Conexões abertas não devem ser herdadas pelos processos filhos
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=django.setup
+        ) as executor:
+            yield from executor.map(validate_chunk, chunks, repeat(context))
+
+    def run(self, rows):
+        started = time.perf_counter()
+        seen_cpfs, seen_usernames, seen_emails = set(), set(), set()
+        for results in self.validated_chunks(rows):
+            valid = []
+            for line, data, errors in results:
+                self.report.total += 1
+                email = data["email"].lower() if data is not None else ""
+                if data is not None and data["cpf_digits"] in seen_cpfs:
+                    errors, data = ["cpf: duplicado no arquivo"], None
+                elif data is not None and data["username"] in seen_usernames:
+                    errors, data = ["username: duplicado no arquivo"], None
+                elif email and email in seen_emails:
+                    errors, data = ["email: duplicado no arquivo"], None
+                if data is None:
+                    self.report.errors.append((line, errors))
+                    continue
+                seen_cpfs.add(data["cpf_digits"])
+                seen_usernames.add(data["username"])
+                if email:
+                    seen_emails.add(email)
+                data["line"] = line
+                valid.append(data)
+            valid = self.check_conflicts(valid)
+            if valid and not self.dry_run:
+                self.write_chunk(valid)
+        self.report.elapsed = time.perf_counter() - started
+        return self.report
+
+    def check_conflicts(self, rows):
+        """
+        Recusa as linhas de funcionários novos cujo usuário ou e-mail já
+        pertence a outra conta. Retorna as linhas restantes.
+        """
+        existing = set(
+            Employee.objects.filter(
+                cpf_digits__in=[row["cpf_digits"] for row in rows]
+            ).values_list("cpf_digits", flat=True)
+        )
+        new_rows = [row for row in rows if row["cpf_digits"] not in existing]
+        usernames = set(
+            User.objects.filter(
+                username__in=[row["username"] for row in new_rows]
+            ).values_list("username", flat=True)
+        )
+        emails = set(
+            User.objects.annotate(email_lower=Lower("email"))
+            .exclude(email="")
+            .filter(email_lower__in=[row["email"].lower() for row in new_rows])
+            .values_list("email_lower", flat=True)
+        )
+        accepted = []
+        for row in rows:
+            errors = []
+            if row["cpf_digits"] not in existing:
+                if row["username"] in usernames:
+                    errors.append("username: já cadastrado")
+                if row["email"] and row["email"].lower() in emails:
+                    errors.append("email: já cadastrado")
+            if errors:
+                self.report.errors.append((row["line"], errors))
+            else:
+                accepted.append(row)
+        return accepted
+
+    def write_chunk(self, rows):
+        try:
+            self.write(rows)
+        except IntegrityError:
+            # Conflito com uma gravação concorrente: grava linha a linha para
+            # recusar só as linhas afetadas
+            for row in rows:
+                try:
+                    self.write([row])
+                except IntegrityError as exc:
+                    self.report.errors.append((row["line"], [f"conflito: {exc}"]))
+
+    def write(self, rows):
+        now = timezone.now()
+        keys = [row["cpf_digits"] for row in rows]
+        with transaction.atomic():
+            existing = {
+                cpf_digits: (user_id, role_id)
+                for cpf_digits, user_id, role_id in Employee.objects.filter(
+                    cpf_digits__in=keys
+                ).values_list("cpf_digits", "user_id", "role_id")
+            }
+            new_rows = [row for row in rows if row["cpf_digits"] not in existing]
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=row["username"],
+                        email=row["email"],
+                        full_name=row["full_name"],
+                        password=make_password(None),
+                    )
+                    for row in new_rows
+                ]
+            )
+            user_ids = dict(
+                User.objects.filter(
+                    username__in=[row["username"] for row in new_rows]
+                ).values_list("username", "id")
+            )
+            for row in rows:
+                if row["cpf_digits"] in existing:
+                    row["user_id"] = existing[row["cpf_digits"]][0]
+                else:
+                    row["user_id"] = user_ids[row["username"]]
+
+            employees = [
+                Employee(
+                    user_id=row["user_id"],
+                    cpf=row["cpf"],
+                    cpf_digits=row["cpf_digits"],
+                    pis_pasep_digits=row["pis_pasep_digits"],
+                    ctps_digits=row["ctps_digits"],
+                    cnh_digits=row["cnh_digits"],
+                    rg=row["rg"],
+                    ctps=row["ctps"],
+                    pis_pasep=row["pis_pasep"],
+                    cnh=row["cnh"],
+                    phone=row["phone"],
+                    birth_date=row["birth_date"],
+                    start_time=row["start_time"],
+                    end_time=row["end_time"],
+                    gender=row["gender"],
+                    employment_status=row["employment_status"],
+                    contract_type=row["contract_type"],
+                    payment_method=row["payment_method"],
+                    role_id=row["role_id"],
+                    display_name=row["full_name"] or row["username"],
+                    updated_at=now,
+                )
+                for row in rows
+            ]
+            Employee.objects.bulk_create(
+                employees,
+                update_conflicts=True,
+                unique_fields=["cpf_digits"],
+                update_fields=EMPLOYEE_UPDATE_FIELDS,
+            )
+            employee_ids = dict(
+                Employee.objects.filter(cpf_digits__in=keys).values_list(
+                    "cpf_digits", "id"
+                )
+            )
+
+            # Endereços só são criados para funcionários novos
+            new_addresses = [row for row in new_rows if "address" in row]
+            addresses = Address.objects.bulk_create(
+                [Address(**row["address"]) for row in new_addresses]
+            )
+            Address.employees.through.objects.bulk_create(
+                [
+                    Address.employees.through(
+                        address_id=address.id,
+                        employee_id=employee_ids[row["cpf_digits"]],
+                    )
+                    for address, row in zip(addresses, new_addresses)
+                ]
+            )
+
+            PaymentDetails.objects.bulk_create(
+                [
+                    PaymentDetails(
+                        employee_id=employee_ids[row["cpf_digits"]],
+                        **row["payment"],
+                    )
+                    for row in rows
+                    if "payment" in row
+                ],
+                update_conflicts=True,
+                unique_fields=["employee"],
+                update_fields=list(PAYMENT_FIELDS),
+            )
+
+            # bulk_create não dispara sinais: o índice de busca e os caches
+            # são atualizados aqui
+            search.index_employees(employee_ids.values())
+            moved = {
+                role_id
+                for row in rows
+                if row["cpf_digits"] in existing
+                and existing[row["cpf_digits"]][1] != row["role_id"]
+                for role_id in (existing[row["cpf_digits"]][1], row["role_id"])
+            }
+            role_ids = moved | {row["role_id"] for row in new_rows}
+            role_ids.discard(None)
+            affected = [row["user_id"] for row in rows]
+            transaction.on_commit(
+                lambda: _invalidate_caches(affected, role_ids, bool(moved))
+            )
+
+        self.report.created += len(new_rows)
+        self.report.updated += len(rows) - len(new_rows)
+
+
+def import_employees(stream, fmt="csv", chunk_size=500, workers=None, dry_run=False):
+    """
+    Importa funcionários de um arquivo texto CSV/JSONL e retorna o relatório.
+    """
+    importer = EmployeeImporter(
+        chunk_size=chunk_size, workers=workers, dry_run=dry_run
+    )
+    return importer.run(read_rows(stream, fmt))
+
+
+def open_text(upload):
+    """
+    Abre um arquivo enviado como texto UTF-8 (com ou sem BOM) sem lê-lo
+    inteiro em memória.
+    """
+    return io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
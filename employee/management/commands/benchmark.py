@@ -0,0 +1,263 @@
+import json
+import platform
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from employee import dashboard, payroll
+from employee.exports import stream_export
+from employee.models import Employee
+
+from .seed_benchmark import LAST_NAMES, PASSWORD, PREFIX
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    run: object
+    # Operações pesadas (varrem a base toda) rodam menos vezes
+    heavy: bool = False
+
+
+class Context:
+    """
+    Estado compartilhado pelos cenários: usuário logado, cliente HTTP e
+    amostra de funcionários.
+    """
+
+    def __init__(self, user, rng):
+        self.user = user
+        self.rng = rng
+        self.client = Client()
+        self.client.force_login(user, backend="accounts.backends.EmailBackend")
+        self.employee_ids = list(
+            Employee.objects.order_by("?").values_list("pk", flat=True)[:500]
+        )
+
+    def get(self, path):
+        response = self.client.get(path)
+        if response.status_code >= 400:
+            raise RuntimeError(f"GET {path}: HTTP {response.status_code}")
+        # Consome respostas em streaming para medir o corpo inteiro
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+
+def login(context):
+    client = Client()
+    response = client.post(
+        reverse("login"), {"email": context.user.email, "password": PASSWORD}
+    )
+    if response.status_code != 302 or response.url != reverse("index"):
+        raise RuntimeError("Login recusado")
+
+
+def dashboard_page(context):
+    context.get(reverse("index"))
+
+
+def dashboard_metrics(context):
+    for name in dashboard.METRICS:
+        dashboard.refresh(name)
+
+
+def employee_list(context):
+    context.get(reverse("employee-list"))
+
+
+def employee_detail(context):
+    context.get(reverse("employee-detail", args=[context.rng.choice(context.employee_ids)]))
+
+
+def employee_search(context):
+    query = context.rng.choice(LAST_NAMES)[:4]
+    context.get(f"{reverse('employee-search')}?q={query}")
+
+
+def export(context):
+    for _ in stream_export("employees", "csv"):
+        pass
+
+
+def payroll_run(context):
+    today = date.today()
+    payroll.run_payroll(today.year, today.month, dry_run=True)
+
+
+SCENARIOS = (
+    Scenario("login", login),
+    Scenario("dashboard", dashboard_page),
+    Scenario("dashboard_metrics", dashboard_metrics, heavy=True),
+    Scenario("employee_list", employee_list),
+    Scenario("employee_detail", employee_detail),
+    Scenario("search", employee_search),
+    Scenario("export", export, heavy=True),
+    Scenario("payroll_run", payroll_run, heavy=True),
+)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede as operações principais (login, painel, listagem e detalhe de "
+        "funcionários, busca, exportação e folha) na base atual e compara com "
+        "um baseline em JSON. Gere a base com manage.py seed_benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=30, help="Execuções de cada cenário"
+        )
+        parser.add_argument(
+            "--heavy-iterations",
+            type=int,
+            default=3,
+            help="Execuções dos cenários que varrem a base toda",
+        )
+        parser.add_argument(
+            "--only", action="append", help="Roda só o cenário (pode ser repetido)"
+        )
+        parser.add_argument("--output", help="Grava os resultados neste JSON")
+        parser.add_argument("--baseline", help="JSON de uma execução anterior")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Aumento tolerado no p95 e no pico de memória (0.25 = 25%%)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=42, help="Semente do gerador aleatório"
+        )
+
+    def handle(self, *args, **options):
+        user = (
+            User.objects.filter(username__startswith=PREFIX).order_by("pk").first()
+        )
+        if user is None:
+            raise CommandError("Base vazia: rode manage.py seed_benchmark antes.")
+        scenarios = [
+            scenario
+            for scenario in SCENARIOS
+            if not options["only"] or scenario.name in options["only"]
+        ]
+        if not scenarios:
+            raise CommandError(f"Cenários disponíveis: {', '.join(s.name for s in SCENARIOS)}")
+
+        # O painel lê as métricas do cache; sem isso a primeira leitura só
+        # dispara o cálculo em segundo plano
+        dashboard.warm()
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            context = Context(user, random.Random(options["seed"]))
+            results = {}
+            for scenario in scenarios:
+                iterations = (
+                    options["heavy_iterations"] if scenario.heavy else options["iterations"]
+                )
+                results[scenario.name] = self.measure(scenario, context, iterations)
+                self.report(scenario.name, results[scenario.name])
+
+        data = {
+            "meta": {
+                "employees": Employee.objects.count(),
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+                "date": date.today().isoformat(),
+            },
+            "scenarios": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(data, output, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultados gravados em {options['output']}")
+        if options["baseline"]:
+            self.compare(data, options["baseline"], options["threshold"])
+
+    def measure(self, scenario, context, iterations):
+        try:
+            # Primeira execução fora da medição (caches, imports, templates)
+            scenario.run(context)
+            timings, queries = [], []
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    scenario.run(context)
+                    timings.append(time.perf_counter() - started)
+                queries.append(len(captured))
+            # Memória medida à parte: o tracemalloc deixa tudo mais lento
+            tracemalloc.start()
+            try:
+                scenario.run(context)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        except Exception as error:
+            return {"error": f"{type(error).__name__}: {error}"}
+        return {
+            "iterations": iterations,
+            "p50_ms": round(percentile(timings, 0.5) * 1000, 3),
+            "p95_ms": round(percentile(timings, 0.95) * 1000, 3),
+            "queries": max(queries),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+    def report(self, name, result):
+        if "error" in result:
+            self.stdout.write(self.style.ERROR(f"{name}: {result['error']}"))
+            return
+        self.stdout.write(
+            f"{name}: p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+            f"{result['queries']} consultas, pico {result['peak_kib']:.0f} KiB"
+        )
+
+    def compare(self, data, path, threshold):
+        with open(path, encoding="utf-8") as source:
+            baseline = json.load(source)
+        if baseline["meta"].get("employees") != data["meta"]["employees"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Baseline medido com {baseline['meta'].get('employees')} "
+                    f"funcionários; a base atual tem {data['meta']['employees']}."
+                )
+            )
+        regressions = []
+        for name, current in data["scenarios"].items():
+            previous = baseline["scenarios"].get(name)
+            if previous is None or "error" in previous:
+                continue
+            if "error" in current:
+                regressions.append(f"{name}: {current['error']}")
+                continue
+            for metric in ("p95_ms", "peak_kib"):
+                limit = previous[metric] * (1 + threshold)
+                if current[metric] > limit:
+                    regressions.append(
+                        f"{name}: {metric} {current[metric]} > {previous[metric]} "
+                        f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)"
+                    )
+            # Consultas não têm ruído: qualquer aumento é regressão
+            if current["queries"] > previous["queries"]:
+                regressions.append(
+                    f"{name}: {current['queries']} consultas > {previous['queries']}"
+                )
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(line))
+            raise CommandError(f"{len(regressions)} regressões em relação a {path}")
+        self.stdout.write(self.style.SUCCESS(f"Sem regressões em relação a {path}"))
@@ -0,0 +1,119 @@
+import time
+from datetime import date
+from datetime import time as clock
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from employee import tracking
+from employee.models import DataChangeHistory, Employee
+
+PREFIX = "bench-tracking-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o custo do save() de funcionários sem histórico, com o "
+        "rastreamento por snapshot e com o padrão de reler a linha antiga."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=500,
+            help="Funcionários temporários criados para a medição",
+        )
+        parser.add_argument(
+            "--rounds", type=int, default=3, help="Repetições de cada cenário"
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        ids = self.create_employees(count)
+        try:
+            results = {}
+            for name, scenario in (
+                ("sem histórico", self.without_tracking),
+                ("snapshot (from_db)", self.with_tracking),
+                ("SELECT da linha antiga", self.with_refetch),
+            ):
+                timings = []
+                for round_number in range(options["rounds"]):
+                    employees = list(Employee.objects.filter(pk__in=ids))
+                    started = time.perf_counter()
+                    scenario(employees, f"{name[:3]}{round_number}")
+                    timings.append(time.perf_counter() - started)
+                results[name] = min(timings)
+        finally:
+            DataChangeHistory.objects.filter(employee_id__in=ids).delete()
+            User.objects.filter(username__startswith=PREFIX).delete()
+
+        baseline = results["sem histórico"]
+        for name, seconds in results.items():
+            overhead = (seconds / baseline - 1) * 100 if baseline else 0
+            self.stdout.write(
+                f"{name}: {seconds * 1e6 / count:.0f} µs/save "
+                f"({overhead:+.1f}% sobre sem histórico)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{count} saves por cenário"))
+
+    def create_employees(self, count):
+        users = User.objects.bulk_create(
+            [User(username=f"{PREFIX}{index}") for index in range(count)]
+        )
+        employees = []
+        for index, user in enumerate(users):
+            employee = Employee(
+                user=user,
+                birth_date=date(1990, 1, 1),
+                cpf=f"9{index:010d}",
+                rg=str(index),
+                phone="0",
+                start_time=clock(8),
+                end_time=clock(17),
+                gender="M",
+                employment_status="active",
+                contract_type="clt",
+                payment_method="monthly",
+                display_name=user.username,
+            )
+            employee.set_document_keys()
+            employees.append(employee)
+        Employee.objects.bulk_create(employees)
+        return list(
+            Employee.objects.filter(user__in=users).values_list("pk", flat=True)
+        )
+
+    def without_tracking(self, employees, marker):
+        with tracking.paused():
+            for employee in employees:
+                employee.phone = marker
+                employee.save()
+
+    def with_tracking(self, employees, marker):
+        for employee in employees:
+            employee.phone = marker
+            employee.save()
+
+    def with_refetch(self, employees, marker):
+        fields = tracking.tracked_fields(Employee)
+        with tracking.paused():
+            for employee in employees:
+                employee.phone = marker
+                old = Employee.objects.get(pk=employee.pk)
+                employee.save()
+                DataChangeHistory.objects.bulk_create(
+                    [
+                        DataChangeHistory(
+                            employee_id=employee.pk,
+                            model_name="employee",
+                            object_id=employee.pk,
+                            field_name=name,
+                            old_value=getattr(old, attname),
+                            new_value=getattr(employee, attname),
+                        )
+                        for attname, name in fields
+                        if getattr(old, attname) != getattr(employee, attname)
+                    ]
+                )
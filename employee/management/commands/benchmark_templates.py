@@ -0,0 +1,107 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template import Engine, RequestContext, engines
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from employee import fragments
+
+# Páginas medidas e o contexto passado pela view de cada uma
+PAGES = {
+    "index.html": {"metrics": {}},
+    "auth/login.html": {},
+    "auth/suporte.html": {},
+}
+LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o tempo de renderização das páginas sem cache de templates, "
+        "com o loader em cache e com o loader mais o cache de fragmentos "
+        "do layout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=200, help="Renderizações por cenário"
+        )
+        parser.add_argument(
+            "--user",
+            help="Usuário logado nas páginas (padrão: o primeiro superusuário)",
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["user"])
+        request = RequestFactory().get("/")
+        request.user = user
+        role_id = user.employee.role_id if hasattr(user, "employee") else None
+
+        def cold_fragments():
+            fragments.invalidate_user(user.pk)
+            fragments.invalidate_role(role_id or 0)
+
+        scenarios = (
+            ("sem cache", self.build_engine(cached=False), cold_fragments),
+            ("loader em cache", self.build_engine(cached=True), cold_fragments),
+            ("loader + fragmentos", self.build_engine(cached=True), None),
+        )
+        iterations = options["iterations"]
+        for page, context in PAGES.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(page))
+            baseline = None
+            for name, engine, before in scenarios:
+                # Uma renderização fora da medição aquece caches e imports
+                engine.get_template(page).render(RequestContext(request, context))
+                timings = []
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(iterations):
+                        if before is not None:
+                            before()
+                        started = time.perf_counter()
+                        engine.get_template(page).render(
+                            RequestContext(request, context)
+                        )
+                        timings.append(time.perf_counter() - started)
+                timings.sort()
+                mean = sum(timings) / len(timings)
+                line = (
+                    f"  {name}: média {mean * 1000:.2f} ms, "
+                    f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.2f} ms, "
+                    f"{len(queries) / iterations:.1f} consultas"
+                )
+                if baseline is None:
+                    baseline = mean
+                else:
+                    line += f" ({(1 - mean / baseline) * 100:.0f}% menos que sem cache)"
+                self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f"{iterations} renderizações por cenário"))
+
+    def get_user(self, username):
+        users = User.objects.all()
+        user = (
+            users.filter(username=username).first()
+            if username
+            else users.filter(is_superuser=True).order_by("pk").first()
+        )
+        if user is None:
+            raise CommandError("Usuário não encontrado.")
+        return user
+
+    def build_engine(self, cached):
+        base = engines["django"].engine
+        loaders = [("django.template.loaders.cached.Loader", LOADERS)] if cached else LOADERS
+        return Engine(
+            dirs=base.dirs,
+            loaders=loaders,
+            context_processors=base.context_processors,
+            libraries=base.libraries,
+            builtins=[],
+            debug=False,
+        )
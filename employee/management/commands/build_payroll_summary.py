@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from employee import dashboard, payroll_summary
+
+
+class Command(BaseCommand):
+    help = "Recria a tabela de resumos mensais da folha (PayrollPeriodSummary)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--employee",
+            type=int,
+            action="append",
+            dest="employees",
+            help="Recria apenas o funcionário informado (pode ser repetido)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Quantidade de resumos por bulk_create",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = payroll_summary.rebuild(
+            employee_ids=options["employees"], batch_size=options["batch_size"]
+        )
+        dashboard.invalidate("payroll_cost")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} resumos gravados em {time.perf_counter() - started:.2f}s"
+            )
+        )
@@ -0,0 +1,58 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from employee.exports import CHUNK_SIZE, EXPORTS, FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta funcionários, salários ou ausências em CSV/XLSX "
+        "sem carregar tudo em memória."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(EXPORTS))
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--output", help="Arquivo de saída (padrão: stdout)")
+        parser.add_argument("--gzip", action="store_true", help="Comprime a saída")
+        parser.add_argument("--start", help="Data inicial AAAA-MM-DD")
+        parser.add_argument("--end", help="Data final AAAA-MM-DD")
+        parser.add_argument("--status", help="Situação de emprego (employment_status)")
+        parser.add_argument("--role", type=int, help="ID do cargo")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        for name in ("start", "end"):
+            if options[name] and parse_date(options[name]) is None:
+                raise CommandError(f"Data inválida em --{name}, use AAAA-MM-DD.")
+
+        chunks = stream_export(
+            options["dataset"],
+            options["format"],
+            compress=options["gzip"],
+            chunk_size=options["chunk_size"],
+            start=options["start"],
+            end=options["end"],
+            employment_status=options["status"],
+            role=options["role"],
+        )
+        started = time.perf_counter()
+        written = 0
+        output = open(options["output"], "wb") if options["output"] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if options["output"]:
+                output.close()
+        if options["output"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{written} bytes gravados em {options['output']} "
+                    f"({time.perf_counter() - started:.2f}s)"
+                )
+            )
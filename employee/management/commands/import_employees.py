@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from employee.importer import import_employees
+
+
+class Command(BaseCommand):
+    help = "Importa funcionários em massa a partir de um arquivo CSV ou JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Arquivo CSV ou JSONL")
+        parser.add_argument(
+            "--format", choices=["csv", "jsonl"], help="Padrão: pela extensão"
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Processos de validação (0 valida no processo atual)",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Só valida, não grava"
+        )
+        parser.add_argument("--errors", help="Grava o relatório de erros neste CSV")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or (
+            "jsonl" if options["path"].endswith(".jsonl") else "csv"
+        )
+        with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+            report = import_employees(
+                stream,
+                fmt=fmt,
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+                dry_run=options["dry_run"],
+            )
+
+        for line, messages in report.errors[:20]:
+            self.stderr.write(f"linha {line}: {'; '.join(messages)}")
+        if len(report.errors) > 20:
+            self.stderr.write(f"... mais {len(report.errors) - 20} linhas com erro")
+        if options["errors"]:
+            with open(options["errors"], "w", encoding="utf-8", newline="") as output:
+                report.write_errors_csv(output)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report.total} linhas em {report.elapsed:.2f}s "
+                f"({report.rows_per_second:.0f} linhas/s): {report.created} criados, "
+                f"{report.updated} atualizados, {len(report.errors)} com erro"
+                + (" (simulação)" if report.dry_run else "")
+            )
+        )
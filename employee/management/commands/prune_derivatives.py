@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from employee import derivatives
+from employee.models import Achievement
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica a cota de disco das miniaturas (remove as usadas há mais "
+        "tempo) e, opcionalmente, gera as miniaturas das conquistas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-bytes",
+            type=int,
+            help="Cota em bytes (padrão: DERIVATIVES_MAX_BYTES)",
+        )
+        parser.add_argument(
+            "--warm",
+            action="store_true",
+            help="Gera agora as miniaturas de todas as conquistas",
+        )
+
+    def handle(self, *args, **options):
+        if options["warm"]:
+            total = 0
+            for achievement in Achievement.objects.iterator():
+                derivatives.generate(achievement, wait=True)
+                total += 1
+            self.stdout.write(f"Miniaturas geradas para {total} conquistas")
+        removed, freed = derivatives.enforce_quota(options["max_bytes"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{removed} miniaturas removidas ({freed / 1024 / 1024:.1f} MB)"
+            )
+        )
@@ -0,0 +1,87 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from employee import uploads
+from employee.models import Document, UploadedFile, UploadSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove arquivos sem documentos e sessões de envio abandonadas; "
+        "opcionalmente calcula o hash de arquivos antigos e une duplicatas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=float,
+            default=24,
+            help="Idade mínima, em horas, para remover (padrão: 24)",
+        )
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Calcula o SHA-256 de arquivos enviados antes da deduplicação",
+        )
+
+    def handle(self, *args, **options):
+        if options["backfill"]:
+            merged = self.backfill()
+            self.stdout.write(f"Duplicatas unidas: {merged}")
+
+        limit = timezone.now() - timedelta(hours=options["older_than"])
+        orphans = UploadedFile.objects.filter(ref_count=0, uploaded_at__lt=limit)
+        removed = 0
+        for uploaded in orphans.iterator():
+            uploaded.delete()
+            removed += 1
+
+        sessions = UploadSession.objects.filter(
+            uploaded_file__isnull=True, updated_at__lt=limit
+        )
+        expired = 0
+        for session in sessions.iterator():
+            path = uploads.session_path(session)
+            if os.path.exists(path):
+                os.remove(path)
+            session.delete()
+            expired += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{removed} arquivos sem documentos e {expired} sessões removidos"
+            )
+        )
+
+    def backfill(self):
+        through = Document.files.through
+        merged = 0
+        for uploaded in UploadedFile.objects.filter(sha256__isnull=True).iterator():
+            if not uploaded.file or not uploaded.file.storage.exists(uploaded.file.name):
+                continue
+            uploaded.compute_digest()
+            uploaded.file.close()
+            with transaction.atomic():
+                kept = UploadedFile.objects.filter(sha256=uploaded.sha256).first()
+                if kept is None:
+                    UploadedFile.objects.filter(pk=uploaded.pk).update(
+                        sha256=uploaded.sha256, size=uploaded.size
+                    )
+                    continue
+                # Move as referências para o arquivo já existente
+                linked = set(
+                    through.objects.filter(uploadedfile=kept).values_list(
+                        "document_id", flat=True
+                    )
+                )
+                through.objects.filter(uploadedfile=uploaded).exclude(
+                    document_id__in=linked
+                ).update(uploadedfile=kept)
+                uploaded.delete()
+                merged += 1
+        uploads.recount_references(UploadedFile.objects.values_list("pk", flat=True))
+        return merged
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from employee import search
+
+
+class Command(BaseCommand):
+    help = "Recria o índice de busca de funcionários (FTS5 no SQLite e trigramas)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Quantidade de funcionários indexados por bloco",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = search.rebuild(batch_size=options["batch_size"])
+        engine = "FTS5 + trigramas" if search.fts_available() else "trigramas"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} funcionários indexados ({engine}) em "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+        )
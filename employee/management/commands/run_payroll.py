@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employee.payroll import run_payroll
+
+
+class Command(BaseCommand):
+    help = "Calcula INSS, IRRF e salário líquido de um mês de competência."
+
+    def add_arguments(self, parser):
+        parser.add_argument("competence", help="Mês de competência no formato AAAA-MM")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Quantidade de salários por bulk_update",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Calcula sem gravar os resultados",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            competence = datetime.strptime(options["competence"], "%Y-%m")
+        except ValueError:
+            raise CommandError("Competência inválida, use o formato AAAA-MM.")
+
+        report = run_payroll(
+            competence.year,
+            competence.month,
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+
+        for name, seconds in report.timings.items():
+            self.stdout.write(f"{name}: {seconds * 1000:.1f} ms")
+        self.stdout.write(
+            f"Funcionários: {report.employees} | Processados: {report.processed} "
+            f"| Sem salário vigente: {len(report.skipped)}"
+        )
+        self.stdout.write(
+            f"Total bruto: {report.total_gross} | Total líquido: {report.total_net}"
+        )
+        message = f"Folha {options['competence']} calculada em {report.total_time:.2f}s"
+        if report.dry_run:
+            message += " (simulação, nada foi gravado)"
+        self.stdout.write(self.style.SUCCESS(message))
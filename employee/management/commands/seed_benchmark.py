@@ -0,0 +1,284 @@
+import random
+import time
+from datetime import date, timedelta
+from datetime import time as clock
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import ActionLog, User
+from employee import dashboard, payroll_summary, search
+from employee.models import (
+    Absence,
+    Document,
+    Employee,
+    Leave,
+    PerformanceReview,
+    Role,
+    Salary,
+    Vacation,
+)
+
+# Prefixo dos usuários gerados (usado também para apagá-los)
+PREFIX = "bench-"
+# Senha de todos os usuários gerados (usada pelo manage.py benchmark)
+PASSWORD = "bench-password"
+
+FIRST_NAMES = (
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique",
+    "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+    "Sabrina", "Thiago", "Vanessa", "William", "Yasmin", "Lucas", "Mariana", "Pedro",
+)
+LAST_NAMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves",
+    "Pereira", "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho",
+    "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa", "Rocha",
+)
+ROLES = (
+    ("Vendedor", "VEN"),
+    ("Montador de Móveis", "MON"),
+    ("Gerente de Loja", "GER"),
+    ("Caixa", "CXA"),
+    ("Estoquista", "EST"),
+    ("Entregador", "ENT"),
+    ("Designer de Interiores", "DES"),
+    ("Analista Financeiro", "FIN"),
+    ("Assistente Administrativo", "ADM"),
+    ("Motorista", "MOT"),
+)
+ACTIONS = (
+    "Atualizou o cadastro",
+    "Enviou um documento",
+    "Solicitou férias",
+    "Registrou uma ausência",
+    "Consultou o holerite",
+)
+
+
+def fake_cpf(number):
+    """
+    CPF válido (com dígitos verificadores) derivado de um número sequencial.
+    """
+    digits = [int(d) for d in f"{number % 10**9:09d}"]
+    for length in (9, 10):
+        total = sum(d * (length + 1 - i) for i, d in enumerate(digits[:length]))
+        digits.append((total * 10 % 11) % 10)
+    text = "".join(map(str, digits))
+    return f"{text[:3]}.{text[3:6]}.{text[6:9]}-{text[9:]}"
+
+
+def money(value):
+    return Decimal(value).quantize(Decimal("0.01"))
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera uma base sintética de RH (usuários, cargos, salários, ausências, "
+        "documentos e registros de ações) com bulk inserts, para o "
+        "manage.py benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--employees", type=int, default=1000, help="Funcionários gerados"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Funcionários gravados por transação",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=42, help="Semente do gerador aleatório"
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Apaga os dados gerados anteriormente antes de gerar",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options["clear"]:
+            self.clear()
+        rng = random.Random(options["seed"])
+        roles = self.create_roles()
+        password = make_password(PASSWORD)
+        offset = User.objects.filter(username__startswith=PREFIX).count()
+        counts = {}
+        total = options["employees"]
+        batch_size = options["batch_size"]
+        for start in range(offset, offset + total, batch_size):
+            stop = min(start + batch_size, offset + total)
+            with transaction.atomic():
+                for model, created in self.create_batch(
+                    range(start, stop), roles, password, rng
+                ).items():
+                    counts[model] = counts.get(model, 0) + created
+            self.stdout.write(f"{stop - offset}/{total} funcionários")
+
+        self.stdout.write("Recriando o índice de busca e os resumos da folha...")
+        search.rebuild()
+        payroll_summary.rebuild()
+        dashboard.invalidate(*dashboard.METRICS)
+
+        for model, created in counts.items():
+            self.stdout.write(f"  {model}: {created}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} funcionários gerados em {time.perf_counter() - started:.1f}s"
+                f" (senha dos usuários: {PASSWORD})"
+            )
+        )
+
+    def clear(self):
+        users = User.objects.filter(username__startswith=PREFIX)
+        ActionLog.objects.filter(user__in=users).delete()
+        deleted, _ = users.delete()
+        self.stdout.write(f"{deleted} registros gerados anteriormente apagados")
+
+    def create_roles(self):
+        roles = []
+        for name, abbreviation in ROLES:
+            role, _ = Role.objects.get_or_create(
+                name=name, defaults={"abbreviation": abbreviation}
+            )
+            roles.append(role)
+        return roles
+
+    def create_batch(self, numbers, roles, password, rng):
+        users = []
+        for number in numbers:
+            full_name = (
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} "
+                f"{rng.choice(LAST_NAMES)}"
+            )
+            users.append(
+                User(
+                    username=f"{PREFIX}{number}",
+                    email=f"{PREFIX}{number}@exemplo.com.br",
+                    full_name=full_name,
+                    password=password,
+                )
+            )
+        User.objects.bulk_create(users)
+        users = list(
+            User.objects.filter(username__in=[user.username for user in users])
+        )
+
+        employees = []
+        for user in users:
+            number = int(user.username[len(PREFIX):])
+            employee = Employee(
+                user=user,
+                birth_date=date(1960, 1, 1) + timedelta(days=rng.randrange(40 * 365)),
+                cpf=fake_cpf(900_000_000 + number),
+                rg=f"{rng.randrange(10**8, 10**9)}",
+                phone=f"119{rng.randrange(10**7, 10**8)}",
+                start_time=clock(rng.choice((7, 8, 9))),
+                end_time=clock(rng.choice((16, 17, 18))),
+                gender=rng.choice(("M", "F")),
+                employment_status=rng.choices(
+                    ("active", "on_leave", "terminated"), (90, 5, 5)
+                )[0],
+                contract_type=rng.choices(
+                    ("clt", "pj", "internship", "apprentice"), (80, 10, 7, 3)
+                )[0],
+                payment_method=rng.choice(("monthly", "biweekly")),
+                role=rng.choice(roles),
+                display_name=user.full_name,
+            )
+            employee.set_document_keys()
+            employees.append(employee)
+        Employee.objects.bulk_create(employees)
+        employees = list(Employee.objects.filter(user__in=users))
+
+        today = date.today()
+        salaries, absences, leaves, vacations = [], [], [], []
+        documents, reviews, logs = [], [], []
+        for employee in employees:
+            # Histórico de salários: reajustes anuais, o último em aberto
+            gross = money(rng.uniform(1500, 15000))
+            start = today.replace(day=1) - timedelta(days=365 * rng.randint(1, 3))
+            while start <= today:
+                end = start + timedelta(days=364)
+                inss, irrf = money(gross * Decimal("0.09")), money(gross * Decimal("0.07"))
+                salaries.append(
+                    Salary(
+                        employee=employee,
+                        start_date=start,
+                        end_date=end if end < today else None,
+                        gross_salary=gross,
+                        net_salary=gross - inss - irrf,
+                        benefits=money(rng.uniform(0, 800)),
+                        inss_discount=inss,
+                        irrf_discount=irrf,
+                    )
+                )
+                start = end + timedelta(days=1)
+                gross = money(gross * Decimal("1.05"))
+            for _ in range(rng.randint(0, 6)):
+                absences.append(
+                    Absence(
+                        employee=employee,
+                        absence_date=today - timedelta(days=rng.randrange(365)),
+                        reason="Consulta médica",
+                        status=rng.choice(("excused", "unexcused")),
+                    )
+                )
+            if rng.random() < 0.1:
+                start = today - timedelta(days=rng.randrange(-30, 180))
+                leaves.append(
+                    Leave(
+                        employee=employee,
+                        leave_type=rng.choice(("sick", "personal")),
+                        start_date=start,
+                        end_date=start + timedelta(days=rng.randint(1, 15)),
+                        status=rng.choice(("approved", "pending")),
+                    )
+                )
+            if rng.random() < 0.3:
+                start = today - timedelta(days=rng.randrange(-60, 300))
+                vacations.append(
+                    Vacation(
+                        employee=employee,
+                        start_date=start,
+                        end_date=start + timedelta(days=29),
+                        days_taken=30,
+                        status=rng.choice(("approved", "pending")),
+                    )
+                )
+            for description in ("Contrato de trabalho", "Comprovante de residência"):
+                documents.append(Document(employee=employee, description=description))
+            for months in (6, 12):
+                reviews.append(
+                    PerformanceReview(
+                        employee=employee,
+                        review_date=today - timedelta(days=30 * months),
+                        score=rng.randint(1, 5),
+                    )
+                )
+            for _ in range(rng.randint(2, 10)):
+                logs.append(
+                    ActionLog(
+                        user_id=employee.user_id,
+                        employee=employee,
+                        action_text=rng.choice(ACTIONS),
+                    )
+                )
+
+        created = {"User": len(users), "Employee": len(employees)}
+        for model, rows in (
+            (Salary, salaries),
+            (Absence, absences),
+            (Leave, leaves),
+            (Vacation, vacations),
+            (Document, documents),
+            (PerformanceReview, reviews),
+            (ActionLog, logs),
+        ):
+            model.objects.bulk_create(rows, batch_size=5000)
+            created[model.__name__] = len(rows)
+        return created
@@ -1,12 +1,53 @@
+import hashlib
+import uuid
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.core.exceptions import ValidationError
+from django.core.files.storage import storages
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from accounts.models import User
 from accounts.mixin import LoggableMixin
+from .documents import VALIDATORS, document_key
+from .tracking import TrackedModelMixin
+
+
+class EmployeeRelatedQuerySet(models.QuerySet):
+    """
+    QuerySet para modelos ligados a um funcionário.
+    """
+
+    def with_display(self):
+        """
+        Carrega o funcionário e o usuário na mesma consulta, evitando uma
+        consulta extra por linha ao exibir ``__str__`` em listagens.
+        """
+        return self.select_related("employee__user")
+
+
+class EmployeeQuerySet(models.QuerySet):
+    """
+    QuerySet de funcionários.
+    """
+
+    def by_document(self, value, kind=None):
+        """
+        Busca pela chave canônica de um documento em qualquer formato
+        (com ou sem máscara). Sem ``kind``, procura em CPF, PIS/PASEP,
+        CTPS e CNH.
+        """
+        key = document_key(value)
+        if key is None:
+            return self.none()
+        kinds = [kind] if kind else list(VALIDATORS)
+        condition = models.Q()
+        for name in kinds:
+            condition |= models.Q(**{f"{name}_digits": key})
+        return self.filter(condition)
 
 
 # Modelo de Funcionário
-class Employee(LoggableMixin, models.Model):
+class Employee(TrackedModelMixin, LoggableMixin, models.Model):
     # Relaciona o funcionário a um usuário do sistema
     user = models.OneToOneField(
         User,
@@ -87,9 +128,68 @@ class Employee(LoggableMixin, models.Model):
         related_name="employees",
         verbose_name=_("Cargo"),
     )
+    # Nome de exibição copiado do usuário (mantido por sinais)
+    display_name = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name=_("Nome de Exibição"),
+    )
+    # Data e hora da última alteração (usada em GETs condicionais da API)
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name=_("Atualizado em")
+    )
+    # Chaves canônicas dos documentos (somente dígitos, mantidas ao salvar)
+    cpf_digits = models.CharField(
+        max_length=11, unique=True, null=True, editable=False, verbose_name=_("CPF")
+    )
+    pis_pasep_digits = models.CharField(
+        max_length=20,
+        null=True,
+        db_index=True,
+        editable=False,
+        verbose_name=_("PIS/PASEP"),
+    )
+    ctps_digits = models.CharField(
+        max_length=20, null=True, db_index=True, editable=False, verbose_name=_("CTPS")
+    )
+    cnh_digits = models.CharField(
+        max_length=20, null=True, db_index=True, editable=False, verbose_name=_("CNH")
+    )
+
+    objects = EmployeeQuerySet.as_manager()
+
+    # Alterações registradas em DataChangeHistory (ver employee.tracking)
+    tracking_employee_field = "pk"
+
+    class Meta:
+        indexes = [models.Index(fields=["hire_date", "id"])]
+
+    def set_document_keys(self):
+        """
+        Atualiza as chaves canônicas a partir dos documentos informados.
+        """
+        for name in VALIDATORS:
+            setattr(self, f"{name}_digits", document_key(getattr(self, name)))
+
+    def save(self, *args, **kwargs):
+        self.set_document_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {
+                f"{name}_digits" for name in VALIDATORS if name in update_fields
+            }
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        super().clean()
+        key = document_key(self.cpf)
+        if key and Employee.objects.filter(cpf_digits=key).exclude(pk=self.pk).exists():
+            raise ValidationError({"cpf": _("Já existe um funcionário com este CPF.")})
 
     def __str__(self):
-        return self.user.full_name
+        return self.display_name
 
 
 # Modelo de Salários
@@ -144,8 +244,11 @@ class Salary(LoggableMixin, models.Model):
         verbose_name=_("Vale-Transporte"),
     )
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
     def __str__(self):
-        return f"Salário de {self.employee.user.full_name} ({self.start_date} - {self.end_date if self.end_date else 'Atual'})"
+        return f"Salário de {self.employee.display_name} ({self.start_date} - {self.end_date if self.end_date else 'Atual'})"
 
 
 # Modelo de Descontos no Salário
@@ -168,8 +271,11 @@ class SalaryDiscount(LoggableMixin, models.Model):
     # Observação sobre o desconto
     observation = models.TextField(blank=True, null=True, verbose_name=_("Observation"))
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
     def __str__(self):
-        return f"Discount for {self.employee.user.full_name}"
+        return f"Discount for {self.employee.display_name}"
 
 
 # Modelo de Endereço
@@ -202,7 +308,7 @@ class Address(LoggableMixin, models.Model):
 
 
 # Modelo de Detalhes de Pagamento
-class PaymentDetails(LoggableMixin, models.Model):
+class PaymentDetails(TrackedModelMixin, LoggableMixin, models.Model):
     # Relaciona os detalhes de pagamento ao funcionário
     employee = models.OneToOneField(
         Employee,
@@ -238,8 +344,11 @@ class PaymentDetails(LoggableMixin, models.Model):
         max_length=20, blank=True, null=True, verbose_name=_("Agency Number")
     )
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
     def __str__(self):
-        return f"Payment Details for {self.employee.user.full_name}"
+        return f"Payment Details for {self.employee.display_name}"
 
 
 # Modelo de Cargo
@@ -284,31 +393,139 @@ class Document(LoggableMixin, models.Model):
     # Data de upload do documento
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Uploaded At"))
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
     def __str__(self):
-        return f"{self.description} - {self.employee.user.full_name}"
+        return f"{self.description} - {self.employee.display_name}"
+
+
+def upload_path(instance, filename):
+    """
+    Arquivos com hash são guardados pelo conteúdo
+    (``uploads/ab/cd/<sha256>``), de modo que cópias idênticas dividem o
+    mesmo arquivo em disco.
+    """
+    if instance.sha256:
+        digest = instance.sha256
+        return f"uploads/{digest[:2]}/{digest[2:4]}/{digest}"
+    return f"uploads/{filename}"
+
+
+def uploads_storage():
+    """
+    Armazenamento privado dos arquivos enviados (``STORAGES["uploads"]``).
+    """
+    return storages["uploads"]
 
 
 # Modelo para Arquivos Enviados
 class UploadedFile(LoggableMixin, models.Model):
     # Arquivo enviado
-    file = models.FileField(upload_to="uploads/", verbose_name=_("File"))
+    file = models.FileField(
+        upload_to=upload_path, storage=uploads_storage, verbose_name=_("File")
+    )
     # Nome do arquivo (opcional, pode ser preenchido automaticamente)
     name = models.CharField(
         max_length=255, verbose_name=_("File Name"), blank=True, null=True
     )
     # Data de upload
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Uploaded At"))
+    # SHA-256 do conteúdo (chave de deduplicação)
+    sha256 = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("SHA-256"),
+    )
+    # Tamanho em bytes
+    size = models.PositiveBigIntegerField(
+        default=0, editable=False, verbose_name=_("Size")
+    )
+    # Tipo MIME informado no envio
+    content_type = models.CharField(
+        max_length=100, blank=True, default="", verbose_name=_("Content Type")
+    )
+    # Quantidade de documentos que usam o arquivo (mantida por sinais)
+    ref_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name=_("References")
+    )
+
+    def compute_digest(self):
+        """
+        Calcula SHA-256 e tamanho lendo o arquivo em blocos.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in self.file.chunks():
+            digest.update(chunk)
+            size += len(chunk)
+        self.file.seek(0)
+        self.sha256, self.size = digest.hexdigest(), size
+
+    def clean(self):
+        super().clean()
+        if self.file and not self.file._committed and not self.sha256:
+            self.compute_digest()
+            duplicate = UploadedFile.objects.filter(sha256=self.sha256).first()
+            if duplicate is not None and duplicate.pk != self.pk:
+                raise ValidationError(
+                    {"file": _("Este arquivo já foi enviado: %s") % duplicate}
+                )
 
     def save(self, *args, **kwargs):
         # Preenche o nome automaticamente, se não for fornecido
         if not self.name:
             self.name = self.file.name
+        if self.file and not self.file._committed and not self.sha256:
+            self.compute_digest()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
 
+# Sessão de upload retomável (arquivo recebido em partes)
+class UploadSession(models.Model):
+    # Identificador público da sessão
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Usuário que iniciou o envio
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="upload_sessions",
+    )
+    # Nome original e tipo MIME do arquivo
+    name = models.CharField(max_length=255, verbose_name=_("File Name"))
+    content_type = models.CharField(
+        max_length=100, blank=True, default="", verbose_name=_("Content Type")
+    )
+    # Tamanho total esperado e bytes já recebidos
+    size = models.PositiveBigIntegerField(verbose_name=_("Size"))
+    offset = models.PositiveBigIntegerField(default=0, verbose_name=_("Offset"))
+    # Arquivo gerado ao concluir o envio
+    uploaded_file = models.ForeignKey(
+        UploadedFile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="sessions",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def completed(self):
+        return self.uploaded_file_id is not None
+
+    def __str__(self):
+        return f"Envio de {self.name} ({self.offset}/{self.size})"
+
+
 # Modelo para registrar adiantamentos feitos ao funcionário
 class Advance(LoggableMixin, models.Model):
     # Relaciona o adiantamento ao funcionário
@@ -326,8 +543,11 @@ class Advance(LoggableMixin, models.Model):
         max_length=255, verbose_name=_("Descrição"), blank=True, null=True
     )
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
     def __str__(self):
-        return f"Adiantamento para {self.employee.user.full_name} - {self.amount}"
+        return f"Adiantamento para {self.employee.display_name} - {self.amount}"
 
 
 # Modelo para registrar informações de férias
@@ -349,8 +569,17 @@ class Vacation(LoggableMixin, models.Model):
         verbose_name=_("Status"),
     )
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["employee", "start_date", "end_date"]),
+            models.Index(fields=["start_date", "end_date"]),
+        ]
+
     def __str__(self):
-        return f"Férias de {self.employee.user.full_name} ({self.start_date} a {self.end_date})"
+        return f"Férias de {self.employee.display_name} ({self.start_date} a {self.end_date})"
 
 
 # Modelo para registrar licenças do funcionário
@@ -376,8 +605,17 @@ class Leave(LoggableMixin, models.Model):
         verbose_name=_("Status"),
     )
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["employee", "start_date", "end_date"]),
+            models.Index(fields=["start_date", "end_date"]),
+        ]
+
     def __str__(self):
-        return f"Licença de {self.employee.user.full_name} ({self.start_date} a {self.end_date})"
+        return f"Licença de {self.employee.display_name} ({self.start_date} a {self.end_date})"
 
 
 # Modelo para registrar ausências do funcionário
@@ -399,8 +637,17 @@ class Absence(LoggableMixin, models.Model):
         verbose_name=_("Status"),
     )
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["employee", "absence_date"]),
+            models.Index(fields=["absence_date"]),
+        ]
+
     def __str__(self):
-        return f"Ausência de {self.employee.user.full_name} em {self.absence_date}"
+        return f"Ausência de {self.employee.display_name} em {self.absence_date}"
 
 
 # Modelo para registrar treinamentos realizados pelo funcionário
@@ -427,8 +674,11 @@ class Training(LoggableMixin, models.Model):
         null=True,
     )
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
     def __str__(self):
-        return f"Treinamento de {self.employee.user.full_name} - {self.training_name}"
+        return f"Treinamento de {self.employee.display_name} - {self.training_name}"
 
 
 # Modelo para registrar avaliações de desempenho
@@ -453,8 +703,11 @@ class PerformanceReview(LoggableMixin, models.Model):
     # Comentários adicionais sobre a avaliação (opcional)
     comments = models.TextField(verbose_name=_("Comentários"), blank=True, null=True)
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
     def __str__(self):
-        return f"Avaliação de {self.employee.user.full_name} em {self.review_date}"
+        return f"Avaliação de {self.employee.display_name} em {self.review_date}"
 
 
 # Modelo para registrar histórico de alterações nos dados do funcionário
@@ -463,6 +716,13 @@ class DataChangeHistory(LoggableMixin, models.Model):
     employee = models.ForeignKey(
         Employee, on_delete=models.CASCADE, related_name="data_changes"
     )
+    # Modelo e id do registro alterado (o próprio funcionário ou um registro dele)
+    model_name = models.CharField(
+        max_length=100, default="employee", verbose_name=_("Modelo")
+    )
+    object_id = models.PositiveBigIntegerField(
+        null=True, blank=True, verbose_name=_("Registro")
+    )
     # Nome do campo alterado
     field_name = models.CharField(max_length=255, verbose_name=_("Campo Alterado"))
     # Valor antigo do campo
@@ -474,8 +734,14 @@ class DataChangeHistory(LoggableMixin, models.Model):
         auto_now_add=True, verbose_name=_("Data da Alteração")
     )
 
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["employee", "change_date"])]
+
     def __str__(self):
-        return f"Alteração de dados para {self.employee.user.full_name} em {self.change_date}"
+        return f"Alteração de dados para {self.employee.display_name} em {self.change_date}"
 
 
 # Modelo conquistas predefinidas
@@ -490,6 +756,155 @@ class Achievement(LoggableMixin, models.Model):
     image = models.ImageField(
         upload_to="employee_achievements/", verbose_name=_("Imagem da Conquista")
     )
+    # SHA-256 da imagem (chave das miniaturas)
+    image_sha256 = models.CharField(
+        max_length=64, blank=True, default="", editable=False, db_index=True
+    )
+
+    def compute_image_digest(self):
+        digest = hashlib.sha256()
+        for chunk in self.image.chunks():
+            digest.update(chunk)
+        self.image.seek(0)
+        self.image_sha256 = digest.hexdigest()
+
+    def save(self, *args, **kwargs):
+        # Imagem nova: o hash é calculado antes de gravar
+        if self.image and not self.image._committed:
+            self.compute_image_digest()
+        elif not self.image:
+            self.image_sha256 = ""
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Conquista: {self.name}"
+
+
+# Modelo de resumo mensal da folha por funcionário (tabela materializada)
+class PayrollPeriodSummary(models.Model):
+    # Funcionário ao qual o resumo pertence
+    employee = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name="payroll_summaries"
+    )
+    # Mês de competência (sempre o primeiro dia do mês)
+    period = models.DateField(verbose_name=_("Competência"))
+    # Salário bruto somado ao bônus
+    gross = models.DecimalField(
+        max_digits=12, decimal_places=2, verbose_name=_("Bruto")
+    )
+    # INSS, IRRF, vale-transporte e demais descontos do mês
+    discounts = models.DecimalField(
+        max_digits=12, decimal_places=2, verbose_name=_("Descontos")
+    )
+    # Adiantamentos feitos no mês
+    advances = models.DecimalField(
+        max_digits=12, decimal_places=2, verbose_name=_("Adiantamentos")
+    )
+    # Valor líquido do mês
+    net = models.DecimalField(max_digits=12, decimal_places=2, verbose_name=_("Líquido"))
+    # Data e hora do último recálculo
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Atualizado em"))
+
+    # Gerenciador com with_display() para listagens sem N+1
+    objects = EmployeeRelatedQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "period"], name="unique_payroll_summary_period"
+            )
+        ]
+        indexes = [models.Index(fields=["period", "employee"])]
+
+    def __str__(self):
+        return f"Resumo de {self.employee} em {self.period:%m/%Y}"
+
+
+# Resultado da folha de um mês por funcionário (gravado por employee.payroll);
+# um salário pode valer por vários meses, cada um com o seu cálculo
+class PayrollResult(models.Model):
+    # Funcionário calculado
+    employee = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name="payroll_results"
+    )
+    # Mês de competência (sempre o primeiro dia do mês)
+    period = models.DateField(verbose_name=_("Competência"))
+    # Salário vigente usado no cálculo
+    salary = models.ForeignKey(
+        Salary,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="payroll_results",
+        verbose_name=_("Salário"),
+    )
+    # Salário bruto somado ao bônus
+    gross = models.DecimalField(
+        max_digits=12, decimal_places=2, verbose_name=_("Bruto")
+    )
+    # Desconto do INSS
+    inss_discount = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name=_("Desconto INSS")
+    )
+    # Desconto do IRRF
+    irrf_discount = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name=_("Desconto IRRF")
+    )
+    # Valor líquido do mês
+    net_salary = models.DecimalField(
+        max_digits=12, decimal_places=2, verbose_name=_("Salário Líquido")
+    )
+    # Data e hora do último cálculo
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Atualizado em"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "period"], name="unique_payroll_result_period"
+            )
+        ]
+        indexes = [models.Index(fields=["period", "employee"])]
+
+    def __str__(self):
+        return f"Folha de {self.employee} em {self.period:%m/%Y}"
+
+
+# Documento de busca desnormalizado do funcionário (mantido por sinais)
+class EmployeeSearchDocument(models.Model):
+    # Funcionário indexado (um documento por funcionário)
+    employee = models.OneToOneField(
+        Employee,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    # Nome de exibição, CPF e cargo usados para montar os resultados
+    name = models.CharField(max_length=255, verbose_name=_("Nome"))
+    cpf = models.CharField(max_length=14, verbose_name=_("CPF"))
+    role_name = models.CharField(max_length=100, blank=True, verbose_name=_("Cargo"))
+    # CPF e telefone somente com dígitos (busca por prefixo)
+    cpf_digits = models.CharField(max_length=11, db_index=True, verbose_name=_("CPF"))
+    phone_digits = models.CharField(
+        max_length=15, db_index=True, verbose_name=_("Telefone")
+    )
+    # Data e hora da última indexação
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Atualizado em"))
+
+    def __str__(self):
+        return f"Documento de busca de {self.name}"
+
+
+# Termos normalizados do documento de busca (nome e cargo)
+class EmployeeSearchTerm(models.Model):
+    # Funcionário ao qual o termo pertence
+    employee = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name="search_terms"
+    )
+    # Palavra minúscula e sem acentos
+    term = models.CharField(max_length=64, verbose_name=_("Termo"))
+
+    class Meta:
+        indexes = [models.Index(fields=["term", "employee"])]
+
+    def __str__(self):
+        return f"{self.term} ({self.employee_id})"
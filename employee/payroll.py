@@ -0,0 +1,263 @@
+import calendar
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.dispatch import Signal
+from django.utils import timezone
+
+from . import payroll_summary
+from .models import Advance, Employee, PayrollResult, Salary, SalaryDiscount
+
+# Enviado ao fim de cada execução da folha, com ``report`` (PayrollRunReport)
+payroll_finished = Signal()
+
+# Situações de emprego que entram na folha do mês
+PAYABLE_STATUSES = ("active", "on_leave")
+
+# Faixas progressivas do INSS: (teto da faixa em centavos, alíquota em pontos-base)
+INSS_BRACKETS = (
+    (141200, 750),
+    (266668, 900),
+    (400003, 1200),
+    (778602, 1400),
+)
+
+# Faixas do IRRF: (limite superior em centavos ou None, alíquota em pontos-base,
+# parcela a deduzir em centavos)
+IRRF_BRACKETS = (
+    (225920, 0, 0),
+    (282665, 750, 16944),
+    (375105, 1500, 38144),
+    (466468, 2250, 66277),
+    (None, 2750, 89600),
+)
+
+# Desconto simplificado mensal do IRRF, usado quando maior que o INSS
+IRRF_SIMPLIFIED_DEDUCTION = 56480
+
+CENT = Decimal("0.01")
+
+
+def to_cents(value):
+    return int((value or 0) * 100)
+
+
+def from_cents(value):
+    return (Decimal(value) / 100).quantize(CENT)
+
+
+def month_bounds(year, month):
+    """
+    Retorna o primeiro e o último dia do mês de competência.
+    """
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def inss_column(gross):
+    """
+    Calcula o INSS progressivo para uma coluna de salários em centavos.
+    """
+    result = []
+    for value in gross:
+        total, lower = 0, 0
+        for upper, rate in INSS_BRACKETS:
+            if value <= lower:
+                break
+            total += (min(value, upper) - lower) * rate
+            lower = upper
+        result.append((total + 5000) // 10000)
+    return result
+
+
+def irrf_column(gross, inss):
+    """
+    Calcula o IRRF para colunas de salário bruto e INSS em centavos,
+    aplicando o desconto simplificado quando ele for mais vantajoso.
+    """
+    result = []
+    for value, inss_value in zip(gross, inss):
+        base = value - max(inss_value, IRRF_SIMPLIFIED_DEDUCTION)
+        tax = 0
+        for upper, rate, deduction in IRRF_BRACKETS:
+            if upper is None or base <= upper:
+                tax = (base * rate + 5000) // 10000 - deduction
+                break
+        result.append(max(tax, 0))
+    return result
+
+
+def net_column(gross, inss, irrf, transport, discounts, advances):
+    """
+    Calcula o salário líquido a partir das colunas de valores em centavos.
+    """
+    return [
+        g - i - r - t - d - a
+        for g, i, r, t, d, a in zip(gross, inss, irrf, transport, discounts, advances)
+    ]
+
+
+@dataclass
+class PayrollRunReport:
+    year: int
+    month: int
+    dry_run: bool
+    employees: int = 0
+    processed: int = 0
+    skipped: list = field(default_factory=list)
+    total_gross: Decimal = Decimal("0.00")
+    total_net: Decimal = Decimal("0.00")
+    timings: dict = field(default_factory=dict)
+    results: list = field(default_factory=list)
+
+    @property
+    def total_time(self):
+        return sum(self.timings.values())
+
+
+class PayrollRun:
+    """
+    Calcula INSS, IRRF e salário líquido de todos os funcionários ativos
+    em um mês de competência.
+
+    As entradas são carregadas em poucas consultas agregadas, o cálculo é
+    feito por colunas de inteiros (centavos) e os resultados são gravados
+    em ``PayrollResult`` (um por funcionário e mês) com ``bulk_create`` em
+    blocos; os salários, que podem valer por vários meses, não mudam.
+    """
+
+    update_fields = [
+        "salary",
+        "gross",
+        "inss_discount",
+        "irrf_discount",
+        "net_salary",
+        "updated_at",
+    ]
+
+    def __init__(self, year, month, chunk_size=1000, dry_run=False):
+        self.year = year
+        self.month = month
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.start, self.end = month_bounds(year, month)
+        self.report = PayrollRunReport(year=year, month=month, dry_run=dry_run)
+
+    def _timed(self, name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.report.timings[name] = time.perf_counter() - started
+        return result
+
+    def load_salaries(self):
+        """
+        Retorna o salário vigente no mês para cada funcionário pagável,
+        escolhendo o de início mais recente quando houver mais de um.
+        """
+        rows = (
+            Salary.objects.filter(
+                employee__employment_status__in=PAYABLE_STATUSES,
+                start_date__lte=self.end,
+            )
+            .filter(Q(end_date__isnull=True) | Q(end_date__gte=self.start))
+            .order_by("employee_id", "-start_date", "-id")
+            .values_list(
+                "id", "employee_id", "gross_salary", "bonus", "transport_voucher"
+            )
+        )
+        salaries = {}
+        for row in rows.iterator(chunk_size=self.chunk_size):
+            salaries.setdefault(row[1], row)
+        return salaries
+
+    def load_totals(self, model):
+        """
+        Soma os valores do período por funcionário em uma única consulta.
+        """
+        return dict(
+            model.objects.filter(date__range=(self.start, self.end))
+            .values("employee_id")
+            .annotate(total=Sum("amount"))
+            .values_list("employee_id", "total")
+        )
+
+    def compute(self, salaries, discounts, advances):
+        employee_ids = list(salaries)
+        rows = [salaries[employee_id] for employee_id in employee_ids]
+        gross = [to_cents(row[2]) + to_cents(row[3]) for row in rows]
+        transport = [to_cents(row[4]) for row in rows]
+        discount = [to_cents(discounts.get(e)) for e in employee_ids]
+        advance = [to_cents(advances.get(e)) for e in employee_ids]
+
+        inss = inss_column(gross)
+        irrf = irrf_column(gross, inss)
+        net = net_column(gross, inss, irrf, transport, discount, advance)
+        return [
+            (row[0], row[1], g, i, r, n)
+            for row, g, i, r, n in zip(rows, gross, inss, irrf, net)
+        ]
+
+    def write(self, results):
+        now = timezone.now()
+        objs = [
+            PayrollResult(
+                employee_id=employee_id,
+                period=self.start,
+                salary_id=salary_id,
+                gross=from_cents(gross),
+                inss_discount=from_cents(inss),
+                irrf_discount=from_cents(irrf),
+                net_salary=from_cents(net),
+                updated_at=now,
+            )
+            for salary_id, employee_id, gross, inss, irrf, net in results
+        ]
+        with transaction.atomic():
+            PayrollResult.objects.bulk_create(
+                objs,
+                batch_size=self.chunk_size,
+                update_conflicts=True,
+                unique_fields=["employee", "period"],
+                update_fields=self.update_fields,
+            )
+            # bulk_create não dispara sinais: atualiza aqui o resumo do mês
+            payroll_summary.refresh_cells(
+                (employee_id, self.start) for _, employee_id, *_ in results
+            )
+
+    def run(self):
+        report = self.report
+        employee_ids = self._timed(
+            "load_employees",
+            lambda: set(
+                Employee.objects.filter(
+                    employment_status__in=PAYABLE_STATUSES
+                ).values_list("id", flat=True)
+            ),
+        )
+        salaries = self._timed("load_salaries", self.load_salaries)
+        discounts = self._timed("load_discounts", self.load_totals, SalaryDiscount)
+        advances = self._timed("load_advances", self.load_totals, Advance)
+        results = self._timed("compute", self.compute, salaries, discounts, advances)
+        if not self.dry_run:
+            self._timed("write", self.write, results)
+
+        report.employees = len(employee_ids)
+        report.processed = len(results)
+        report.skipped = sorted(employee_ids - set(salaries))
+        report.total_gross = from_cents(sum(r[2] for r in results))
+        report.total_net = from_cents(sum(r[5] for r in results))
+        report.results = results
+        return report
+
+
+def run_payroll(year, month, chunk_size=1000, dry_run=False):
+    """
+    Executa a folha do mês de competência e retorna o relatório da execução.
+    """
+    report = PayrollRun(year, month, chunk_size=chunk_size, dry_run=dry_run).run()
+    payroll_finished.send(sender=PayrollRun, report=report)
+    return report
@@ -0,0 +1,205 @@
+from collections import defaultdict
+from datetime import date
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import (
+    Advance,
+    PayrollPeriodSummary,
+    PayrollResult,
+    Salary,
+    SalaryDiscount,
+)
+from . import payroll
+
+# Funcionários recalculados por vez em ``refresh_cells`` (limite de
+# parâmetros por consulta do SQLite)
+REFRESH_CHUNK_SIZE = 500
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def iter_months(start, end):
+    """
+    Gera o primeiro dia de cada mês entre ``start`` e ``end`` (inclusive).
+    """
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield date(year, month, 1)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def salary_end(start_date, end_date):
+    """
+    Fim da vigência considerado nos resumos: salários sem data de término
+    valem até o mês corrente.
+    """
+    return end_date or max(timezone.localdate(), start_date)
+
+
+def salary_months(start_date, end_date):
+    """
+    Meses cobertos por um salário (veja ``salary_end``).
+    """
+    if start_date is None:
+        return []
+    return list(iter_months(start_date, salary_end(start_date, end_date)))
+
+
+def _monthly_totals(model, employee_ids, start, end):
+    queryset = model.objects.all()
+    if employee_ids is not None:
+        queryset = queryset.filter(employee_id__in=employee_ids)
+    if start is not None:
+        queryset = queryset.filter(date__range=(start, end))
+    return (
+        queryset.annotate(period=TruncMonth("date"))
+        .values("employee_id", "period")
+        .annotate(total=Sum("amount"))
+        .values_list("employee_id", "period", "total")
+    )
+
+
+def compute_cells(employee_ids=None, start=None, end=None):
+    """
+    Calcula os valores em centavos de cada célula (funcionário, mês).
+
+    Retorna ``{(employee_id, period): [bruto, descontos, adiantamentos]}``.
+    Com ``start``/``end`` apenas os meses do intervalo são considerados.
+    """
+    cells = defaultdict(lambda: [0, 0, 0])
+
+    salaries = Salary.objects.all()
+    if employee_ids is not None:
+        salaries = salaries.filter(employee_id__in=employee_ids)
+    if start is not None:
+        salaries = salaries.filter(start_date__lte=end).filter(
+            Q(end_date__isnull=True) | Q(end_date__gte=start)
+        )
+    # O salário de início mais recente prevalece dentro de cada mês
+    effective = {}
+    rows = salaries.order_by("employee_id", "start_date", "id").values_list(
+        "employee_id",
+        "start_date",
+        "end_date",
+        "gross_salary",
+        "bonus",
+        "inss_discount",
+        "irrf_discount",
+        "transport_voucher",
+    )
+    for employee_id, start_date, end_date, *values in rows.iterator():
+        if start is not None:
+            # Mesmo horizonte do rebuild para salários sem término
+            end_date = min(salary_end(start_date, end_date), end)
+            start_date = max(start_date, start)
+        for period in salary_months(start_date, end_date):
+            effective[(employee_id, period)] = values
+    # Meses com a folha calculada usam o INSS e o IRRF do cálculo
+    results = PayrollResult.objects.all()
+    if employee_ids is not None:
+        results = results.filter(employee_id__in=employee_ids)
+    if start is not None:
+        results = results.filter(period__range=(start, end))
+    for employee_id, period, inss, irrf in results.values_list(
+        "employee_id", "period", "inss_discount", "irrf_discount"
+    ).iterator():
+        values = effective.get((employee_id, period))
+        if values is not None:
+            effective[(employee_id, period)] = [*values[:2], inss, irrf, values[4]]
+    for key, (gross, bonus, inss, irrf, transport) in effective.items():
+        cell = cells[key]
+        cell[0] += payroll.to_cents(gross) + payroll.to_cents(bonus)
+        cell[1] += (
+            payroll.to_cents(inss)
+            + payroll.to_cents(irrf)
+            + payroll.to_cents(transport)
+        )
+
+    for employee_id, period, total in _monthly_totals(
+        SalaryDiscount, employee_ids, start, end
+    ):
+        cells[(employee_id, period)][1] += payroll.to_cents(total)
+    for employee_id, period, total in _monthly_totals(
+        Advance, employee_ids, start, end
+    ):
+        cells[(employee_id, period)][2] += payroll.to_cents(total)
+    return cells
+
+
+def _summaries(cells, keys=None):
+    for key in cells if keys is None else keys:
+        if key not in cells:
+            continue
+        gross, discounts, advances = cells[key]
+        yield PayrollPeriodSummary(
+            employee_id=key[0],
+            period=key[1],
+            gross=payroll.from_cents(gross),
+            discounts=payroll.from_cents(discounts),
+            advances=payroll.from_cents(advances),
+            net=payroll.from_cents(gross - discounts - advances),
+        )
+
+
+def rebuild(employee_ids=None, batch_size=1000):
+    """
+    Recria a tabela de resumos, inteira ou apenas dos funcionários informados.
+    Retorna a quantidade de resumos gravados.
+    """
+    cells = compute_cells(employee_ids)
+    summaries = list(_summaries(cells))
+    with transaction.atomic():
+        existing = PayrollPeriodSummary.objects.all()
+        if employee_ids is not None:
+            existing = existing.filter(employee_id__in=employee_ids)
+        existing.delete()
+        PayrollPeriodSummary.objects.bulk_create(summaries, batch_size=batch_size)
+    return len(summaries)
+
+
+def refresh_cells(keys, chunk_size=REFRESH_CHUNK_SIZE):
+    """
+    Recalcula somente as células (employee_id, period) informadas, em blocos
+    de ``chunk_size`` funcionários.
+    """
+    periods_by_employee = defaultdict(set)
+    for employee_id, period in keys:
+        periods_by_employee[employee_id].add(month_start(period))
+    employee_ids = sorted(periods_by_employee)
+    with transaction.atomic():
+        for offset in range(0, len(employee_ids), chunk_size):
+            _refresh_cells(
+                {
+                    (employee_id, period)
+                    for employee_id in employee_ids[offset : offset + chunk_size]
+                    for period in periods_by_employee[employee_id]
+                }
+            )
+
+
+def _refresh_cells(keys):
+    employees_by_period = defaultdict(set)
+    for employee_id, period in keys:
+        employees_by_period[period].add(employee_id)
+    start, end = min(employees_by_period), max(employees_by_period)
+    end = payroll.month_bounds(end.year, end.month)[1]
+    employee_ids = {employee_id for employee_id, _ in keys}
+    cells = compute_cells(list(employee_ids), start, end)
+    PayrollPeriodSummary.objects.filter(
+        reduce(
+            or_,
+            (
+                Q(period=period, employee_id__in=period_employees)
+                for period, period_employees in employees_by_period.items()
+            ),
+        )
+    ).delete()
+    PayrollPeriodSummary.objects.bulk_create(_summaries(cells, keys))
@@ -0,0 +1,373 @@
+import bisect
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+from django.db import connections, transaction
+
+from .documents import only_digits
+from .models import Employee, EmployeeSearchDocument, EmployeeSearchTerm
+
+# Tabela virtual FTS5 (somente SQLite); rowid = id do funcionário
+FTS_TABLE = "employee_search_fts"
+# Pesos do bm25 para as colunas (nome, documentos, cargo)
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+# Similaridade mínima (Jaccard de trigramas) para corrigir uma palavra
+TRIGRAM_THRESHOLD = 0.3
+# Correções consideradas por palavra
+MAX_CORRECTIONS = 3
+# Termos por palavra na busca sem FTS
+MAX_PREFIX_TERMS = 50
+# Tempo de vida do vocabulário em memória (segundos)
+VOCABULARY_TTL = 300.0
+# Maior quantidade de resultados por busca
+MAX_LIMIT = 50
+
+_DIGIT_SEPARATORS = re.compile(r"(?<=\d)[\s.\-/()]+(?=\d)")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+_fts_tables = {}
+_vocabulary = {}
+_vocabulary_lock = threading.Lock()
+
+
+def normalize(value):
+    """
+    Texto em minúsculas, sem acentos e sem pontuação; separadores entre
+    dígitos são removidos (``123.456`` vira ``123456``).
+    """
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    value = _DIGIT_SEPARATORS.sub("", value.lower())
+    return " ".join(_NON_WORD.sub(" ", value).split())
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def document_terms(document):
+    """
+    Palavras de nome e cargo indexadas para o funcionário.
+    """
+    return {
+        term[:64]
+        for term in normalize(f"{document.name} {document.role_name}").split()
+    }
+
+
+def _fts_key(connection):
+    return connection.alias, connection.settings_dict["NAME"]
+
+
+def fts_available(using="default"):
+    """
+    Indica se a tabela FTS5 existe no banco (resultado guardado por banco).
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    key = _fts_key(connection)
+    if key not in _fts_tables:
+        _fts_tables[key] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_tables[key]
+
+
+def ensure_fts(using="default"):
+    """
+    Cria a tabela FTS5 no SQLite (se ainda não existir) e a preenche a
+    partir dos documentos já gravados.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite" or fts_available(using):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "name, documents, role, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    _fts_tables[_fts_key(connection)] = True
+    _fts_insert(EmployeeSearchDocument.objects.using(using).iterator(), using)
+
+
+def _fts_insert(documents, using):
+    rows = [
+        (
+            document.employee_id,
+            normalize(document.name),
+            f"{document.cpf_digits} {document.phone_digits} "
+            f"{document.phone_digits[2:]}",
+            normalize(document.role_name),
+        )
+        for document in documents
+    ]
+    if rows:
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, documents, role) "
+                "VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+
+def build_documents(employee_ids, using="default"):
+    """
+    Monta (sem gravar) os documentos de busca dos funcionários.
+    """
+    rows = (
+        Employee.objects.using(using)
+        .filter(pk__in=employee_ids)
+        .values_list("id", "display_name", "cpf", "phone", "role__name")
+    )
+    return [
+        EmployeeSearchDocument(
+            employee_id=employee_id,
+            name=name,
+            cpf=cpf,
+            cpf_digits=only_digits(cpf),
+            phone_digits=only_digits(phone),
+            role_name=role_name or "",
+        )
+        for employee_id, name, cpf, phone, role_name in rows
+    ]
+
+
+def _write(documents, using):
+    EmployeeSearchDocument.objects.using(using).bulk_create(documents, batch_size=1000)
+    EmployeeSearchTerm.objects.using(using).bulk_create(
+        [
+            EmployeeSearchTerm(employee_id=document.employee_id, term=term)
+            for document in documents
+            for term in document_terms(document)
+        ],
+        batch_size=1000,
+    )
+    if fts_available(using):
+        _fts_insert(documents, using)
+
+
+def remove_employees(employee_ids, using="default"):
+    """
+    Remove os funcionários do índice.
+    """
+    employee_ids = list(employee_ids)
+    with transaction.atomic(using=using):
+        EmployeeSearchDocument.objects.using(using).filter(
+            employee_id__in=employee_ids
+        ).delete()
+        EmployeeSearchTerm.objects.using(using).filter(
+            employee_id__in=employee_ids
+        ).delete()
+        if fts_available(using):
+            with connections[using].cursor() as cursor:
+                cursor.executemany(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                    [(employee_id,) for employee_id in employee_ids],
+                )
+
+
+def index_employees(employee_ids, using="default"):
+    """
+    (Re)indexa os funcionários informados; ids que não existem mais são
+    apenas removidos do índice.
+    """
+    employee_ids = set(employee_ids)
+    if not employee_ids:
+        return
+    documents = build_documents(employee_ids, using=using)
+    with transaction.atomic(using=using):
+        remove_employees(employee_ids, using=using)
+        _write(documents, using)
+    _remember_terms(
+        using, {term for document in documents for term in document_terms(document)}
+    )
+
+
+def rebuild(batch_size=1000, using="default"):
+    """
+    Reconstrói o índice inteiro em blocos. Retorna a quantidade indexada.
+    """
+    ensure_fts(using)
+    total = 0
+    with transaction.atomic(using=using):
+        EmployeeSearchDocument.objects.using(using).all().delete()
+        EmployeeSearchTerm.objects.using(using).all().delete()
+        if fts_available(using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        ids = list(
+            Employee.objects.using(using).order_by("pk").values_list("pk", flat=True)
+        )
+        for start in range(0, len(ids), batch_size):
+            documents = build_documents(ids[start : start + batch_size], using=using)
+            _write(documents, using)
+            total += len(documents)
+    with _vocabulary_lock:
+        _vocabulary.pop(using, None)
+    return total
+
+
+class Vocabulary:
+    """
+    Termos distintos do índice, ordenados (busca por prefixo com bisect) e
+    com um índice invertido de trigramas para corrigir erros de digitação.
+    """
+
+    def __init__(self, terms):
+        self.terms = sorted(terms)
+        self.known = set(self.terms)
+        self.grams = {}
+        for term in self.terms:
+            self.add_grams(term)
+
+    def add_grams(self, term):
+        for gram in trigrams(term):
+            self.grams.setdefault(gram, []).append(term)
+
+    def add(self, terms):
+        for term in set(terms) - self.known:
+            bisect.insort(self.terms, term)
+            self.known.add(term)
+            self.add_grams(term)
+
+    def with_prefix(self, prefix, limit=None):
+        found = []
+        index = bisect.bisect_left(self.terms, prefix)
+        while index < len(self.terms) and self.terms[index].startswith(prefix):
+            found.append(self.terms[index])
+            if limit is not None and len(found) >= limit:
+                break
+            index += 1
+        return found
+
+    def corrections(self, word, limit=MAX_CORRECTIONS):
+        """
+        Termos mais parecidos com a palavra (similaridade de trigramas).
+        """
+        grams = trigrams(word)
+        shared = Counter(
+            term for gram in grams for term in self.grams.get(gram, ())
+        )
+        scored = []
+        for term, count in shared.items():
+            score = count / (len(grams) + len(term) + 2 - count)
+            if score >= TRIGRAM_THRESHOLD:
+                scored.append((score, term))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [term for _, term in scored[:limit]]
+
+
+def vocabulary(using="default"):
+    """
+    Vocabulário em memória do processo, recarregado a cada
+    ``VOCABULARY_TTL`` segundos.
+    """
+    now = time.monotonic()
+    with _vocabulary_lock:
+        entry = _vocabulary.get(using)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+    terms = (
+        EmployeeSearchTerm.objects.using(using)
+        .order_by()
+        .values_list("term", flat=True)
+        .distinct()
+    )
+    loaded = Vocabulary(terms)
+    with _vocabulary_lock:
+        _vocabulary[using] = (now + VOCABULARY_TTL, loaded)
+    return loaded
+
+
+def _remember_terms(using, terms):
+    # Termos novos ficam visíveis de imediato neste processo
+    with _vocabulary_lock:
+        entry = _vocabulary.get(using)
+        if entry is not None:
+            entry[1].add(terms)
+
+
+def _expand(words, using):
+    """
+    Alternativas de cada palavra: o próprio prefixo quando existe no
+    vocabulário ou as correções mais próximas. Retorna ``None`` quando
+    alguma palavra não tem alternativa.
+    """
+    terms = vocabulary(using)
+    expanded = []
+    for word in words:
+        if word.isdigit() or terms.with_prefix(word, limit=1):
+            expanded.append([word])
+            continue
+        corrections = terms.corrections(word) if len(word) >= 3 else []
+        if not corrections:
+            return None
+        expanded.append(corrections)
+    return expanded
+
+
+def _fts_search(groups, limit, using):
+    match = " AND ".join(
+        "(" + " OR ".join(f'"{term}"*' for term in group) + ")" for group in groups
+    )
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    with connections[using].cursor() as cursor:
+        # Ranqueia todas as linhas que casam; com LIMIT o SQLite só mantém
+        # as ``limit`` melhores durante a ordenação
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _term_search(groups, limit, using):
+    # Sem FTS: cada grupo vira um filtro sobre os termos do funcionário
+    terms = vocabulary(using)
+    documents = EmployeeSearchDocument.objects.using(using)
+    for group in groups:
+        if len(group) == 1 and group[0].isdigit():
+            digits = group[0]
+            documents = documents.filter(cpf_digits__startswith=digits) | documents.filter(
+                phone_digits__startswith=digits
+            )
+            continue
+        candidates = set()
+        for term in group:
+            candidates.update(terms.with_prefix(term, limit=MAX_PREFIX_TERMS))
+        documents = documents.filter(
+            employee__search_terms__term__in=candidates
+        )
+    return list(
+        documents.order_by("name", "employee_id")
+        .values_list("employee_id", flat=True)
+        .distinct()[:limit]
+    )
+
+
+def search(query, limit=10, using="default"):
+    """
+    Busca funcionários por nome, CPF, telefone ou cargo, ignorando acentos
+    e aceitando prefixos. Palavras que não existem no índice são trocadas
+    pelos termos mais parecidos (erros de digitação).
+
+    Retorna os ``EmployeeSearchDocument`` na ordem de relevância.
+    """
+    words = normalize(query).split()
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    if not words:
+        return []
+    groups = _expand(words, using)
+    if groups is None:
+        return []
+    if fts_available(using):
+        ids = _fts_search(groups, limit, using)
+    else:
+        ids = _term_search(groups, limit, using)
+    documents = EmployeeSearchDocument.objects.using(using).in_bulk(ids)
+    return [documents[employee_id] for employee_id in ids if employee_id in documents]
@@ -1,5 +1,42 @@
-from django.db.models.signals import post_migrate
-from .models import Permission, Achievement
+from django.core.exceptions import ValidationError
+from django.db.models import DateField
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from accounts import user_cache
+from accounts.transaction import defer_until_commit
+from . import (
+    access,
+    availability,
+    dashboard,
+    derivatives,
+    fragments,
+    payroll_summary,
+    search,
+    uploads,
+)
+from accounts.models import User
+from .models import (
+    Absence,
+    Advance,
+    Document,
+    Permission,
+    Achievement,
+    Employee,
+    Leave,
+    PerformanceReview,
+    Role,
+    Salary,
+    SalaryDiscount,
+    UploadedFile,
+    Vacation,
+)
 
 
 def create_permissions_and_achievements(sender, **kwargs):
@@ -39,4 +76,444 @@ def create_permissions_and_achievements(sender, **kwargs):
         if created:
             print(f"Conquista criada: {achievement.name}")
 
-post_migrate.connect(create_permissions_and_achievements)
\ No newline at end of file
+post_migrate.connect(create_permissions_and_achievements)
+
+
+_to_date = DateField().to_python
+
+
+def _summary_key(instance):
+    """
+    Valores que definem as células (funcionário, mês) do resumo da folha
+    afetadas pela instância, lidos sem disparar consultas para campos adiados.
+    """
+    values = instance.__dict__
+    if isinstance(instance, Salary):
+        start_field, end_field = "start_date", "end_date"
+    else:
+        start_field = end_field = "date"
+    try:
+        return (
+            values.get("employee_id"),
+            _to_date(values.get(start_field)),
+            _to_date(values.get(end_field)),
+        )
+    except ValidationError:
+        return None, None, None
+
+
+def _summary_cells(key):
+    employee_id, start_date, end_date = key
+    if employee_id is None or start_date is None:
+        return set()
+    months = payroll_summary.salary_months(start_date, end_date)
+    return {(employee_id, month) for month in months}
+
+
+def _refresh_summary_cells(batches):
+    payroll_summary.refresh_cells(set().union(*batches))
+    dashboard.invalidate("payroll_cost")
+
+
+def remember_summary_key(sender, instance, **kwargs):
+    """
+    Guarda os valores originais da instância para recalcular também o mês
+    antigo quando datas forem alteradas.
+    """
+    instance._summary_key = _summary_key(instance)
+
+
+def update_payroll_summary(sender, instance, using=None, **kwargs):
+    """
+    Recalcula, após o commit, somente as células do resumo afetadas pela
+    alteração de um salário, desconto ou adiantamento.
+    """
+    if kwargs.get("raw"):
+        return
+    key = _summary_key(instance)
+    cells = _summary_cells(key)
+    original = getattr(instance, "_summary_key", None)
+    if original is not None and original != key:
+        cells |= _summary_cells(original)
+    instance._summary_key = key
+    if cells:
+        defer_until_commit(_refresh_summary_cells, cells, using=using)
+
+
+for model in (Salary, SalaryDiscount, Advance):
+    post_init.connect(remember_summary_key, sender=model)
+    post_save.connect(update_payroll_summary, sender=model)
+    post_delete.connect(update_payroll_summary, sender=model)
+
+
+def set_employee_display_name(sender, instance, **kwargs):
+    """
+    Copia o nome do usuário para ``Employee.display_name`` antes de salvar.
+    O usuário só é consultado quando já está carregado, o nome está vazio
+    ou ``user_id`` mudou desde o carregamento.
+    """
+    # Usuário original guardado por remember_access_keys (post_init)
+    original_user_id = getattr(instance, "_access_keys", (None, None))[0]
+    if instance.user_id is None:
+        instance.display_name = ""
+    elif (
+        Employee.user.is_cached(instance)
+        or not instance.display_name
+        or instance.user_id != original_user_id
+    ):
+        instance.display_name = str(instance.user)
+
+
+def sync_employee_display_name(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """
+    Propaga alterações de nome do usuário para o funcionário vinculado.
+    """
+    if created or kwargs.get("raw"):
+        return
+    if update_fields is not None and not {"full_name", "username"} & set(update_fields):
+        return
+    display_name = str(instance)
+    employee_ids = list(
+        Employee.objects.filter(user=instance)
+        .exclude(display_name=display_name)
+        .values_list("pk", flat=True)
+    )
+    if employee_ids:
+        Employee.objects.filter(pk__in=employee_ids).update(display_name=display_name)
+        for employee_id in employee_ids:
+            defer_until_commit(_reindex_employees, employee_id)
+
+
+def backfill_display_names(sender, **kwargs):
+    """
+    Preenche ``display_name`` de funcionários criados antes do campo existir.
+    """
+    pending = Employee.objects.filter(display_name="", user__isnull=False)
+    for employee in pending.select_related("user").iterator():
+        Employee.objects.filter(pk=employee.pk).update(display_name=str(employee.user))
+
+
+def backfill_document_keys(sender, **kwargs):
+    """
+    Preenche as chaves canônicas de documentos de funcionários criados
+    antes dos campos existirem.
+    """
+    if sender.name != "employee":
+        return
+    pending = Employee.objects.filter(cpf_digits__isnull=True).only(
+        "cpf", "pis_pasep", "ctps", "cnh"
+    )
+    batch_size = 1000
+    batch = []
+    fields = ["cpf_digits", "pis_pasep_digits", "ctps_digits", "cnh_digits"]
+    for employee in pending.iterator(chunk_size=batch_size):
+        employee.set_document_keys()
+        batch.append(employee)
+        if len(batch) >= batch_size:
+            Employee.objects.bulk_update(batch, fields)
+            batch = []
+    Employee.objects.bulk_update(batch, fields)
+
+
+pre_save.connect(set_employee_display_name, sender=Employee)
+post_save.connect(sync_employee_display_name, sender=User)
+post_migrate.connect(backfill_display_names)
+post_migrate.connect(backfill_document_keys)
+
+
+
+def remember_access_keys(sender, instance, **kwargs):
+    """
+    Guarda usuário e cargo originais do funcionário para invalidar as
+    permissões somente quando eles mudarem.
+    """
+    values = instance.__dict__
+    instance._access_keys = (values.get("user_id"), values.get("role_id"))
+
+
+def invalidate_employee_access(sender, instance, created=False, **kwargs):
+    original = getattr(instance, "_access_keys", (None, None))
+    current = (instance.user_id, instance.role_id)
+    instance._access_keys = current
+    # O cabeçalho em cache mostra dados do perfil: qualquer alteração conta
+    for user_id in {original[0], current[0]}:
+        fragments.invalidate_user(user_id)
+        user_cache.invalidate_user(user_id)
+    deleted = kwargs.get("signal") is post_delete
+    if not created and not deleted and original == current:
+        return
+    for user_id in {original[0], current[0]}:
+        access.invalidate_user(user_id)
+    # O cargo também é guardado nas árvores de disponibilidade
+    if not created and not deleted and original[1] != current[1]:
+        availability.invalidate_all()
+
+
+def invalidate_role_access(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalida as permissões dos cargos cujo conjunto de permissões mudou.
+    """
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if not reverse:
+        if action != "pre_clear":
+            access.invalidate_role(instance.pk)
+            fragments.invalidate_role(instance.pk)
+        return
+    # Alteração feita a partir da permissão: ``pk_set`` contém os cargos
+    if action == "pre_clear":
+        role_ids = list(instance.roles.values_list("id", flat=True))
+    elif action == "post_clear":
+        return
+    else:
+        role_ids = pk_set or ()
+    for role_id in role_ids:
+        access.invalidate_role(role_id)
+        fragments.invalidate_role(role_id)
+
+
+def invalidate_user_access(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    access.invalidate_user(instance.pk)
+    fragments.invalidate_user(instance.pk)
+
+
+def invalidate_all_access(sender, **kwargs):
+    access.invalidate_all()
+
+
+def invalidate_deleted_role(sender, instance, **kwargs):
+    access.invalidate_role(instance.pk)
+    fragments.invalidate_role(instance.pk)
+    user_cache.invalidate_roles()
+
+
+def invalidate_role_fragments(sender, instance, **kwargs):
+    # Nome e abreviação do cargo aparecem nos fragmentos em cache e nos
+    # usuários em cache
+    fragments.invalidate_role(instance.pk)
+    user_cache.invalidate_roles()
+
+
+post_init.connect(remember_access_keys, sender=Employee)
+post_save.connect(invalidate_employee_access, sender=Employee)
+post_delete.connect(invalidate_employee_access, sender=Employee)
+m2m_changed.connect(invalidate_role_access, sender=Role.permissions.through)
+post_save.connect(invalidate_user_access, sender=User)
+post_save.connect(invalidate_all_access, sender=Permission)
+post_delete.connect(invalidate_all_access, sender=Permission)
+post_delete.connect(invalidate_deleted_role, sender=Role)
+post_save.connect(invalidate_role_fragments, sender=Role)
+
+
+def _availability_key(instance):
+    values = instance.__dict__
+    if isinstance(instance, Absence):
+        start_field = end_field = "absence_date"
+    else:
+        start_field, end_field = "start_date", "end_date"
+    try:
+        return _to_date(values.get(start_field)), _to_date(values.get(end_field))
+    except ValidationError:
+        return None, None
+
+
+def _invalidate_availability(batches):
+    for start, end in set().union(*batches):
+        availability.invalidate_dates(start, end)
+
+
+def remember_availability_key(sender, instance, **kwargs):
+    """
+    Guarda as datas originais para invalidar também os meses antigos.
+    """
+    instance._availability_key = _availability_key(instance)
+
+
+def invalidate_availability(sender, instance, using=None, **kwargs):
+    """
+    Invalida, após o commit, as árvores de disponibilidade dos meses
+    tocados por férias, licenças ou ausências alteradas.
+    """
+    spans = {_availability_key(instance)}
+    original = getattr(instance, "_availability_key", None)
+    if original is not None:
+        spans.add(original)
+    instance._availability_key = _availability_key(instance)
+    spans = {
+        (start, end or start) for start, end in spans if start is not None
+    }
+    if spans:
+        defer_until_commit(_invalidate_availability, spans, using=using)
+
+
+for model in (Vacation, Leave, Absence):
+    post_init.connect(remember_availability_key, sender=model)
+    post_save.connect(invalidate_availability, sender=model)
+    post_delete.connect(invalidate_availability, sender=model)
+
+
+def _reindex_employees(employee_ids):
+    search.index_employees(employee_ids)
+
+
+def index_employee(sender, instance, using=None, **kwargs):
+    """
+    Atualiza (ou remove) o documento de busca do funcionário após o commit.
+    """
+    if kwargs.get("raw"):
+        return
+    defer_until_commit(_reindex_employees, instance.pk, using=using)
+
+
+def remember_role_employees(sender, instance, **kwargs):
+    # Ao excluir o cargo, os funcionários ficam sem cargo (SET_NULL)
+    instance._search_employee_ids = list(
+        instance.employees.values_list("pk", flat=True)
+    )
+
+
+def index_role_employees(sender, instance, created=False, using=None, **kwargs):
+    """
+    Reindexa os funcionários do cargo quando ele é renomeado ou excluído.
+    """
+    if created or kwargs.get("raw"):
+        return
+    employee_ids = getattr(instance, "_search_employee_ids", None)
+    if employee_ids is None:
+        employee_ids = instance.employees.values_list("pk", flat=True)
+    for employee_id in employee_ids:
+        defer_until_commit(_reindex_employees, employee_id, using=using)
+
+
+def ensure_search_index(sender, using="default", **kwargs):
+    if sender.name == "employee":
+        search.ensure_fts(using)
+
+
+post_save.connect(index_employee, sender=Employee)
+post_delete.connect(index_employee, sender=Employee)
+post_save.connect(index_role_employees, sender=Role)
+pre_delete.connect(remember_role_employees, sender=Role)
+post_delete.connect(index_role_employees, sender=Role)
+post_migrate.connect(ensure_search_index)
+
+
+def count_file_references(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Mantém ``UploadedFile.ref_count`` ao ligar ou desligar arquivos de
+    documentos, recontando somente os arquivos afetados.
+    """
+    if action == "pre_clear":
+        if not reverse:
+            instance._cleared_file_ids = list(
+                instance.files.values_list("pk", flat=True)
+            )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        file_ids = [instance.pk]
+    elif action == "post_clear":
+        file_ids = getattr(instance, "_cleared_file_ids", [])
+    else:
+        file_ids = pk_set or []
+    if file_ids:
+        uploads.recount_references(file_ids)
+
+
+def remember_document_files(sender, instance, **kwargs):
+    instance._deleted_file_ids = list(instance.files.values_list("pk", flat=True))
+
+
+def release_document_files(sender, instance, **kwargs):
+    file_ids = getattr(instance, "_deleted_file_ids", None)
+    if file_ids:
+        uploads.recount_references(file_ids)
+
+
+def _delete_blobs(names):
+    uploads.delete_blobs(names)
+
+
+def delete_uploaded_blob(sender, instance, using=None, **kwargs):
+    """
+    Apaga o arquivo do disco após o commit da exclusão do registro.
+    """
+    if instance.file:
+        defer_until_commit(_delete_blobs, instance.file.name, using=using)
+
+
+m2m_changed.connect(count_file_references, sender=Document.files.through)
+pre_delete.connect(remember_document_files, sender=Document)
+post_delete.connect(release_document_files, sender=Document)
+post_delete.connect(delete_uploaded_blob, sender=UploadedFile)
+
+
+def generate_derivatives(sender, instance, raw=False, **kwargs):
+    """
+    Gera as miniaturas de imagens e documentos em segundo plano.
+    """
+    if not raw:
+        derivatives.schedule(instance)
+
+
+def _delete_derivatives(hashes):
+    used = set(
+        Achievement.objects.filter(image_sha256__in=hashes).values_list(
+            "image_sha256", flat=True
+        )
+    )
+    used.update(
+        UploadedFile.objects.filter(sha256__in=hashes).values_list("sha256", flat=True)
+    )
+    for sha256 in set(hashes) - used:
+        derivatives.delete(sha256)
+
+
+def delete_derivatives(sender, instance, using=None, **kwargs):
+    """
+    Apaga as miniaturas de um conteúdo que não é mais usado.
+    """
+    sha256 = getattr(instance, "image_sha256", None) or getattr(instance, "sha256", None)
+    if sha256:
+        defer_until_commit(_delete_derivatives, sha256, using=using)
+
+
+post_save.connect(generate_derivatives, sender=Achievement)
+post_save.connect(generate_derivatives, sender=UploadedFile)
+post_delete.connect(delete_derivatives, sender=Achievement)
+post_delete.connect(delete_derivatives, sender=UploadedFile)
+
+
+# Métricas do painel afetadas por cada modelo
+DASHBOARD_METRICS = {
+    Employee: ("headcount", "performance_by_role", "on_leave_today"),
+    Role: ("headcount", "performance_by_role"),
+    PerformanceReview: ("performance_by_role",),
+    Leave: ("on_leave_today",),
+    Vacation: ("on_leave_today",),
+}
+
+
+def _invalidate_dashboard(batches):
+    dashboard.invalidate(*set().union(*batches))
+
+
+def invalidate_dashboard(sender, using=None, **kwargs):
+    """
+    Marca as métricas do painel como desatualizadas após o commit.
+    """
+    if kwargs.get("raw"):
+        return
+    defer_until_commit(
+        _invalidate_dashboard, set(DASHBOARD_METRICS[sender]), using=using
+    )
+
+
+for model in DASHBOARD_METRICS:
+    post_save.connect(invalidate_dashboard, sender=model)
+    post_delete.connect(invalidate_dashboard, sender=model)
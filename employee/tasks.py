@@ -0,0 +1,70 @@
+"""
+Tarefas em segundo plano do app (executadas por ``manage.py runworker``).
+"""
+
+import os
+
+from django.core.files.storage import storages
+from django.utils import timezone
+
+from control.db import replicas
+from jobs.queue import task
+
+from . import payroll
+from .exports import FORMATS, stream_export
+from .importer import import_employees as run_import
+from .importer import open_text
+
+# Pastas (no storage privado "jobs", fora de MEDIA_ROOT) dos arquivos das
+# tarefas
+EXPORTS_DIR = "jobs/exports"
+IMPORTS_DIR = "jobs/imports"
+
+
+@task("employee.run_payroll", priority=10, max_attempts=1)
+def run_payroll(year, month, chunk_size=1000, dry_run=False):
+    report = payroll.run_payroll(year, month, chunk_size=chunk_size, dry_run=dry_run)
+    return {
+        "competence": f"{year:04d}-{month:02d}",
+        "employees": report.employees,
+        "processed": report.processed,
+        "skipped": len(report.skipped),
+        "total_gross": str(report.total_gross),
+        "total_net": str(report.total_net),
+        "elapsed": round(report.total_time, 3),
+        "dry_run": report.dry_run,
+    }
+
+
+@task("employee.export", bind=True)
+def export(job, dataset, fmt="csv", compress=False, **filters):
+    """
+    Grava a exportação em ``jobs/exports/<job>/`` sem montá-la em memória.
+    """
+    filename = f"{dataset}-{timezone.localdate():%Y%m%d}.{fmt}"
+    if compress:
+        filename += ".gz"
+    name = f"{EXPORTS_DIR}/{job.pk}/{filename}"
+    path = storages["jobs"].path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size = 0
+    # Relatório somente leitura: pode ser lido das réplicas
+    with replicas(), open(path, "wb") as output:
+        for chunk in stream_export(dataset, fmt, compress=compress, **filters):
+            output.write(chunk)
+            size += len(chunk)
+    content_type = "application/gzip" if compress else FORMATS[fmt][1]
+    return {"file": name, "filename": filename, "size": size, "content_type": content_type}
+
+
+@task("employee.import_employees", max_attempts=1)
+def import_employees(name, fmt="csv", dry_run=False):
+    """
+    Importa o arquivo salvo em ``jobs/imports/`` e o apaga ao final.
+    """
+    try:
+        with storages["jobs"].open(name, "rb") as upload:
+            report = run_import(open_text(upload), fmt=fmt, dry_run=dry_run)
+    finally:
+        storages["jobs"].delete(name)
+    return report.as_dict()
@@ -0,0 +1,15 @@
+from django import template
+
+from employee import access
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def has_permissions(context, *names):
+    """
+    Indica se o usuário logado tem todas as permissões do cargo informadas.
+
+    Uso: ``{% load access %}{% has_permissions "Visualizar Relatórios" as pode %}``
+    """
+    return access.has_permissions(context.get("user"), names)
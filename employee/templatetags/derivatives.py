@@ -0,0 +1,21 @@
+from django import template
+
+from employee import derivatives
+
+register = template.Library()
+
+
+@register.simple_tag
+def derivative_url(obj, size="thumb"):
+    """
+    URL da miniatura de uma conquista ou arquivo enviado no tamanho pedido
+    (``thumb``, ``small``, ``medium``), ou a URL do original quando não há
+    pré-visualização.
+
+    Uso: ``{% load derivatives %}<img src="{% derivative_url conquista "small" %}">``
+    """
+    url = derivatives.url_for(obj, size)
+    if url is not None:
+        return url
+    original = getattr(obj, "image", None) or getattr(obj, "file", None)
+    return original.url if original else ""
@@ -0,0 +1,30 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertionsMixin:
+    """
+    Asserções para testes que garantem que listagens não crescem em
+    consultas conforme o número de linhas (detecção de N+1).
+    """
+
+    def assertConstantQueries(self, create_row, render, sizes=(1, 10)):
+        """
+        Cria linhas com ``create_row(index)`` até atingir cada tamanho de
+        ``sizes`` e verifica que ``render()`` executa sempre a mesma
+        quantidade de consultas.
+        """
+        counts = {}
+        created = 0
+        for size in sizes:
+            while created < size:
+                create_row(created)
+                created += 1
+            with CaptureQueriesContext(connection) as context:
+                render()
+            counts[size] = len(context.captured_queries)
+        self.assertEqual(
+            len(set(counts.values())),
+            1,
+            f"Quantidade de consultas varia com o número de linhas: {counts}",
+        )
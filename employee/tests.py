@@ -1,3 +1,307 @@
+import io
+from datetime import date, time
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from .models import (
+    Absence,
+    Advance,
+    DataChangeHistory,
+    Document,
+    Employee,
+    Leave,
+    PaymentDetails,
+    PayrollPeriodSummary,
+    PayrollResult,
+    PerformanceReview,
+    Salary,
+    SalaryDiscount,
+    Training,
+    Vacation,
+)
+from .importer import EmployeeImporter, import_employees, read_rows
+from .payroll import (
+    IRRF_BRACKETS,
+    IRRF_SIMPLIFIED_DEDUCTION,
+    inss_column,
+    irrf_column,
+    run_payroll,
+)
+from .testing import QueryCountAssertionsMixin
+
+
+def create_employee(index, **fields):
+    user = User.objects.create(username=f"user{index}", full_name=f"Funcionário {index}")
+    values = {
+        "user": user,
+        "birth_date": date(1990, 1, 1),
+        "cpf": f"{index:011d}",
+        "rg": str(index),
+        "phone": "11999999999",
+        "start_time": time(8),
+        "end_time": time(17),
+        "gender": "M",
+        "employment_status": "active",
+        "contract_type": "clt",
+        "payment_method": "monthly",
+    }
+    values.update(fields)
+    return Employee.objects.create(**values)
+
+
+class EmployeeDisplayNameTests(TestCase):
+    def test_display_name_follows_user(self):
+        employee = create_employee(1)
+        self.assertEqual(str(employee), "Funcionário 1")
+
+        employee.user.full_name = "Outro Nome"
+        employee.user.save()
+        employee.refresh_from_db()
+        self.assertEqual(employee.display_name, "Outro Nome")
+
+    def test_display_name_follows_user_id_change(self):
+        employee = create_employee(1)
+        other = User.objects.create(username="outro", full_name="Outro Usuário")
+
+        employee = Employee.objects.get(pk=employee.pk)
+        employee.user_id = other.pk
+        employee.save()
+        employee.refresh_from_db()
+        self.assertEqual(employee.display_name, "Outro Usuário")
+
+
+class EmployeeListQueryCountTests(QueryCountAssertionsMixin, TestCase):
+    """
+    Renderizar ``__str__`` de listagens com ``with_display()`` deve custar
+    o mesmo número de consultas para 1 ou N linhas.
+    """
+
+    row_factories = {
+        Salary: lambda employee, i: Salary.objects.create(
+            employee=employee,
+            start_date=date(2024, 1, 1),
+            gross_salary=3000,
+            net_salary=0,
+            inss_discount=0,
+            irrf_discount=0,
+        ),
+        SalaryDiscount: lambda employee, i: SalaryDiscount.objects.create(
+            employee=employee, discount_type="Outro", amount=10, date=date(2024, 1, 5)
+        ),
+        Document: lambda employee, i: Document.objects.create(
+            employee=employee, description="RG"
+        ),
+        Advance: lambda employee, i: Advance.objects.create(
+            employee=employee, amount=100, date=date(2024, 1, 10)
+        ),
+        Vacation: lambda employee, i: Vacation.objects.create(
+            employee=employee,
+            start_date=date(2024, 2, 1),
+            end_date=date(2024, 2, 10),
+            days_taken=10,
+            status="approved",
+        ),
+        Leave: lambda employee, i: Leave.objects.create(
+            employee=employee,
+            leave_type="sick",
+            start_date=date(2024, 3, 1),
+            end_date=date(2024, 3, 2),
+            status="approved",
+        ),
+        Absence: lambda employee, i: Absence.objects.create(
+            employee=employee, absence_date=date(2024, 4, 1), status="excused"
+        ),
+        Training: lambda employee, i: Training.objects.create(
+            employee=employee,
+            training_name="NR-10",
+            provider="SENAI",
+            start_date=date(2024, 5, 1),
+            end_date=date(2024, 5, 2),
+        ),
+        PerformanceReview: lambda employee, i: PerformanceReview.objects.create(
+            employee=employee, review_date=date(2024, 6, 1), score=4
+        ),
+        DataChangeHistory: lambda employee, i: DataChangeHistory.objects.create(
+            employee=employee, field_name="phone", old_value="1", new_value="2"
+        ),
+        PaymentDetails: lambda employee, i: PaymentDetails.objects.create(
+            employee=employee, payment_type="pix"
+        ),
+    }
+
+    def test_list_rendering_is_constant(self):
+        for offset, (model, factory) in enumerate(self.row_factories.items()):
+            with self.subTest(model=model.__name__):
+                self.assertConstantQueries(
+                    lambda i: factory(create_employee(offset * 100 + i), i),
+                    lambda: [str(obj) for obj in model.objects.with_display()],
+                )
+
+
+class PayrollTaxTests(TestCase):
+    """
+    INSS e IRRF em centavos nos limites das faixas.
+    """
+
+    def test_inss_bracket_boundaries(self):
+        self.assertEqual(
+            inss_column([0, 141200, 141201, 266668, 400003, 778602, 1000000]),
+            [0, 10590, 10590, 21882, 37882, 90886, 90886],
+        )
+
+    def test_irrf_exempt_up_to_first_bracket(self):
+        # Com INSS menor, vale o desconto simplificado: isento até R$ 2.824,00
+        gross = [225920 + IRRF_SIMPLIFIED_DEDUCTION, 225921 + IRRF_SIMPLIFIED_DEDUCTION]
+        self.assertEqual(irrf_column(gross, inss_column(gross)), [0, 0])
+
+    def test_irrf_is_continuous_across_brackets(self):
+        for upper, _, _ in IRRF_BRACKETS[:-1]:
+            with self.subTest(upper=upper):
+                gross = upper + IRRF_SIMPLIFIED_DEDUCTION
+                below, above = irrf_column([gross, gross + 1], [0, 0])
+                self.assertIn(above - below, (0, 1))
+
+    def test_irrf_uses_inss_when_larger_than_simplified_deduction(self):
+        self.assertEqual(irrf_column([300000], [25882]), [1320])
+        self.assertEqual(irrf_column([1000000], [90886]), [160406])
+
+
+class PayrollRunTests(TestCase):
+    def setUp(self):
+        self.paid = create_employee(1)
+        for start, end, gross in (
+            (date(2023, 1, 1), date(2023, 12, 31), 2000),
+            (date(2024, 1, 1), date(2024, 1, 31), 3000),
+            (date(2024, 2, 1), None, 3500),
+        ):
+            Salary.objects.create(
+                employee=self.paid,
+                start_date=start,
+                end_date=end,
+                gross_salary=gross,
+                transport_voucher=100,
+                net_salary=0,
+                inss_discount=0,
+                irrf_discount=0,
+            )
+        SalaryDiscount.objects.create(
+            employee=self.paid, discount_type="Outro", amount=10, date=date(2024, 1, 5)
+        )
+        Advance.objects.create(employee=self.paid, amount=100, date=date(2024, 1, 10))
+        self.without_salary = create_employee(2)
+        terminated = create_employee(3, employment_status="terminated")
+        Salary.objects.create(
+            employee=terminated,
+            start_date=date(2024, 1, 1),
+            gross_salary=5000,
+            net_salary=0,
+            inss_discount=0,
+            irrf_discount=0,
+        )
+
+    def test_dry_run_computes_without_writing(self):
+        report = run_payroll(2024, 1, dry_run=True)
+
+        self.assertEqual(report.employees, 2)
+        self.assertEqual(report.processed, 1)
+        self.assertEqual(report.skipped, [self.without_salary.pk])
+        self.assertEqual(report.total_gross, Decimal("3000.00"))
+        # 3000,00 - INSS 258,82 - IRRF 13,20 - VT 100,00 - desconto 10,00 - adiantamento 100,00
+        self.assertEqual(report.total_net, Decimal("2517.98"))
+        salary = Salary.objects.get(employee=self.paid, start_date=date(2024, 1, 1))
+        self.assertEqual(salary.net_salary, 0)
+
+    def test_run_writes_one_result_per_month(self):
+        run_payroll(2024, 1)
+
+        result = PayrollResult.objects.get(employee=self.paid, period=date(2024, 1, 1))
+        self.assertEqual(result.inss_discount, Decimal("258.82"))
+        self.assertEqual(result.irrf_discount, Decimal("13.20"))
+        self.assertEqual(result.net_salary, Decimal("2517.98"))
+        summary = PayrollPeriodSummary.objects.get(
+            employee=self.paid, period=date(2024, 1, 1)
+        )
+        self.assertEqual(summary.net, Decimal("2517.98"))
+
+    def test_open_ended_salary_is_not_overwritten(self):
+        run_payroll(2024, 2)
+        run_payroll(2024, 3)
+
+        # O salário vale a partir de fevereiro e não guarda o cálculo de um mês
+        salary = Salary.objects.get(employee=self.paid, start_date=date(2024, 2, 1))
+        self.assertEqual(salary.net_salary, 0)
+        self.assertEqual(
+            list(
+                PayrollResult.objects.filter(employee=self.paid)
+                .order_by("period")
+                .values_list("period", "salary")
+            ),
+            [(date(2024, 2, 1), salary.pk), (date(2024, 3, 1), salary.pk)],
+        )
+
+
+class EmployeeImportTests(TestCase):
+    header = (
+        "username,full_name,email,cpf,rg,birth_date,phone,start_time,end_time,"
+        "gender,contract_type,payment_method\n"
+    )
+
+    def line(self, username, email, cpf, phone="11999999999"):
+        return (
+            f"{username},Nome {username},{email},{cpf},1,1990-01-01,{phone},"
+            "08:00,17:00,M,clt,monthly\n"
+        )
+
+    def run_import(self, *lines):
+        stream = io.StringIO(self.header + "".join(lines))
+        return import_employees(stream, workers=0)
+
+    def test_existing_users_are_never_rewritten(self):
+        user = User.objects.create(
+            username="ana", email="Ana@Example.com", full_name="Ana Original"
+        )
+        report = self.run_import(
+            self.line("ana", "", "52998224725"),
+            self.line("outra", "ana@example.com", "11144477735"),
+            self.line("bia", "bia@example.com", "39053344705"),
+        )
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual(
+            [line for line, _ in report.errors], [2, 3], report.as_dict()["errors"]
+        )
+        user.refresh_from_db()
+        self.assertEqual(user.full_name, "Ana Original")
+        self.assertFalse(Employee.objects.filter(user=user).exists())
+
+    def test_update_keeps_the_employee_user(self):
+        self.run_import(self.line("bia", "bia@example.com", "39053344705"))
+        employee = Employee.objects.get(cpf_digits="39053344705")
+
+        report = self.run_import(
+            self.line("outro", "", "390.533.447-05", phone="11888888888")
+        )
+
+        self.assertEqual(report.updated, 1)
+        employee.refresh_from_db()
+        self.assertEqual(employee.phone, "11888888888")
+        self.assertEqual(employee.user.username, "bia")
+        self.assertFalse(User.objects.filter(username="outro").exists())
+
+    def test_conflicts_at_write_time_are_reported_per_row(self):
+        User.objects.create(username="ana")
+        importer = EmployeeImporter(workers=0)
+        # Simula uma gravação concorrente entre a verificação e a gravação
+        importer.check_conflicts = lambda rows: rows
+        stream = io.StringIO(
+            self.header
+            + self.line("ana", "", "52998224725")
+            + self.line("bia", "", "39053344705")
+        )
+        report = importer.run(read_rows(stream))
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual([line for line, _ in report.errors], [2])
+        self.assertTrue(Employee.objects.filter(cpf_digits="39053344705").exists())
@@ -0,0 +1,219 @@
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time
+
+from django.apps import apps
+from django.db import transaction
+
+from accounts.transaction import defer_until_commit
+
+_state = threading.local()
+_tracked_fields = {}
+
+# Tamanho dos blocos de ids relidos por ``tracked_update``
+UPDATE_CHUNK_SIZE = 1000
+
+
+def is_enabled():
+    return getattr(_state, "enabled", True)
+
+
+@contextmanager
+def paused():
+    """
+    Desativa o registro de alterações na thread atual (ex.: cargas em
+    massa que não devem gerar histórico).
+    """
+    previous = is_enabled()
+    _state.enabled = False
+    try:
+        yield
+    finally:
+        _state.enabled = previous
+
+
+def tracked_fields(model):
+    """
+    Pares ``(attname, nome)`` dos campos rastreados do modelo: os campos
+    editáveis e concretos, exceto a chave primária e ``tracking_exclude``,
+    ou somente ``tracked_fields`` quando definido.
+    """
+    fields = _tracked_fields.get(model)
+    if fields is None:
+        fields = tuple(
+            (field.attname, field.name)
+            for field in model._meta.concrete_fields
+            if field.editable
+            and not field.primary_key
+            and field.name not in model.tracking_exclude
+            and (model.tracked_fields is None or field.name in model.tracked_fields)
+        )
+        _tracked_fields[model] = fields
+    return fields
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _write_history(entries):
+    DataChangeHistory = apps.get_model("employee", "DataChangeHistory")
+    DataChangeHistory.objects.bulk_create(entries)
+
+
+def _history(model, object_id, employee_id, name, old, new):
+    DataChangeHistory = apps.get_model("employee", "DataChangeHistory")
+    return DataChangeHistory(
+        employee_id=employee_id,
+        model_name=model._meta.model_name,
+        object_id=object_id,
+        field_name=name,
+        old_value=_text(old),
+        new_value=_text(new),
+    )
+
+
+def _write_batches(batches):
+    _write_history([entry for entries in batches for entry in entries])
+
+
+def record_changes(entries, using=None):
+    """
+    Agenda a gravação do histórico para o commit; todas as alterações da
+    transação são gravadas com um único ``bulk_create`` (fora de uma
+    transação, um por chamada).
+    """
+    if entries:
+        defer_until_commit(_write_batches, entries, using=using)
+
+
+def _snapshot(instance, attnames=None):
+    # Somente campos carregados: campos adiados não estão em __dict__
+    values = instance.__dict__
+    return {
+        attname: values[attname]
+        for attname, _ in tracked_fields(type(instance))
+        if attname in values and (attnames is None or attname in attnames)
+    }
+
+
+def _diff(instance, before, after):
+    model = type(instance)
+    employee_id = getattr(instance, model.tracking_employee_field)
+    return [
+        _history(model, instance.pk, employee_id, name, before[attname], after[attname])
+        for attname, name in tracked_fields(model)
+        if attname in before and attname in after and before[attname] != after[attname]
+    ]
+
+
+def _attnames(model, field_names):
+    return {model._meta.get_field(name).attname for name in field_names}
+
+
+class TrackedModelMixin:
+    """
+    Registra em ``DataChangeHistory`` os campos alterados a cada ``save()``.
+
+    Os valores originais são guardados quando a instância é carregada
+    (``from_db``) e comparados em memória ao salvar, sem nenhum SELECT
+    extra. Modelos ligados a um funcionário indicam em
+    ``tracking_employee_field`` o atributo com o id dele.
+    """
+
+    # Campos rastreados (None = todos os editáveis)
+    tracked_fields = None
+    # Campos ignorados
+    tracking_exclude = ()
+    # Atributo com o id do funcionário dono do registro
+    tracking_employee_field = "employee_id"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tracking_snapshot = _snapshot(instance)
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        attnames = None
+        if update_fields is not None:
+            attnames = _attnames(type(self), update_fields)
+        after = _snapshot(self, attnames)
+        before = getattr(self, "_tracking_snapshot", None)
+        if before is None:
+            self._tracking_snapshot = after
+            return
+        if is_enabled():
+            record_changes(_diff(self, before, after), using=self._state.db)
+        before.update(after)
+
+
+def tracked_bulk_update(objs, fields, batch_size=None):
+    """
+    ``bulk_update`` com histórico, comparando com os valores guardados no
+    carregamento (sem reler as linhas).
+    """
+    objs = list(objs)
+    if not objs:
+        return 0
+    model = type(objs[0])
+    attnames = _attnames(model, fields)
+    using = objs[0]._state.db
+    with transaction.atomic(using=using):
+        updated = model._default_manager.db_manager(using).bulk_update(
+            objs, fields, batch_size=batch_size
+        )
+        entries = []
+        for obj in objs:
+            after = _snapshot(obj, attnames)
+            before = getattr(obj, "_tracking_snapshot", None)
+            if before is None:
+                obj._tracking_snapshot = after
+                continue
+            if is_enabled():
+                entries.extend(_diff(obj, before, after))
+            before.update(after)
+        record_changes(entries, using=using)
+    return updated
+
+
+def tracked_update(queryset, **values):
+    """
+    ``QuerySet.update`` com histórico. Como não há instâncias carregadas,
+    lê os valores das colunas alteradas antes e depois do UPDATE (aceita
+    expressões como ``F()``).
+    """
+    model = queryset.model
+    attnames = _attnames(model, values) & {
+        attname for attname, _ in tracked_fields(model)
+    }
+    if not attnames or not is_enabled():
+        return queryset.update(**values)
+    names = dict(tracked_fields(model))
+    columns = ["pk", model.tracking_employee_field, *sorted(attnames)]
+    using = queryset.db
+    with transaction.atomic(using=using):
+        before = {row[0]: row for row in queryset.values_list(*columns)}
+        updated = queryset.update(**values)
+        ids = list(before)
+        entries = []
+        manager = model._base_manager.db_manager(using)
+        for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+            chunk = ids[start : start + UPDATE_CHUNK_SIZE]
+            for row in manager.filter(pk__in=chunk).values_list(*columns):
+                old = before[row[0]]
+                for index, attname in enumerate(columns[2:], start=2):
+                    if old[index] != row[index]:
+                        entries.append(
+                            _history(
+                                model, row[0], row[1], names[attname], old[index], row[index]
+                            )
+                        )
+        record_changes(entries, using=using)
+    return updated
@@ -0,0 +1,389 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import quote_etag
+
+from .models import (
+    Document,
+    UploadedFile,
+    UploadSession,
+    upload_path,
+    uploads_storage,
+)
+
+# Hashes parciais das sessões em andamento mantidos neste processo
+MAX_PENDING_HASHES = 1000
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """
+    Erro de envio com o status HTTP correspondente.
+    """
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def chunk_size():
+    return settings.UPLOADS_CHUNK_SIZE
+
+
+def _temp_path(name):
+    directory = uploads_storage().path(os.path.join("uploads", "tmp"))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+def _move_into_storage(source, name):
+    # No disco local o arquivo é apenas renomeado (sem cópia)
+    storage = uploads_storage()
+    try:
+        target = storage.path(name)
+    except NotImplementedError:
+        with open(source, "rb") as handle:
+            saved = storage.save(name, File(handle))
+        os.remove(source)
+        return saved
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.replace(source, target)
+    except OSError:
+        shutil.move(source, target)
+    return name
+
+
+def ingest(path, sha256, size, name, content_type=""):
+    """
+    Registra um arquivo temporário já hasheado. Se o conteúdo já existe, o
+    temporário é descartado e o ``UploadedFile`` existente é devolvido.
+
+    Retorna ``(uploaded_file, criado)``.
+    """
+    existing = UploadedFile.objects.filter(sha256=sha256).first()
+    if existing is not None:
+        os.remove(path)
+        return existing, False
+    uploaded = UploadedFile(
+        sha256=sha256, size=size, name=name[:255], content_type=content_type[:100]
+    )
+    blob = upload_path(uploaded, name)
+    if uploads_storage().exists(blob):
+        os.remove(path)
+    else:
+        blob = _move_into_storage(path, blob)
+    uploaded.file.name = blob
+    try:
+        with transaction.atomic():
+            uploaded.save()
+    except IntegrityError:
+        # Outro envio do mesmo conteúdo terminou primeiro
+        return UploadedFile.objects.get(sha256=sha256), False
+    return uploaded, True
+
+
+def store_chunks(chunks, name, content_type=""):
+    """
+    Grava um iterável de bytes em disco calculando o SHA-256 em paralelo,
+    sem manter o arquivo em memória.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    path = _temp_path(f"{uuid.uuid4().hex}.part")
+    with open(path, "wb") as handle:
+        for chunk in chunks:
+            size += len(chunk)
+            if size > settings.UPLOADS_MAX_SIZE:
+                handle.close()
+                os.remove(path)
+                raise UploadError("Arquivo maior que o permitido.", status=413)
+            digest.update(chunk)
+            handle.write(chunk)
+    return ingest(path, digest.hexdigest(), size, name, content_type)
+
+
+def store_upload(upload):
+    """
+    Armazena um arquivo de ``request.FILES``. Arquivos recebidos pelo
+    ``HashingUploadHandler`` já chegam com o hash e são apenas movidos.
+    """
+    digest = getattr(upload, "sha256", None)
+    if digest is not None and hasattr(upload, "temporary_file_path"):
+        upload.file.flush()
+        path = _temp_path(f"{uuid.uuid4().hex}.part")
+        try:
+            os.link(upload.temporary_file_path(), path)
+        except OSError:
+            shutil.copyfile(upload.temporary_file_path(), path)
+        return ingest(path, digest, upload.size, upload.name, upload.content_type or "")
+    return store_chunks(
+        upload.chunks(chunk_size()), upload.name, upload.content_type or ""
+    )
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Grava o upload em arquivo temporário calculando o SHA-256 bloco a bloco,
+    enquanto o corpo da requisição é lido.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOADS_MAX_SIZE:
+            raise SkipFile()
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.digest.hexdigest()
+        return upload
+
+
+def recount_references(file_ids):
+    """
+    Recalcula ``ref_count`` dos arquivos a partir de ``Document.files``.
+    """
+    through = Document.files.through
+    references = (
+        through.objects.filter(uploadedfile_id=OuterRef("pk"))
+        .order_by()
+        .values("uploadedfile_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return UploadedFile.objects.filter(pk__in=file_ids).update(
+        ref_count=Coalesce(Subquery(references), 0)
+    )
+
+
+def delete_blobs(names):
+    """
+    Apaga do armazenamento os arquivos que nenhum ``UploadedFile`` usa.
+    """
+    used = set(
+        UploadedFile.objects.filter(file__in=names).values_list("file", flat=True)
+    )
+    storage = uploads_storage()
+    for name in set(names) - used:
+        storage.delete(name)
+
+
+def session_path(session):
+    return _temp_path(f"{session.pk}.part")
+
+
+def start_session(name, size, content_type="", user=None):
+    """
+    Abre uma sessão de envio retomável para um arquivo de ``size`` bytes.
+    """
+    if size <= 0 or size > settings.UPLOADS_MAX_SIZE:
+        raise UploadError("Tamanho inválido.", status=413 if size > 0 else 400)
+    session = UploadSession.objects.create(
+        name=name[:255], size=size, content_type=content_type[:100], user=user
+    )
+    open(session_path(session), "wb").close()
+    with _hashers_lock:
+        _hashers[session.pk] = (0, hashlib.sha256())
+        while len(_hashers) > MAX_PENDING_HASHES:
+            _hashers.popitem(last=False)
+    return session
+
+
+def parse_content_range(header, size):
+    """
+    Lê ``Content-Range: bytes início-fim/total`` de um bloco enviado.
+    """
+    match = _CONTENT_RANGE.match(header or "")
+    if not match:
+        raise UploadError("Cabeçalho Content-Range inválido.")
+    start, end, total = map(int, match.groups())
+    if total != size or end < start or end >= total:
+        raise UploadError("Content-Range não corresponde ao arquivo.", status=416)
+    return start, end
+
+
+def append_chunk(session, start, end, stream):
+    """
+    Grava o bloco ``[start, end]`` lido de ``stream``. Blocos fora de ordem
+    são recusados com o offset atual para o cliente retomar dali.
+    """
+    if session.completed:
+        return session
+    if start != session.offset:
+        raise UploadError("Offset inesperado.", status=409, offset=session.offset)
+    length = end - start + 1
+    with _hashers_lock:
+        state = _hashers.pop(session.pk, None)
+    digest = state[1] if state is not None and state[0] == start else None
+
+    remaining = length
+    with open(session_path(session), "r+b") as handle:
+        handle.seek(start)
+        handle.truncate()
+        while remaining:
+            data = stream.read(min(chunk_size(), remaining))
+            if not data:
+                break
+            handle.write(data)
+            if digest is not None:
+                digest.update(data)
+            remaining -= len(data)
+    if remaining:
+        raise UploadError("Bloco incompleto.", offset=session.offset)
+
+    updated = UploadSession.objects.filter(pk=session.pk, offset=start).update(
+        offset=end + 1
+    )
+    if not updated:
+        raise UploadError("Envio concorrente na mesma sessão.", status=409)
+    session.offset = end + 1
+    if digest is not None:
+        with _hashers_lock:
+            _hashers[session.pk] = (session.offset, digest)
+    if session.offset == session.size:
+        complete_session(session)
+    return session
+
+
+def complete_session(session):
+    """
+    Conclui a sessão: usa o hash incremental quando ele foi calculado neste
+    processo; caso contrário, relê o arquivo temporário em blocos.
+    """
+    with _hashers_lock:
+        state = _hashers.pop(session.pk, None)
+    path = session_path(session)
+    if state is not None and state[0] == session.size:
+        digest = state[1]
+    else:
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(chunk_size()), b""):
+                digest.update(chunk)
+    uploaded, _ = ingest(
+        path, digest.hexdigest(), session.size, session.name, session.content_type
+    )
+    session.uploaded_file = uploaded
+    UploadSession.objects.filter(pk=session.pk).update(uploaded_file=uploaded)
+    return uploaded
+
+
+class _FileRange:
+    # Leitor limitado a um trecho do arquivo (respostas 206)
+    def __init__(self, handle, start, length):
+        handle.seek(start)
+        self.handle = handle
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.handle.close()
+
+
+def parse_range(header, size):
+    """
+    Interpreta um cabeçalho ``Range`` de intervalo único. Retorna
+    ``(início, fim)``, ``None`` para responder o arquivo inteiro ou levanta
+    ``UploadError`` (416) se o intervalo não puder ser atendido.
+    """
+    match = _RANGE.match(header or "")
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise UploadError("Intervalo inválido.", status=416)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise UploadError("Intervalo inválido.", status=416)
+    return start, end
+
+
+def serve(request, uploaded, as_attachment=False):
+    """
+    Responde o download de um ``UploadedFile`` com suporte a ``Range`` e
+    validação por ETag (o SHA-256). Com ``UPLOADS_SENDFILE_HEADER``
+    configurado, a transferência é delegada ao servidor web.
+    """
+    etag = quote_etag(uploaded.sha256) if uploaded.sha256 else None
+    if etag and etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    filename = os.path.basename(uploaded.name or uploaded.file.name)
+    disposition = "attachment" if as_attachment else "inline"
+    content_type = uploaded.content_type or "application/octet-stream"
+
+    if settings.UPLOADS_SENDFILE_HEADER:
+        response = HttpResponse(content_type=content_type)
+        response[settings.UPLOADS_SENDFILE_HEADER] = (
+            settings.UPLOADS_SENDFILE_PREFIX + uploaded.file.name
+        )
+    else:
+        handle = uploaded.file.storage.open(uploaded.file.name, "rb")
+        size = uploaded.file.size
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except UploadError:
+            handle.close()
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        if byte_range is None:
+            # Arquivo inteiro: o servidor WSGI pode usar sendfile()
+            response = FileResponse(handle, content_type=content_type)
+        else:
+            start, end = byte_range
+            response = FileResponse(
+                _FileRange(handle, start, end - start + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Length"] = str(end - start + 1)
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response.block_size = chunk_size()
+    response["Accept-Ranges"] = "bytes"
+    response["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+    response["Cache-Control"] = "private, max-age=31536000, immutable"
+    if etag:
+        response["ETag"] = etag
+    return response
@@ -2,7 +2,34 @@ from django.urls import path
 from .views import *
 
 urlpatterns = [
-    
-    
-    
+    # exportações em streaming
+    path(
+        "exports/<str:dataset>.<str:fmt>",
+        ExportView.as_view(),
+        name="employee-export",
+    ),
+    # importação em massa
+    path("imports/", ImportView.as_view(), name="employee-import"),
+    # folha de pagamento em segundo plano
+    path("payroll/runs/", PayrollRunView.as_view(), name="employee-payroll-run"),
+    # envio de arquivos (deduplicados por SHA-256) e envio retomável
+    path("files/", FileUploadView.as_view(), name="employee-file-upload"),
+    path(
+        "files/sessions/",
+        UploadSessionCreateView.as_view(),
+        name="employee-upload-session-create",
+    ),
+    path(
+        "files/sessions/<uuid:session_id>/",
+        UploadSessionView.as_view(),
+        name="employee-upload-session",
+    ),
+    # download com suporte a Range
+    path("files/<int:pk>/", FileDownloadView.as_view(), name="employee-file"),
+    # miniaturas e pré-visualizações por hash do conteúdo
+    path(
+        "derivatives/<str:sha256>/<str:size>/",
+        DerivativeView.as_view(),
+        name="employee-derivative",
+    ),
 ]
@@ -1,5 +1,272 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate
-from django.http import JsonResponse
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+import json
+import uuid
+from datetime import datetime
 
+from django.conf import settings
+from django.core.files.storage import storages
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
+from jobs.queue import enqueue
+
+from . import derivatives, tasks, uploads
+from .access import RolePermissionRequiredMixin
+from .exports import EXPORTS, FORMATS, stream_export
+from .models import UploadedFile, UploadSession
+
+
+def _job_accepted(job):
+    return JsonResponse(
+        {"job": job.pk, "state": job.state, "url": reverse("job-detail", args=[job.pk])},
+        status=202,
+    )
+
+
+# Exportação em streaming (CSV/XLSX, opcionalmente gzip); dados pessoais e
+# salários: somente equipe ou cargos com "Visualizar Relatórios"
+class ExportView(RolePermissionRequiredMixin, View):
+    permission_required = ("Visualizar Relatórios",)
+    filter_params = ("start", "end", "employment_status", "role")
+
+    def has_permission(self):
+        return self.request.user.is_staff or super().has_permission()
+
+    def get(self, request, dataset, fmt, *args, **kwargs):
+        if dataset not in EXPORTS or fmt not in FORMATS:
+            raise Http404
+        filters = {name: request.GET.get(name) or None for name in self.filter_params}
+        for name in ("start", "end"):
+            if filters[name] and parse_date(filters[name]) is None:
+                return JsonResponse(
+                    {"error": f"Data inválida em '{name}', use AAAA-MM-DD."},
+                    status=400,
+                )
+        if filters["role"] and not filters["role"].isdigit():
+            return JsonResponse(
+                {"error": "Cargo inválido em 'role', use o id numérico."}, status=400
+            )
+        compress = request.GET.get("gzip") in ("1", "true")
+        if request.GET.get("background") in ("1", "true"):
+            job = enqueue(
+                tasks.export,
+                {"dataset": dataset, "fmt": fmt, "compress": compress, **filters},
+                user=request.user,
+            )
+            return _job_accepted(job)
+
+        _, content_type = FORMATS[fmt]
+        filename = f"{dataset}-{timezone.localdate():%Y%m%d}.{fmt}"
+        if compress:
+            content_type = "application/gzip"
+            filename += ".gz"
+        response = StreamingHttpResponse(
+            stream_export(dataset, fmt, compress=compress, **filters),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+# Importação em massa de funcionários (CSV/JSONL enviado em "file")
+class ImportView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return JsonResponse(
+                {"error": "Envie o arquivo no campo 'file'."}, status=400
+            )
+        fmt = request.POST.get("format") or (
+            "jsonl" if upload.name.endswith(".jsonl") else "csv"
+        )
+        dry_run = request.POST.get("dry_run") in ("1", "true")
+        # Sempre em segundo plano: a validação usa um pool de processos
+        name = storages["jobs"].save(
+            f"{tasks.IMPORTS_DIR}/{uuid.uuid4().hex}.{fmt}", upload
+        )
+        job = enqueue(
+            tasks.import_employees,
+            {"name": name, "fmt": fmt, "dry_run": dry_run},
+            user=request.user,
+        )
+        return _job_accepted(job)
+
+
+# Cálculo da folha de um mês ("competence" = AAAA-MM) em segundo plano
+class PayrollRunView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def post(self, request, *args, **kwargs):
+        try:
+            competence = datetime.strptime(request.POST.get("competence", ""), "%Y-%m")
+        except ValueError:
+            return JsonResponse(
+                {"error": "Competência inválida, use o formato AAAA-MM."}, status=400
+            )
+        job = enqueue(
+            tasks.run_payroll,
+            {
+                "year": competence.year,
+                "month": competence.month,
+                "dry_run": request.POST.get("dry_run") in ("1", "true"),
+            },
+            user=request.user,
+        )
+        return _job_accepted(job)
+
+
+def _uploaded_file_data(uploaded, created=None):
+    data = {
+        "id": uploaded.pk,
+        "name": uploaded.name,
+        "sha256": uploaded.sha256,
+        "size": uploaded.size,
+        "content_type": uploaded.content_type,
+        "previews": derivatives.urls_for(uploaded),
+    }
+    if created is not None:
+        data["created"] = created
+    return data
+
+
+def _upload_error(error):
+    data = {"error": str(error)}
+    if error.offset is not None:
+        data["offset"] = error.offset
+    return JsonResponse(data, status=error.status)
+
+
+# Envio de arquivo em multipart ("file"), gravado em disco com hash em streaming
+@method_decorator(csrf_exempt, name="dispatch")
+class FileUploadView(LoginRequiredMixin, View):
+    def post(self, request, *args, **kwargs):
+        # Os handlers precisam ser trocados antes de o corpo ser lido, por
+        # isso o CSRF é verificado só depois
+        request.upload_handlers = [uploads.HashingUploadHandler(request)]
+        return csrf_protect(self._post)(request)
+
+    def _post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return JsonResponse(
+                {"error": "Envie o arquivo no campo 'file'."}, status=400
+            )
+        try:
+            uploaded, created = uploads.store_upload(upload)
+        except uploads.UploadError as error:
+            return _upload_error(error)
+        return JsonResponse(
+            _uploaded_file_data(uploaded, created), status=201 if created else 200
+        )
+
+
+# Envio retomável: cria a sessão (JSON com name, size e content_type)
+class UploadSessionCreateView(LoginRequiredMixin, View):
+    def post(self, request, *args, **kwargs):
+        try:
+            payload = json.loads(request.body or b"{}")
+            size = int(payload.get("size", 0))
+        except (ValueError, TypeError):
+            return JsonResponse({"error": "JSON inválido."}, status=400)
+        if not payload.get("name"):
+            return JsonResponse({"error": "Informe 'name'."}, status=400)
+        try:
+            session = uploads.start_session(
+                payload["name"],
+                size,
+                content_type=payload.get("content_type", ""),
+                user=request.user,
+            )
+        except uploads.UploadError as error:
+            return _upload_error(error)
+        return JsonResponse({"id": str(session.pk), "offset": 0}, status=201)
+
+
+# Envio retomável: PUT de um bloco com Content-Range; GET informa o offset
+class UploadSessionView(LoginRequiredMixin, View):
+    def get_session(self, request, session_id):
+        return get_object_or_404(UploadSession, pk=session_id, user=request.user)
+
+    def session_data(self, session):
+        data = {"id": str(session.pk), "offset": session.offset, "size": session.size}
+        if session.completed:
+            data["file"] = _uploaded_file_data(session.uploaded_file)
+        return data
+
+    def get(self, request, session_id, *args, **kwargs):
+        return JsonResponse(self.session_data(self.get_session(request, session_id)))
+
+    def put(self, request, session_id, *args, **kwargs):
+        session = self.get_session(request, session_id)
+        try:
+            start, end = uploads.parse_content_range(
+                request.headers.get("Content-Range"), session.size
+            )
+            # O corpo é lido direto do socket, em blocos
+            uploads.append_chunk(session, start, end, request)
+        except uploads.UploadError as error:
+            return _upload_error(error)
+        return JsonResponse(
+            self.session_data(session), status=201 if session.completed else 202
+        )
+
+
+def can_view_file(user, uploaded):
+    return user.is_staff or uploaded.documents.filter(employee__user=user).exists()
+
+
+# Download com suporte a Range (somente equipe ou o próprio funcionário)
+class FileDownloadView(LoginRequiredMixin, View):
+    def get(self, request, pk, *args, **kwargs):
+        uploaded = get_object_or_404(UploadedFile, pk=pk)
+        if not can_view_file(request.user, uploaded):
+            raise Http404
+        return uploads.serve(
+            request, uploaded, as_attachment=request.GET.get("download") == "1"
+        )
+
+
+
+# Miniaturas (geradas sob demanda quando ainda não existem ou foram
+# removidas pela cota de disco); ficam fora de MEDIA_ROOT e só saem por aqui
+class DerivativeView(LoginRequiredMixin, View):
+    def get(self, request, sha256, size, *args, **kwargs):
+        if size not in derivatives.sizes():
+            raise Http404
+        source = derivatives.find_source(sha256)
+        if source is None:
+            raise Http404
+        if isinstance(source, UploadedFile) and not can_view_file(request.user, source):
+            raise Http404
+        path = derivatives.render_now(source, size)
+        if path is None:
+            raise Http404
+        content_type = f"image/{settings.DERIVATIVES_FORMAT.lower()}"
+        if settings.UPLOADS_SENDFILE_HEADER:
+            response = HttpResponse(content_type=content_type)
+            response[settings.UPLOADS_SENDFILE_HEADER] = (
+                settings.UPLOADS_SENDFILE_PREFIX
+                + derivatives.derivative_name(sha256, size)
+            )
+        else:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+        response["Cache-Control"] = "private, max-age=31536000, immutable"
+        return response
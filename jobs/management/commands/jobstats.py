@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Mostra a profundidade da fila e as latências das tarefas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--minutes",
+            type=int,
+            default=60,
+            help="Janela das latências em minutos (padrão: 60)",
+        )
+
+    def handle(self, *args, **options):
+        data = queue.metrics(window=timedelta(minutes=options["minutes"]))
+        for name, states in sorted(data["depth"].items()) or [("-", {})]:
+            self.stdout.write(
+                f"Fila {name}: {states.get('queued', 0)} na fila, "
+                f"{states.get('running', 0)} em execução"
+            )
+        self.stdout.write(
+            f"Tarefa pronta mais antiga: {data['ready_oldest_age']:.1f}s"
+        )
+        finished = ", ".join(
+            f"{state}: {total}" for state, total in sorted(data["finished"].items())
+        )
+        self.stdout.write(f"Finalizadas em {options['minutes']} min: {finished or '0'}")
+        for name in ("wait", "duration"):
+            p50, p95 = data[f"{name}_p50"], data[f"{name}_p95"]
+            if p50 is not None:
+                label = "Espera na fila" if name == "wait" else "Duração"
+                self.stdout.write(f"{label}: p50 {p50:.2f}s | p95 {p95:.2f}s")
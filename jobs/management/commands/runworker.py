@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Processa as tarefas em segundo plano da fila no banco de dados."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.JOBS_WORKERS,
+            help="Tarefas executadas ao mesmo tempo",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=("thread", "process"),
+            default=settings.JOBS_WORKER_MODE,
+            help="Pool de threads ou de processos",
+        )
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Fila a processar (pode repetir; padrão: default)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help="Segundos entre consultas quando a fila está vazia",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Termina quando não houver mais tarefas prontas",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options["concurrency"],
+            mode=options["mode"],
+            queues=options["queues"] or ("default",),
+            poll_interval=options["poll_interval"],
+            burst=options["burst"],
+        )
+        self.stdout.write(
+            f"Worker {worker.id}: {worker.concurrency} {worker.mode}s, "
+            f"filas {', '.join(worker.queues)}"
+        )
+        processed = worker.run()
+        self.stdout.write(self.style.SUCCESS(f"{processed} tarefas processadas"))
@@ -0,0 +1,82 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from accounts.models import User
+
+
+# Modelo de tarefa em segundo plano (fila no próprio banco)
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    STATE_CHOICES = [
+        (QUEUED, _("Na fila")),
+        (RUNNING, _("Em execução")),
+        (SUCCEEDED, _("Concluída")),
+        (FAILED, _("Falhou")),
+        (CANCELLED, _("Cancelada")),
+    ]
+    FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+    # Nome da tarefa registrada (ex.: "employee.run_payroll")
+    task = models.CharField(max_length=100, verbose_name=_("Tarefa"))
+    # Argumentos nomeados da tarefa (JSON)
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name=_("Argumentos"))
+    # Fila em que a tarefa é processada
+    queue = models.CharField(max_length=50, default="default", verbose_name=_("Fila"))
+    # Estado atual
+    state = models.CharField(
+        max_length=10, choices=STATE_CHOICES, default=QUEUED, verbose_name=_("Estado")
+    )
+    # Prioridade (maior é executada antes)
+    priority = models.SmallIntegerField(default=0, verbose_name=_("Prioridade"))
+    # Tentativas já iniciadas e máximo permitido
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name=_("Tentativas"))
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3, verbose_name=_("Máximo de Tentativas")
+    )
+    # Não executar antes deste momento (agendamento e espera entre tentativas)
+    run_at = models.DateTimeField(default=timezone.now, verbose_name=_("Executar em"))
+    # Usuário que pediu a tarefa
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        verbose_name=_("Usuário"),
+    )
+    # Worker que reservou a tarefa e validade da reserva
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_until = models.DateTimeField(null=True, blank=True)
+    # Resultado (JSON) ou erro da última tentativa
+    result = models.JSONField(null=True, blank=True, verbose_name=_("Resultado"))
+    error = models.TextField(blank=True, default="", verbose_name=_("Erro"))
+    # Datas de criação, da primeira execução e do fim
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Criada em"))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Iniciada em"))
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Finalizada em")
+    )
+
+    class Meta:
+        indexes = [
+            # Próxima tarefa da fila: estado, fila, prioridade e horário
+            models.Index(
+                fields=["state", "queue", "-priority", "run_at"], name="job_claim_idx"
+            ),
+            # Reservas vencidas de workers que pararam
+            models.Index(fields=["state", "locked_until"], name="job_lease_idx"),
+            # Métricas de latência por período
+            models.Index(fields=["finished_at"], name="job_finished_idx"),
+        ]
+
+    @property
+    def finished(self):
+        return self.state in self.FINISHED_STATES
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.get_state_display()})"
@@ -0,0 +1,328 @@
+import logging
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, DateTimeField, F, Min, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Tarefas lidas por janela nas métricas de latência
+METRICS_SAMPLE = 10000
+
+_registry = {}
+_current = threading.local()
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: object
+    queue: str
+    priority: int
+    max_attempts: int
+    # Recebe o Job como primeiro argumento
+    bind: bool
+
+
+def task(name=None, queue="default", priority=0, max_attempts=None, bind=False):
+    """
+    Registra uma função como tarefa da fila. Os argumentos nomeados
+    passados a ``enqueue`` devem ser serializáveis em JSON, assim como o
+    valor retornado (gravado em ``Job.result``).
+    """
+
+    def decorator(func):
+        key = name or f"{func.__module__}.{func.__name__}"
+        _registry[key] = Task(
+            key,
+            func,
+            queue,
+            priority,
+            max_attempts or settings.JOBS_MAX_ATTEMPTS,
+            bind,
+        )
+        func.task_name = key
+        return func
+
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"Tarefa não registrada: {name}") from None
+
+
+def current_job():
+    """
+    Job em execução na thread atual (``None`` fora de um worker).
+    """
+    return getattr(_current, "job", None)
+
+
+def enqueue(
+    name,
+    kwargs=None,
+    *,
+    queue=None,
+    priority=None,
+    delay=None,
+    run_at=None,
+    max_attempts=None,
+    user=None,
+    using=DEFAULT_DB_ALIAS,
+):
+    """
+    Coloca uma tarefa na fila e retorna o ``Job``. Dentro de uma transação
+    a tarefa só fica visível aos workers depois do commit.
+
+    :param name: Nome da tarefa ou a própria função decorada com ``@task``.
+    :param delay: Segundos (ou ``timedelta``) antes de poder ser executada.
+    """
+    registered = get_task(getattr(name, "task_name", name))
+    if run_at is None:
+        run_at = timezone.now()
+        if delay:
+            if not isinstance(delay, timedelta):
+                delay = timedelta(seconds=delay)
+            run_at += delay
+    return Job.objects.using(using).create(
+        task=registered.name,
+        kwargs=kwargs or {},
+        queue=queue or registered.queue,
+        priority=registered.priority if priority is None else priority,
+        max_attempts=max_attempts or registered.max_attempts,
+        run_at=run_at,
+        user=user,
+    )
+
+
+def _claim_values(worker_id, now):
+    return {
+        "state": Job.RUNNING,
+        "locked_by": worker_id,
+        "locked_until": now + timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+        "attempts": F("attempts") + 1,
+        "started_at": Coalesce(
+            "started_at", Value(now, output_field=DateTimeField())
+        ),
+    }
+
+
+def claim(worker_id, limit=1, queues=("default",), using=DEFAULT_DB_ALIAS):
+    """
+    Reserva até ``limit`` tarefas prontas, por prioridade e ordem de chegada.
+
+    Com ``SELECT ... FOR UPDATE SKIP LOCKED`` (PostgreSQL, MySQL 8) vários
+    workers disputam a fila sem esperar uns pelos outros. No SQLite, onde
+    as escritas já são serializadas, cada candidata é reservada com um
+    UPDATE condicional ao estado (compare-and-set); se outro worker a pegou
+    antes, nenhuma linha é alterada e a próxima é tentada.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    jobs = Job.objects.using(using)
+    ready = jobs.filter(state=Job.QUEUED, queue__in=queues, run_at__lte=now).order_by(
+        "-priority", "run_at", "pk"
+    )
+    values = _claim_values(worker_id, now)
+    if connections[using].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=using):
+            ids = list(
+                ready.select_for_update(skip_locked=True).values_list("pk", flat=True)[
+                    :limit
+                ]
+            )
+            jobs.filter(pk__in=ids).update(**values)
+    else:
+        ids = []
+        for pk in ready.values_list("pk", flat=True)[: limit * 4]:
+            if jobs.filter(pk=pk, state=Job.QUEUED).update(**values):
+                ids.append(pk)
+                if len(ids) >= limit:
+                    break
+    return list(jobs.filter(pk__in=ids).order_by("-priority", "run_at", "pk"))
+
+
+def heartbeat(worker_id, ids, using=DEFAULT_DB_ALIAS):
+    """
+    Renova a reserva das tarefas ainda em execução neste worker.
+    """
+    if not ids:
+        return 0
+    until = timezone.now() + timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+    return (
+        Job.objects.using(using)
+        .filter(pk__in=list(ids), state=Job.RUNNING, locked_by=worker_id)
+        .update(locked_until=until)
+    )
+
+
+def requeue_stale(using=DEFAULT_DB_ALIAS):
+    """
+    Devolve à fila as tarefas cuja reserva venceu (worker encerrado no meio
+    da execução); as que já esgotaram as tentativas são marcadas como
+    falhas. Retorna ``(devolvidas, falhas)``.
+    """
+    now = timezone.now()
+    stale = Job.objects.using(using).filter(state=Job.RUNNING, locked_until__lt=now)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        state=Job.FAILED,
+        finished_at=now,
+        locked_by="",
+        locked_until=None,
+        error="Reserva expirada: o worker parou durante a execução.",
+    )
+    requeued = stale.update(
+        state=Job.QUEUED, run_at=now, locked_by="", locked_until=None
+    )
+    return requeued, failed
+
+
+def retry_delay(attempts):
+    """
+    Espera antes da próxima tentativa (exponencial).
+    """
+    return timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** max(attempts - 1, 0))
+
+
+def _finish(job, worker_id, **values):
+    return (
+        Job.objects.filter(pk=job.pk, state=Job.RUNNING, locked_by=worker_id)
+        .update(locked_by="", locked_until=None, **values)
+    )
+
+
+def execute(job_id, worker_id, close_connections=True):
+    """
+    Executa uma tarefa já reservada e grava o resultado. Falhas voltam para
+    a fila com espera exponencial até ``max_attempts``.
+
+    Roda nas threads ou processos do pool do worker.
+    """
+    try:
+        job = Job.objects.get(pk=job_id)
+        if job.state != Job.RUNNING or job.locked_by != worker_id:
+            return job.state
+        _current.job = job
+        started = time.perf_counter()
+        try:
+            registered = get_task(job.task)
+            if registered.bind:
+                result = registered.func(job, **job.kwargs)
+            else:
+                result = registered.func(**job.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            logger.warning("Tarefa %s #%s falhou", job.task, job.pk, exc_info=True)
+            if job.attempts < job.max_attempts:
+                state = Job.QUEUED
+                _finish(
+                    job,
+                    worker_id,
+                    state=state,
+                    error=error,
+                    run_at=timezone.now() + retry_delay(job.attempts),
+                )
+            else:
+                state = Job.FAILED
+                _finish(job, worker_id, state=state, error=error, finished_at=timezone.now())
+            return state
+        finally:
+            _current.job = None
+        _finish(
+            job,
+            worker_id,
+            state=Job.SUCCEEDED,
+            result=result,
+            error="",
+            finished_at=timezone.now(),
+        )
+        logger.info(
+            "Tarefa %s #%s concluída em %.2fs",
+            job.task,
+            job.pk,
+            time.perf_counter() - started,
+        )
+        return Job.SUCCEEDED
+    finally:
+        # Cada thread do pool tem a sua conexão; não deixá-la aberta à toa
+        if close_connections:
+            connections.close_all()
+
+
+def cancel(job):
+    """
+    Cancela uma tarefa que ainda não começou. Retorna ``True`` se cancelou.
+    """
+    return bool(
+        Job.objects.filter(pk=job.pk, state=Job.QUEUED).update(
+            state=Job.CANCELLED, finished_at=timezone.now()
+        )
+    )
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def metrics(window=timedelta(hours=1), using=DEFAULT_DB_ALIAS):
+    """
+    Profundidade da fila por fila e estado, idade da tarefa pronta mais
+    antiga e latências (espera na fila e duração, p50/p95 em segundos) das
+    tarefas finalizadas na janela.
+    """
+    now = timezone.now()
+    jobs = Job.objects.using(using)
+    depth = {}
+    rows = (
+        jobs.filter(state__in=(Job.QUEUED, Job.RUNNING))
+        .values("queue", "state")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    for row in rows:
+        depth.setdefault(row["queue"], {})[row["state"]] = row["total"]
+    oldest = jobs.filter(state=Job.QUEUED, run_at__lte=now).aggregate(
+        oldest=Min("run_at")
+    )["oldest"]
+
+    finished = (
+        jobs.filter(finished_at__gte=now - window, started_at__isnull=False)
+        .order_by("-finished_at")
+        .values_list("state", "run_at", "created_at", "started_at", "finished_at")[
+            :METRICS_SAMPLE
+        ]
+    )
+    states, waits, durations = {}, [], []
+    for state, run_at, created_at, started_at, finished_at in finished:
+        states[state] = states.get(state, 0) + 1
+        # Tarefas repetidas têm run_at posterior ao primeiro início
+        queued_at = max(run_at, created_at) if run_at <= started_at else created_at
+        waits.append((started_at - queued_at).total_seconds())
+        durations.append((finished_at - started_at).total_seconds())
+
+    return {
+        "depth": depth,
+        "ready_oldest_age": (now - oldest).total_seconds() if oldest else 0.0,
+        "window_seconds": window.total_seconds(),
+        "finished": states,
+        "wait_p50": _percentile(waits, 0.5),
+        "wait_p95": _percentile(waits, 0.95),
+        "duration_p50": _percentile(durations, 0.5),
+        "duration_p95": _percentile(durations, 0.95),
+    }
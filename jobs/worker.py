@@ -0,0 +1,121 @@
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import django
+from django.conf import settings
+from django.db import connections
+
+from . import queue
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Processa a fila com um pool de threads ou de processos.
+
+    O laço principal reserva tarefas enquanto houver vagas no pool, renova
+    as reservas das que estão em execução e devolve à fila as de workers
+    que pararam. Ao receber SIGINT/SIGTERM, para de reservar e espera as
+    tarefas em andamento terminarem.
+    """
+
+    def __init__(
+        self,
+        concurrency=None,
+        mode=None,
+        queues=("default",),
+        poll_interval=None,
+        burst=False,
+    ):
+        self.concurrency = concurrency or settings.JOBS_WORKERS
+        self.mode = mode or settings.JOBS_WORKER_MODE
+        self.queues = tuple(queues)
+        self.poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL
+        # Termina quando a fila estiver vazia (cron, testes)
+        self.burst = burst
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.processed = 0
+        self.stopping = False
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def _executor(self):
+        if self.mode == "process":
+            # Conexões abertas não devem ser herdadas pelos processos filhos
+            connections.close_all()
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency, initializer=django.setup
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="jobs-worker"
+        )
+
+    def _install_signals(self):
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+    def _maintain(self, running):
+        queue.heartbeat(self.id, running.values())
+        requeued, failed = queue.requeue_stale()
+        if requeued or failed:
+            logger.warning(
+                "Reservas vencidas: %s devolvidas à fila, %s falharam", requeued, failed
+            )
+
+    def run(self):
+        self._install_signals()
+        running = {}
+        # Renova as reservas bem antes de vencerem
+        maintain_every = settings.JOBS_LEASE_SECONDS / 3
+        last_maintenance = 0.0
+        with self._executor() as executor:
+            while not self.stopping:
+                now = time.monotonic()
+                if now - last_maintenance >= maintain_every:
+                    self._maintain(running)
+                    last_maintenance = now
+
+                jobs = queue.claim(
+                    self.id, self.concurrency - len(running), queues=self.queues
+                )
+                for job in jobs:
+                    future = executor.submit(queue.execute, job.pk, self.id)
+                    running[future] = job.pk
+
+                if not running:
+                    if self.burst and not jobs:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                # Com vagas livres e fila vazia, espera uma tarefa terminar
+                # ou o intervalo de consulta, o que vier antes
+                timeout = 0 if jobs and len(running) < self.concurrency else self.poll_interval
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    self.processed += 1
+                    if future.exception() is not None:
+                        logger.error(
+                            "Erro no worker ao executar a tarefa #%s",
+                            job_id,
+                            exc_info=future.exception(),
+                        )
+            if running:
+                logger.info("Aguardando %s tarefas em andamento", len(running))
+                wait(running)
+                self.processed += len(running)
+        return self.processed
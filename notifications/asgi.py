@@ -0,0 +1,164 @@
+"""
+Endpoints ASGI do feed em tempo real (somente equipe):
+
+- ``/events/``: Server-Sent Events (``EventSource`` no navegador);
+- ``/ws/events/``: WebSocket com as mesmas mensagens em JSON.
+
+``?types=action_log,payroll.finished`` limita os tipos recebidos. Cada
+conexão ociosa é apenas uma corrotina aguardando um ``asyncio.Event``,
+então um worker sustenta milhares delas.
+"""
+
+import asyncio
+import json
+from http.cookies import SimpleCookie
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+
+from .hub import hub
+
+SSE_PATH = "/events/"
+WEBSOCKET_PATH = "/ws/events/"
+
+
+def _load_user(session_key):
+    engine = import_module(settings.SESSION_ENGINE)
+    request = SimpleNamespace(session=engine.SessionStore(session_key))
+    return get_user(request)
+
+
+async def authenticate(scope):
+    """
+    Usuário da sessão (cookie) da conexão; ``None`` se não for da equipe.
+    """
+    cookies = SimpleCookie()
+    for name, value in scope.get("headers", ()):
+        if name == b"cookie":
+            cookies.load(value.decode("latin-1"))
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+    user = await sync_to_async(_load_user)(morsel.value)
+    if not user.is_authenticated or not user.is_staff:
+        return None
+    return user
+
+
+def _types(scope):
+    query = parse_qs(scope.get("query_string", b"").decode())
+    raw = ",".join(query.get("types", []))
+    return {name.strip() for name in raw.split(",") if name.strip()} or None
+
+
+def _public(event):
+    return {key: value for key, value in event.items() if key != "coalesce"}
+
+
+async def _watch_disconnect(receive, subscription, message_type):
+    # Encerra a inscrição assim que o cliente fecha a conexão
+    while True:
+        message = await receive()
+        if message["type"] == message_type:
+            subscription.close()
+            return
+
+
+async def _stream(receive, subscription, disconnect_type, emit):
+    watcher = asyncio.ensure_future(
+        _watch_disconnect(receive, subscription, disconnect_type)
+    )
+    try:
+        while not subscription.closed:
+            events = await subscription.get(settings.NOTIFICATIONS_HEARTBEAT)
+            if subscription.closed:
+                break
+            await emit(events)
+    finally:
+        watcher.cancel()
+        hub.unsubscribe(subscription)
+
+
+async def sse(scope, receive, send):
+    user = await authenticate(scope)
+    if user is None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 403,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"Acesso negado."})
+        return
+
+    subscription = hub.subscribe(_types(scope))
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                # Impede que o nginx acumule o stream em buffer
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+    await send(
+        {
+            "type": "http.response.body",
+            "body": f"retry: {settings.NOTIFICATIONS_RETRY_MS}\n\n".encode(),
+            "more_body": True,
+        }
+    )
+
+    async def emit(events):
+        if not events:
+            # Comentário periódico mantém proxies e balanceadores abertos
+            body = b": ping\n\n"
+        else:
+            body = "".join(
+                f"event: {event['type']}\ndata: {json.dumps(_public(event))}\n\n"
+                for event in events
+            ).encode()
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+
+    try:
+        await _stream(receive, subscription, "http.disconnect", emit)
+    except OSError:
+        # Cliente desconectou durante o envio
+        pass
+
+
+async def websocket(scope, receive, send):
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+    user = await authenticate(scope)
+    if user is None:
+        await send({"type": "websocket.close", "code": 4403})
+        return
+    subscription = hub.subscribe(_types(scope))
+    await send({"type": "websocket.accept"})
+
+    async def emit(events):
+        for event in events or [{"type": "ping"}]:
+            await send({"type": "websocket.send", "text": json.dumps(_public(event))})
+
+    await _stream(receive, subscription, "websocket.disconnect", emit)
+
+
+def route(scope):
+    """
+    Handler ASGI do feed para o escopo, ou ``None`` para seguir ao Django.
+    """
+    if scope["type"] == "http" and scope["path"] == SSE_PATH:
+        return sse
+    if scope["type"] == "websocket" and scope["path"] == WEBSOCKET_PATH:
+        return websocket
+    return None
@@ -0,0 +1,129 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Eventos lidos por consulta do DatabaseBackend
+FETCH_SIZE = 500
+# Consultas entre duas limpezas de eventos antigos
+CLEANUP_EVERY = 60
+
+
+class LocalBackend:
+    """
+    Sem canal entre processos: os eventos só chegam às conexões do próprio
+    processo (servidor ASGI com um único worker).
+    """
+
+    def publish(self, event):
+        pass
+
+    def publish_many(self, events):
+        pass
+
+    def start(self, dispatch):
+        pass
+
+    def stop(self):
+        pass
+
+
+class DatabaseBackend:
+    """
+    Repassa eventos entre processos pela tabela ``Notification``.
+
+    Cada processo com conexões abertas tem uma única thread que busca os
+    eventos novos a cada ``NOTIFICATIONS_POLL_INTERVAL`` segundos (uma
+    consulta por processo, não por conexão) e os entrega ao hub local.
+    Processos sem conexões (WSGI, workers) apenas gravam.
+    """
+
+    def __init__(self):
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        self.publish_many([event])
+
+    def publish_many(self, events):
+        """
+        Grava um lote de eventos com um único ``bulk_create``.
+        """
+        from .models import Notification
+
+        try:
+            Notification.objects.bulk_create(
+                [Notification(origin=self.origin, payload=event) for event in events]
+            )
+        except Exception:
+            logger.exception(
+                "Falha ao repassar %d evento(s) %s",
+                len(events),
+                sorted({event.get("type") for event in events}),
+            )
+
+    def start(self, dispatch):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(dispatch,),
+                name="notifications-listener",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self, dispatch):
+        from .models import Notification
+
+        last_id = None
+        polls = 0
+        try:
+            while not self._stopping.is_set():
+                try:
+                    if last_id is None:
+                        last_id = (
+                            Notification.objects.order_by("-pk")
+                            .values_list("pk", flat=True)
+                            .first()
+                            or 0
+                        )
+                    rows = (
+                        Notification.objects.filter(pk__gt=last_id)
+                        .order_by("pk")
+                        .values_list("pk", "origin", "payload")[:FETCH_SIZE]
+                    )
+                    for pk, origin, payload in rows:
+                        last_id = pk
+                        if origin != self.origin:
+                            dispatch(payload)
+                    polls += 1
+                    if polls % CLEANUP_EVERY == 0:
+                        Notification.objects.filter(
+                            created_at__lt=timezone.now()
+                            - timedelta(seconds=settings.NOTIFICATIONS_RETENTION)
+                        ).delete()
+                except Exception:
+                    logger.exception("Falha ao ler eventos de outros processos")
+                    connections.close_all()
+                self._stopping.wait(settings.NOTIFICATIONS_POLL_INTERVAL)
+        finally:
+            connections.close_all()
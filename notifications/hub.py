@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+_sequence = itertools.count(1)
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class Subscription:
+    """
+    Fila limitada de uma conexão. Quando o cliente não acompanha o ritmo,
+    eventos com a mesma chave ``coalesce`` são substituídos pelo mais novo
+    e, se ainda faltar espaço, os mais antigos são descartados; o cliente
+    recebe um evento ``dropped`` com a quantidade perdida para saber que
+    deve recarregar os dados.
+
+    Usada somente na thread do event loop.
+    """
+
+    def __init__(self, maxsize, types=None):
+        self.maxsize = maxsize
+        self.types = set(types) if types else None
+        self.pending = deque()
+        self.dropped = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+
+    def put(self, event):
+        if self.closed or (self.types and event["type"] not in self.types):
+            return
+        key = event.get("coalesce")
+        if key is not None:
+            for index, pending in enumerate(self.pending):
+                if pending.get("coalesce") == key:
+                    del self.pending[index]
+                    break
+        if len(self.pending) >= self.maxsize:
+            self.pending.popleft()
+            self.dropped += 1
+        self.pending.append(event)
+        self._wakeup.set()
+
+    async def get(self, timeout):
+        """
+        Aguarda até ``timeout`` segundos e retorna os eventos pendentes
+        (lista vazia se nada chegou).
+        """
+        if not self.pending and not self.closed:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        events = list(self.pending)
+        self.pending.clear()
+        if self.dropped:
+            events.insert(0, {"type": "dropped", "count": self.dropped})
+            self.dropped = 0
+        return events
+
+    def close(self):
+        self.closed = True
+        self._wakeup.set()
+
+
+class Hub:
+    """
+    Pub/sub em memória do processo ASGI. As conexões se inscrevem no event
+    loop; ``publish`` pode ser chamado de qualquer thread (views, sinais,
+    workers) e entrega os eventos no loop com ``call_soon_threadsafe``.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.subscribers = set()
+
+    def subscribe(self, types=None):
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(settings.NOTIFICATIONS_QUEUE_SIZE, types)
+        self.subscribers.add(subscription)
+        get_backend().start(self.publish)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        self.subscribers.discard(subscription)
+
+    def dispatch(self, event):
+        for subscription in list(self.subscribers):
+            subscription.put(event)
+
+    def publish(self, event):
+        loop = self.loop
+        if loop is None or loop.is_closed() or not self.subscribers:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.dispatch(event)
+        else:
+            loop.call_soon_threadsafe(self.dispatch, event)
+
+
+hub = Hub()
+
+
+def get_backend():
+    """
+    Canal entre processos configurado em ``NOTIFICATIONS_BACKEND``.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.NOTIFICATIONS_BACKEND)()
+        return _backend
+
+
+def publish(event_type, coalesce=None, **data):
+    """
+    Publica um evento para os administradores conectados deste processo e,
+    pelo backend configurado, dos demais processos.
+
+    :param coalesce: Chave para substituir eventos equivalentes ainda não
+        entregues (ex.: contadores que só importam pelo valor mais novo).
+    """
+    event = _event(event_type, coalesce, data)
+    hub.publish(event)
+    get_backend().publish(event)
+    return event
+
+
+def publish_many(events):
+    """
+    Publica um lote de eventos ``(tipo, dados)``; o backend os repassa aos
+    demais processos de uma só vez.
+    """
+    events = [_event(event_type, None, data) for event_type, data in events]
+    for event in events:
+        hub.publish(event)
+    if events:
+        get_backend().publish_many(events)
+    return events
+
+
+def _event(event_type, coalesce, data):
+    event = {
+        "id": next(_sequence),
+        "type": event_type,
+        "time": timezone.now().isoformat(),
+        **data,
+    }
+    if coalesce is not None:
+        event["coalesce"] = coalesce
+    return event
@@ -0,0 +1,18 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+# Evento repassado entre processos pelo DatabaseBackend (tabela de curta
+# duração, lida por uma única thread em cada processo ASGI)
+class Notification(models.Model):
+    # Processo que publicou o evento (não o recebe de volta)
+    origin = models.CharField(max_length=100, verbose_name=_("Origem"))
+    # Conteúdo do evento
+    payload = models.JSONField(verbose_name=_("Evento"))
+    # Data de publicação
+    created_at = models.DateTimeField(
+        auto_now_add=True, db_index=True, verbose_name=_("Criado em")
+    )
+
+    def __str__(self):
+        return f"{self.payload.get('type')} #{self.pk}"
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from accounts.action_log import entries_written
+from accounts.models import ActionLog
+from employee.models import Leave, Vacation
+from employee.payroll import PayrollRun, payroll_finished
+
+from .hub import publish, publish_many
+
+
+def publish_action_logs(sender, entries, **kwargs):
+    """
+    Publica os registros de ActionLog gravados. Lotes grandes (cargas em
+    massa) viram um único evento ``action_log.bulk`` para não inundar as
+    conexões.
+    """
+    if len(entries) > settings.NOTIFICATIONS_MAX_BATCH_EVENTS:
+        publish(
+            "action_log.bulk",
+            coalesce="action_log.bulk",
+            count=len(entries),
+            last_id=entries[-1].pk,
+        )
+        return
+    events = []
+    for entry in entries:
+        user = entry.user if entry.user_id else None
+        events.append(
+            (
+                "action_log",
+                {
+                    "log_id": entry.pk,
+                    "user": user.username if user else None,
+                    "employee_id": entry.employee_id,
+                    "text": entry.action_text,
+                    "date": (
+                        entry.action_date.isoformat() if entry.action_date else None
+                    ),
+                },
+            )
+        )
+    publish_many(events)
+
+
+def publish_absence_request(sender, instance, created, raw=False, **kwargs):
+    """
+    Avisa sobre novos pedidos de licença ou férias após o commit.
+    """
+    if raw or not created:
+        return
+    kind = "leave" if sender is Leave else "vacation"
+    event = {
+        f"{kind}_id": instance.pk,
+        "employee_id": instance.employee_id,
+        "start_date": instance.start_date.isoformat(),
+        "end_date": instance.end_date.isoformat(),
+        "status": instance.status,
+    }
+    transaction.on_commit(lambda: publish(f"{kind}.requested", **event))
+
+
+def publish_payroll_finished(sender, report, **kwargs):
+    publish(
+        "payroll.finished",
+        competence=f"{report.year:04d}-{report.month:02d}",
+        processed=report.processed,
+        skipped=len(report.skipped),
+        total_net=str(report.total_net),
+        dry_run=report.dry_run,
+    )
+
+
+entries_written.connect(publish_action_logs, sender=ActionLog)
+post_save.connect(publish_absence_request, sender=Leave)
+post_save.connect(publish_absence_request, sender=Vacation)
+payroll_finished.connect(publish_payroll_finished, sender=PayrollRun)